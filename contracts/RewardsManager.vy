@@ -9,6 +9,14 @@ interface AaveIncentivesController:
     def setDistributionEnd(deistributionEnd: uint256): nonpayable
     def configureAssets(assets: address[1], emissionsPerSecond: uint256[1]): nonpayable
     def setDistributionPeriod(start: uint256, end: uint256): nonpayable
+    def setEmissionScheduleSegments(asset: address, ends: uint256[8], emissionsPerSecond: uint256[8], segments: uint256): nonpayable
+
+struct RewardsTarget:
+    controller: address
+    asset: address
+    share: uint256
+
+
 event OwnershipTransferred: 
     previous_owner: indexed(address)
     new_owner: indexed(address)
@@ -18,6 +26,21 @@ event RewardsContractSet:
     rewards_contract: indexed(address)
 
 
+event RewardsTargetAdded:
+    controller: indexed(address)
+    asset: indexed(address)
+    share: uint256
+
+
+event RewardsTargetsCleared:
+    count: uint256
+
+
+event RewardsScheduleSet:
+    shares: uint256[8]
+    segments: uint256
+
+
 event ERC20TokenRecovered:
     token: indexed(address)
     amount: uint256
@@ -31,6 +54,17 @@ rewards_duration: public(uint256)
 ldo_token: constant(address) = 0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32
 staking_token: public(address)
 
+MAX_REWARDS_TARGETS: constant(uint256) = 16
+TOTAL_SHARES: constant(uint256) = 10000
+rewards_targets: public(RewardsTarget[MAX_REWARDS_TARGETS])
+rewards_targets_count: public(uint256)
+rewards_targets_shares: public(uint256)
+
+# must match MAX_SCHEDULE_SEGMENTS of the incentives controller
+MAX_SCHEDULE_SEGMENTS: constant(uint256) = 8
+rewards_schedule_shares: public(uint256[MAX_SCHEDULE_SEGMENTS])
+rewards_schedule_segments: public(uint256)
+
 @external
 def __init__(_rewards_initializer: address):
     assert _rewards_initializer != ZERO_ADDRESS, "rewards initializer: zero address"
@@ -58,10 +92,17 @@ def transfer_ownership(_to: address):
 
     log OwnershipTransferred(old_owner, _to)
 
+@view
+@internal
+def _rewards_controller() -> address:
+    if self.rewards_targets_count != 0:
+        return self.rewards_targets[0].controller
+    return self.rewards_contract
+
 @view
 @internal
 def _period_finish() -> uint256:
-    return AaveIncentivesController(self.rewards_contract).getDistributionEnd()
+    return AaveIncentivesController(self._rewards_controller()).getDistributionEnd()
 
 @view
 @external
@@ -80,7 +121,7 @@ def is_rewards_period_finished() -> bool:
     """
     @notice Whether the current rewards period has finished.
     """
-    return block.timestamp > AaveIncentivesController(self.rewards_contract).getDistributionEnd()
+    return block.timestamp > self._period_finish()
 
 @external
 def start_next_rewards_period():
@@ -91,6 +132,10 @@ def start_next_rewards_period():
         The `FarmingRewards` contract handles all the rest on its own.
         The current rewards period must be finished by this time.
         First period could be started only by `self.rewards_initializer`
+        When rewards targets are set, the tokens are split between
+        all the targets according to their shares instead.
+        When a rewards schedule is set, the emission of every period
+        follows it instead of being constant.
     """
     rewards_contract: address = self.rewards_contract
 
@@ -101,11 +146,132 @@ def start_next_rewards_period():
     assert amount != 0, "manager: rewards disabled"
     assert self._is_rewards_period_finished(), "manager: rewards period not finished"
 
+    if self.rewards_targets_count != 0:
+        self._start_targets_rewards_period(amount)
+        return
+
     assert ERC20(ldo_token).transfer(rewards_contract, amount), "manager: unable to transfer reward tokens"
 
     AaveIncentivesController(rewards_contract).setDistributionPeriod(block.timestamp, block.timestamp + self.rewards_duration)
-    emission_per_second: uint256 = amount / self.rewards_duration
-    AaveIncentivesController(rewards_contract).configureAssets([self.staking_token], [emission_per_second])
+    self._configure_emission(rewards_contract, self.staking_token, amount, self.rewards_duration)
+
+
+@internal
+def _configure_emission(controller: address, asset: address, amount: uint256, rewards_duration: uint256):
+    segments: uint256 = self.rewards_schedule_segments
+    if segments == 0:
+        AaveIncentivesController(controller).configureAssets([asset], [amount / rewards_duration])
+        return
+
+    ends: uint256[MAX_SCHEDULE_SEGMENTS] = empty(uint256[MAX_SCHEDULE_SEGMENTS])
+    emissions_per_second: uint256[MAX_SCHEDULE_SEGMENTS] = empty(uint256[MAX_SCHEDULE_SEGMENTS])
+    segment_start: uint256 = block.timestamp
+    for i in range(MAX_SCHEDULE_SEGMENTS):
+        if i == segments:
+            break
+        ends[i] = block.timestamp + rewards_duration * (i + 1) / segments
+        emissions_per_second[i] = amount * self.rewards_schedule_shares[i] / TOTAL_SHARES / (ends[i] - segment_start)
+        segment_start = ends[i]
+
+    AaveIncentivesController(controller).setEmissionScheduleSegments(asset, ends, emissions_per_second, segments)
+
+
+@internal
+def _start_targets_rewards_period(amount: uint256):
+    assert self.rewards_targets_shares == TOTAL_SHARES, "manager: invalid shares"
+
+    targets_count: uint256 = self.rewards_targets_count
+    rewards_duration: uint256 = self.rewards_duration
+    period_finish: uint256 = block.timestamp + rewards_duration
+    distributed: uint256 = 0
+    index: uint256 = 0
+
+    for i in range(MAX_REWARDS_TARGETS):
+        if index == targets_count:
+            break
+        target: RewardsTarget = self.rewards_targets[index]
+        index += 1
+
+        # the last target receives the rounding remainder
+        target_amount: uint256 = amount - distributed
+        if index != targets_count:
+            target_amount = amount * target.share / TOTAL_SHARES
+        distributed += target_amount
+
+        if index != 1:
+            assert block.timestamp >= AaveIncentivesController(target.controller).getDistributionEnd(), "manager: rewards period not finished"
+
+        assert ERC20(ldo_token).transfer(target.controller, target_amount), "manager: unable to transfer reward tokens"
+        AaveIncentivesController(target.controller).setDistributionPeriod(block.timestamp, period_finish)
+        self._configure_emission(target.controller, target.asset, target_amount, rewards_duration)
+
+
+@external
+def add_rewards_target(_controller: address, _asset: address, _share: uint256):
+    """
+    @notice
+        Adds incentives controller and its asset to the list of targets
+        funded by `start_next_rewards_period`. `_share` is the part of
+        the rewards in basis points, shares of all the targets must sum
+        up to 10000. Can only be called by the owner.
+    """
+    assert msg.sender == self.owner, "manager: not permitted"
+    assert _controller != ZERO_ADDRESS, "manager: zero address"
+
+    targets_count: uint256 = self.rewards_targets_count
+    assert targets_count < MAX_REWARDS_TARGETS, "manager: too many targets"
+    shares: uint256 = self.rewards_targets_shares + _share
+    assert shares <= TOTAL_SHARES, "manager: invalid shares"
+
+    self.rewards_targets[targets_count] = RewardsTarget({controller: _controller, asset: _asset, share: _share})
+    self.rewards_targets_count = targets_count + 1
+    self.rewards_targets_shares = shares
+
+    log RewardsTargetAdded(_controller, _asset, _share)
+
+
+@external
+def clear_rewards_targets():
+    """
+    @notice
+        Removes all the rewards targets, `rewards_contract` is funded
+        by `start_next_rewards_period` again. Can only be called by the owner.
+    """
+    assert msg.sender == self.owner, "manager: not permitted"
+
+    targets_count: uint256 = self.rewards_targets_count
+    self.rewards_targets_count = 0
+    self.rewards_targets_shares = 0
+
+    log RewardsTargetsCleared(targets_count)
+
+
+@external
+def set_rewards_schedule(_shares: uint256[MAX_SCHEDULE_SEGMENTS], _segments: uint256):
+    """
+    @notice
+        Splits the rewards periods started by `start_next_rewards_period`
+        into `_segments` segments of equal duration, the segment `i` emits
+        `_shares[i]` basis points of the period rewards, e.g. a tapering
+        emission. Shares of the segments must sum up to 10000, zero
+        segments restore the constant emission. Can only be called by the owner.
+    """
+    assert msg.sender == self.owner, "manager: not permitted"
+    assert _segments <= MAX_SCHEDULE_SEGMENTS, "manager: too many segments"
+
+    shares: uint256 = 0
+    for i in range(MAX_SCHEDULE_SEGMENTS):
+        if i == _segments:
+            break
+        shares += _shares[i]
+    assert _segments == 0 or shares == TOTAL_SHARES, "manager: invalid shares"
+    # every segment must last at least a second
+    assert self.rewards_duration >= _segments, "manager: segments too short"
+
+    self.rewards_schedule_shares = _shares
+    self.rewards_schedule_segments = _segments
+
+    log RewardsScheduleSet(_shares, _segments)
 
 
 @external
@@ -121,6 +287,7 @@ def set_rewards_period_duration(_duration: uint256):
         Updates period duration.  Can only be called by the owner.
     """
     assert msg.sender == self.owner, "manager: not permitted"
+    assert _duration >= self.rewards_schedule_segments, "manager: segments too short"
 
     self.rewards_duration = _duration
     # FarmingRewards(self.rewards_contract).setDuration(GIFT_INDEX, _duration)
@@ -0,0 +1,41 @@
+// SPDX-License-Identifier: agpl-3.0
+pragma solidity 0.7.5;
+pragma experimental ABIEncoderV2;
+
+import {DistributionManager} from './DistributionManager.sol';
+import {ERC20TokenIncentivesController} from './ERC20TokenIncentivesController.sol';
+
+/**
+ * @title ClonableIncentivesController
+ * @notice ERC20TokenIncentivesController implementation for EIP-1167 clones. Clones share the
+ * code and so the immutables, the reward token and the emission manager are kept in the storage
+ * of every clone instead and set once by `initializeClone`
+ **/
+contract ClonableIncentivesController is ERC20TokenIncentivesController {
+  address internal _cloneRewardToken;
+
+  address internal _cloneEmissionManager;
+
+  constructor() ERC20TokenIncentivesController(address(0), address(0)) {}
+
+  /**
+   * @dev Initializes a clone
+   * @param rewardToken The token distributed as rewards
+   * @param emissionManager The address allowed to configure the distributions
+   **/
+  function initializeClone(address rewardToken, address emissionManager) external initializer {
+    require(rewardToken != address(0) && emissionManager != address(0), 'INVALID_CONFIGURATION');
+    _cloneRewardToken = rewardToken;
+    _cloneEmissionManager = emissionManager;
+  }
+
+  /// @inheritdoc ERC20TokenIncentivesController
+  function TOKEN() public view override returns (address) {
+    return _cloneRewardToken;
+  }
+
+  /// @inheritdoc DistributionManager
+  function EMISSION_MANAGER() public view override returns (address) {
+    return _cloneEmissionManager;
+  }
+}
@@ -0,0 +1,37 @@
+// SPDX-License-Identifier: agpl-3.0
+pragma solidity 0.7.5;
+pragma experimental ABIEncoderV2;
+
+import {ERC20TokenIncentivesController} from './ERC20TokenIncentivesController.sol';
+
+/**
+ * @title CompactEventsIncentivesController
+ * @notice ERC20TokenIncentivesController logging a single UserRewardsUpdated event per move of an
+ * user index instead of AssetIndexUpdated, UserIndexUpdated and RewardsAccrued, i.e. one log per
+ * handleAction. The per-user state is fully recoverable from UserRewardsUpdated and RewardsClaimed
+ **/
+contract CompactEventsIncentivesController is ERC20TokenIncentivesController {
+  event UserRewardsUpdated(
+    address indexed user,
+    address asset,
+    uint256 index,
+    uint256 accruedRewards
+  );
+
+  constructor(address rewardToken, address emissionManager)
+    ERC20TokenIncentivesController(rewardToken, emissionManager)
+  {}
+
+  function _emitAssetIndexUpdated(address, uint256) internal override {}
+
+  function _emitUserIndexUpdated(
+    address user,
+    address asset,
+    uint256 newIndex,
+    uint256 accruedRewards
+  ) internal override {
+    emit UserRewardsUpdated(user, asset, newIndex, accruedRewards);
+  }
+
+  function _emitRewardsAccrued(address, uint256) internal override {}
+}
@@ -18,10 +18,19 @@ contract DistributionManager is IAaveDistributionManager {
     uint104 emissionPerSecond;
     uint104 index;
     uint40 lastUpdateTimestamp;
+    uint8 id;
     mapping(address => uint256) users;
+    // emission schedule segments, used while emissionPerSecond is zero. Every segment packs
+    // its end timestamp in bits 104-143 and its emission per second in bits 0-103,
+    // a segment starts at the end of the previous one
+    uint256[] schedule;
   }
 
-  address public immutable EMISSION_MANAGER;
+  uint256 internal constant SCHEDULE_EMISSION_MASK = 2**104 - 1;
+
+  event EmissionScheduleUpdated(address indexed asset, uint256[] ends, uint256[] emissionsPerSecond);
+
+  address internal immutable _emissionManager;
 
   uint8 public constant PRECISION = 18;
 
@@ -30,12 +39,20 @@ contract DistributionManager is IAaveDistributionManager {
   uint256 internal _distributionEnd;
 
   modifier onlyEmissionManager() {
-    require(msg.sender == EMISSION_MANAGER, 'ONLY_EMISSION_MANAGER');
+    require(msg.sender == EMISSION_MANAGER(), 'ONLY_EMISSION_MANAGER');
     _;
   }
 
   constructor(address emissionManager) {
-    EMISSION_MANAGER = emissionManager;
+    _emissionManager = emissionManager;
+  }
+
+  /**
+   * @dev Returns the address allowed to configure the distributions
+   * @return The address of the emission manager
+   **/
+  function EMISSION_MANAGER() public view virtual returns (address) {
+    return _emissionManager;
   }
 
   function setDistributionPeriod(uint256 start, uint256 end) external onlyEmissionManager {
@@ -61,7 +78,7 @@ contract DistributionManager is IAaveDistributionManager {
 
   /// @inheritdoc IAaveDistributionManager
   function getUserAssetData(address user, address asset) public view override returns (uint256) {
-    return assets[asset].users[user];
+    return _getUserIndex(user, assets[asset]);
   }
 
   /// @inheritdoc IAaveDistributionManager
@@ -69,6 +86,26 @@ contract DistributionManager is IAaveDistributionManager {
     return (assets[asset].index, assets[asset].emissionPerSecond, assets[asset].lastUpdateTimestamp);
   }
 
+  /**
+   * @dev Returns the emission schedule of the distribution
+   * @param asset The address of the reference asset of the distribution
+   * @return ends The end timestamps of the schedule segments
+   * @return emissionsPerSecond The emission per second of the schedule segments
+   **/
+  function getEmissionSchedule(address asset)
+    external
+    view
+    returns (uint256[] memory ends, uint256[] memory emissionsPerSecond)
+  {
+    uint256[] storage schedule = assets[asset].schedule;
+    ends = new uint256[](schedule.length);
+    emissionsPerSecond = new uint256[](schedule.length);
+    for (uint256 i = 0; i < schedule.length; i++) {
+      ends[i] = schedule[i] >> 104;
+      emissionsPerSecond[i] = schedule[i] & SCHEDULE_EMISSION_MASK;
+    }
+  }
+
   /**
    * @dev Configure the assets for a specific emission
    * @param assetsConfigInput The array of each asset configuration
@@ -86,6 +123,9 @@ contract DistributionManager is IAaveDistributionManager {
       );
 
       assetConfig.emissionPerSecond = assetsConfigInput[i].emissionPerSecond;
+      if (assetConfig.schedule.length != 0) {
+        delete assetConfig.schedule;
+      }
 
       emit AssetConfigUpdated(
         assetsConfigInput[i].underlyingAsset,
@@ -94,6 +134,44 @@ contract DistributionManager is IAaveDistributionManager {
     }
   }
 
+  /**
+   * @dev Replaces the emission of a distribution with a schedule of consecutive segments
+   * with constant emission each. The first segment starts immediately, no rewards are
+   * distributed after the end of the last one. The distribution end doesn't apply to schedules
+   * @param asset The address of the reference asset of the distribution
+   * @param totalStaked Current total of staked assets for this distribution
+   * @param ends The end timestamps of the segments, strictly increasing
+   * @param emissionsPerSecond The emission per second of the segments
+   **/
+  function _setEmissionSchedule(
+    address asset,
+    uint256 totalStaked,
+    uint256[] memory ends,
+    uint256[] memory emissionsPerSecond
+  ) internal {
+    require(ends.length == emissionsPerSecond.length, 'INVALID_CONFIGURATION');
+
+    AssetData storage assetConfig = assets[asset];
+    _updateAssetStateInternal(asset, assetConfig, totalStaked);
+
+    assetConfig.emissionPerSecond = 0;
+    delete assetConfig.schedule;
+
+    uint256 previousEnd = block.timestamp;
+    for (uint256 i = 0; i < ends.length; i++) {
+      require(
+        ends[i] > previousEnd && uint40(ends[i]) == ends[i] &&
+          uint104(emissionsPerSecond[i]) == emissionsPerSecond[i],
+        'INVALID_CONFIGURATION'
+      );
+      assetConfig.schedule.push((ends[i] << 104) | emissionsPerSecond[i]);
+      previousEnd = ends[i];
+    }
+
+    emit AssetConfigUpdated(asset, 0);
+    emit EmissionScheduleUpdated(asset, ends, emissionsPerSecond);
+  }
+
   /**
    * @dev Updates the state of one distribution, mainly rewards index and timestamp
    * @param asset The address of the asset being updated
@@ -115,14 +193,17 @@ contract DistributionManager is IAaveDistributionManager {
     }
 
     uint256 newIndex =
-      _getAssetIndex(oldIndex, emissionPerSecond, lastUpdateTimestamp, totalStaked);
+      emissionPerSecond == 0 && assetConfig.schedule.length != 0
+        ? _getScheduledAssetIndexAt(assetConfig, totalStaked, block.timestamp)
+        : _getAssetIndex(oldIndex, emissionPerSecond, lastUpdateTimestamp, totalStaked);
 
     if (newIndex != oldIndex) {
       require(uint104(newIndex) == newIndex, 'Index overflow');
       //optimization: storing one after another saves one SSTORE
       assetConfig.index = uint104(newIndex);
       assetConfig.lastUpdateTimestamp = uint40(block.timestamp);
-      emit AssetIndexUpdated(asset, newIndex);
+      _emitAssetIndexUpdated(asset, newIndex);
+      _allocateRewards(oldIndex, newIndex, totalStaked);
     } else {
       assetConfig.lastUpdateTimestamp = uint40(block.timestamp);
     }
@@ -130,6 +211,19 @@ contract DistributionManager is IAaveDistributionManager {
     return newIndex;
   }
 
+  /**
+   * @dev Hook called on every move of a distribution index, the rewards between the two index
+   * values become owed to the stakers of the distribution
+   * @param oldIndex The previous index of the distribution
+   * @param newIndex The new index of the distribution
+   * @param totalStaked Total tokens staked in the distribution
+   **/
+  function _allocateRewards(
+    uint256 oldIndex,
+    uint256 newIndex,
+    uint256 totalStaked
+  ) internal virtual {}
+
   /**
    * @dev Updates the state of an user in a distribution
    * @param user The user's address
@@ -145,23 +239,95 @@ contract DistributionManager is IAaveDistributionManager {
     uint256 totalStaked
   ) internal returns (uint256) {
     AssetData storage assetData = assets[asset];
-    uint256 userIndex = assetData.users[user];
-    uint256 accruedRewards = 0;
-
     uint256 newIndex = _updateAssetStateInternal(asset, assetData, totalStaked);
+    return _updateUserIndexInternal(user, asset, assetData, stakedByUser, newIndex);
+  }
+
+  /**
+   * @dev Moves the index of an user to the already updated index of the distribution
+   * @param user The user's address
+   * @param asset The address of the reference asset of the distribution
+   * @param assetData Storage pointer to the distribution's config
+   * @param stakedByUser Amount of tokens staked by the user in the distribution at the moment
+   * @param newIndex The current index of the distribution
+   * @return The accrued rewards for the user until the moment
+   **/
+  function _updateUserIndexInternal(
+    address user,
+    address asset,
+    AssetData storage assetData,
+    uint256 stakedByUser,
+    uint256 newIndex
+  ) internal returns (uint256) {
+    uint256 userIndex = _getUserIndex(user, assetData);
+    uint256 accruedRewards = 0;
 
     if (userIndex != newIndex) {
       if (stakedByUser != 0) {
         accruedRewards = _getRewards(stakedByUser, newIndex, userIndex);
       }
 
-      assetData.users[user] = newIndex;
-      emit UserIndexUpdated(user, asset, newIndex);
+      _setUserIndex(user, assetData, newIndex);
+      _emitUserIndexUpdated(user, asset, newIndex, accruedRewards);
     }
 
     return accruedRewards;
   }
 
+  /**
+   * @dev Returns the index of an user in a distribution. Overridden to change the storage layout
+   * @param user The user's address
+   * @param assetData Storage pointer to the distribution's config
+   * @return The index of the user
+   **/
+  function _getUserIndex(address user, AssetData storage assetData)
+    internal
+    view
+    virtual
+    returns (uint256)
+  {
+    return assetData.users[user];
+  }
+
+  /**
+   * @dev Stores the index of an user in a distribution. Overridden to change the storage layout
+   * @param user The user's address
+   * @param assetData Storage pointer to the distribution's config
+   * @param newIndex The new index of the user
+   **/
+  function _setUserIndex(
+    address user,
+    AssetData storage assetData,
+    uint256 newIndex
+  ) internal virtual {
+    assetData.users[user] = newIndex;
+  }
+
+  /**
+   * @dev Logs the move of a distribution index. Overridden by the builds with reduced events
+   * @param asset The address of the reference asset of the distribution
+   * @param newIndex The new index of the distribution
+   **/
+  function _emitAssetIndexUpdated(address asset, uint256 newIndex) internal virtual {
+    emit AssetIndexUpdated(asset, newIndex);
+  }
+
+  /**
+   * @dev Logs the move of an user index. Overridden by the builds with reduced events
+   * @param user The user's address
+   * @param asset The address of the reference asset of the distribution
+   * @param newIndex The new index of the user, equal to the index of the distribution
+   * @param accruedRewards The rewards accrued by the user with the move
+   **/
+  function _emitUserIndexUpdated(
+    address user,
+    address asset,
+    uint256 newIndex,
+    uint256 accruedRewards
+  ) internal virtual {
+    emit UserIndexUpdated(user, asset, newIndex);
+  }
+
   /**
    * @dev Used by "frontend" stake contracts to update the data of an user when claiming rewards from there
    * @param user The address of the user
@@ -199,20 +365,40 @@ contract DistributionManager is IAaveDistributionManager {
     view
     returns (uint256)
   {
+    return _getUnclaimedRewardsAt(user, stakes, block.timestamp);
+  }
+
+  /**
+   * @dev Return the rewards an user will have accrued over a list of distribution by the moment,
+   * assuming the current emission and stakes stay unchanged until then
+   * @param user The address of the user
+   * @param stakes List of structs of the user data related with his stake
+   * @param timestamp The moment to project the rewards to, not earlier than the current block
+   * @return The accrued rewards for the user until the moment
+   **/
+  function _getUnclaimedRewardsAt(
+    address user,
+    DistributionTypes.UserStakeInput[] memory stakes,
+    uint256 timestamp
+  ) internal view returns (uint256) {
     uint256 accruedRewards = 0;
 
     for (uint256 i = 0; i < stakes.length; i++) {
       AssetData storage assetConfig = assets[stakes[i].underlyingAsset];
+      uint256 emissionPerSecond = assetConfig.emissionPerSecond;
       uint256 assetIndex =
-        _getAssetIndex(
-          assetConfig.index,
-          assetConfig.emissionPerSecond,
-          assetConfig.lastUpdateTimestamp,
-          stakes[i].totalStaked
-        );
+        emissionPerSecond == 0 && assetConfig.schedule.length != 0
+          ? _getScheduledAssetIndexAt(assetConfig, stakes[i].totalStaked, timestamp)
+          : _getAssetIndexAt(
+            assetConfig.index,
+            emissionPerSecond,
+            assetConfig.lastUpdateTimestamp,
+            stakes[i].totalStaked,
+            timestamp
+          );
 
       accruedRewards = accruedRewards.add(
-        _getRewards(stakes[i].stakedByUser, assetIndex, assetConfig.users[user])
+        _getRewards(stakes[i].stakedByUser, assetIndex, _getUserIndex(user, assetConfig))
       );
     }
     return accruedRewards;
@@ -246,22 +432,97 @@ contract DistributionManager is IAaveDistributionManager {
     uint256 emissionPerSecond,
     uint128 lastUpdateTimestamp,
     uint256 totalBalance
+  ) internal view returns (uint256) {
+    return
+      _getAssetIndexAt(
+        currentIndex,
+        emissionPerSecond,
+        lastUpdateTimestamp,
+        totalBalance,
+        block.timestamp
+      );
+  }
+
+  /**
+   * @dev Calculates the value of an specific distribution index at the moment, with validations
+   * @param currentIndex Current index of the distribution
+   * @param emissionPerSecond Representing the total rewards distributed per second per asset unit, on the distribution
+   * @param lastUpdateTimestamp Last moment this distribution was updated
+   * @param totalBalance of tokens considered for the distribution
+   * @param timestamp The moment to calculate the index at, not earlier than lastUpdateTimestamp
+   * @return The index at the moment.
+   **/
+  function _getAssetIndexAt(
+    uint256 currentIndex,
+    uint256 emissionPerSecond,
+    uint128 lastUpdateTimestamp,
+    uint256 totalBalance,
+    uint256 timestamp
   ) internal view returns (uint256) {
     uint256 distributionEnd = _distributionEnd;
     if (
       emissionPerSecond == 0 ||
       totalBalance == 0 ||
-      lastUpdateTimestamp == block.timestamp ||
+      lastUpdateTimestamp == timestamp ||
       lastUpdateTimestamp >= distributionEnd
     ) {
       return currentIndex;
     }
-    uint256 currentTimestamp =
-      block.timestamp > distributionEnd ? distributionEnd : block.timestamp;
+    uint256 currentTimestamp = timestamp > distributionEnd ? distributionEnd : timestamp;
     uint256 timeDelta = currentTimestamp.sub(lastUpdateTimestamp);
     return
       emissionPerSecond.mul(timeDelta).mul(10**uint256(PRECISION)).div(totalBalance).add(
         currentIndex
       );
   }
-}
\ No newline at end of file
+
+  /**
+   * @dev Calculates the value of a distribution index with an emission schedule at the moment
+   * @param assetConfig Storage pointer to the distribution's config
+   * @param totalBalance of tokens considered for the distribution
+   * @param timestamp The moment to calculate the index at, not earlier than the last update
+   * @return The index at the moment.
+   **/
+  function _getScheduledAssetIndexAt(
+    AssetData storage assetConfig,
+    uint256 totalBalance,
+    uint256 timestamp
+  ) internal view returns (uint256) {
+    uint256 currentIndex = assetConfig.index;
+    uint256 lastUpdateTimestamp = assetConfig.lastUpdateTimestamp;
+    if (totalBalance == 0 || lastUpdateTimestamp >= timestamp) {
+      return currentIndex;
+    }
+    uint256 emission = _getScheduledEmission(assetConfig.schedule, lastUpdateTimestamp, timestamp);
+    return emission.mul(10**uint256(PRECISION)).div(totalBalance).add(currentIndex);
+  }
+
+  /**
+   * @dev Calculates the total emission of a schedule over a time interval, summing up
+   * the emission of every segment overlapping the interval
+   * @param schedule Storage pointer to the packed schedule segments
+   * @param from The start of the interval
+   * @param to The end of the interval
+   * @return emission The emission over the interval
+   **/
+  function _getScheduledEmission(
+    uint256[] storage schedule,
+    uint256 from,
+    uint256 to
+  ) internal view returns (uint256 emission) {
+    uint256 segmentStart = 0;
+    for (uint256 i = 0; i < schedule.length; i++) {
+      uint256 segment = schedule[i];
+      uint256 segmentEnd = segment >> 104;
+      if (segmentEnd > from) {
+        uint256 start = from > segmentStart ? from : segmentStart;
+        uint256 end = to < segmentEnd ? to : segmentEnd;
+        emission = emission.add((segment & SCHEDULE_EMISSION_MASK).mul(end - start));
+        if (to <= segmentEnd) {
+          break;
+        }
+      }
+      segmentStart = segmentEnd;
+    }
+  }
+}
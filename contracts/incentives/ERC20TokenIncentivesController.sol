@@ -24,9 +24,18 @@ contract ERC20TokenIncentivesController is
   using SafeMath for uint256;
   using SafeERC20 for IERC20;
 
-  uint256 public constant REVISION = 1;
+  uint256 public constant REVISION = 2;
 
-  address public immutable TOKEN;
+  // the user data of the primary asset (id 1) packs the user index in bits 0-103 and the
+  // unclaimed rewards in bits 104-254, bit 255 marks the data migrated from the revision 1 layout
+  uint8 internal constant PRIMARY_ASSET_ID = 1;
+  uint256 internal constant USER_DATA_INDEX_MASK = 2**104 - 1;
+  uint256 internal constant USER_DATA_UNCLAIMED_MASK = 2**151 - 1;
+  uint256 internal constant USER_DATA_MIGRATED = 2**255;
+
+  uint256 public constant MAX_SCHEDULE_SEGMENTS = 8;
+
+  address internal immutable _token;
 
   mapping(address => uint256) internal _usersUnclaimedRewards;
 
@@ -34,6 +43,22 @@ contract ERC20TokenIncentivesController is
   // useful for contracts that hold tokens to be rewarded but don't have any native logic to claim Liquidity Mining rewards
   mapping(address => address) internal _authorizedClaimers;
 
+  // configured assets, the asset with id N is stored at index N - 1
+  address[] internal _assetsList;
+
+  // bitmap of the assets an user may have a position in, bit N is set for the asset with id N.
+  // A bit is set on any action of the user or a claim that finds a balance and cleared by a claim
+  // that finds zero balance. Users carried over from the revision 1 have no bits until then
+  mapping(address => uint256) internal _usersAssets;
+
+  // rewards allocated to stakers through the distribution indexes and not claimed yet
+  uint256 internal _rewardsLiabilities;
+
+  // index of the user in the primary asset and unclaimed rewards in one slot, so an action on the
+  // primary asset accruing rewards writes a single slot. Users are migrated from
+  // `assets[primary].users` and `_usersUnclaimedRewards` lazily, on the first write of their data
+  mapping(address => uint256) internal _usersData;
+
   modifier onlyAuthorizedClaimers(address claimer, address user) {
     require(_authorizedClaimers[user] == claimer, 'CLAIMER_UNAUTHORIZED');
     _;
@@ -42,15 +67,27 @@ contract ERC20TokenIncentivesController is
   constructor(address rewardToken, address emissionManager)
     DistributionManager(emissionManager)
   {
-    TOKEN = rewardToken;
+    _token = rewardToken;
+  }
+
+  /**
+   * @dev Returns the token distributed as rewards
+   * @return The address of the reward token
+   **/
+  function TOKEN() public view virtual returns (address) {
+    return _token;
   }
 
   /**
-   * @dev Initialize IERC20TokenIncentivesController
-   * @param addressesProvider the address of the corresponding addresses provider
+   * @dev Initialize IERC20TokenIncentivesController. A proxy upgraded from the revision 1 passes
+   * the asset it incentivizes, registered as the primary asset so its users can be migrated to the
+   * packed layout. Until then users stay in the revision 1 layout
+   * @param primaryAsset The asset incentivized by the revision 1, zero address for a new controller
    **/
-  function initialize(address addressesProvider) external initializer {
-    // no-op
+  function initialize(address primaryAsset) external initializer {
+    if (primaryAsset != address(0)) {
+      _registerAsset(primaryAsset);
+    }
   }
 
   /// @inheritdoc IAaveIncentivesController
@@ -71,20 +108,96 @@ contract ERC20TokenIncentivesController is
       require(assetsConfig[i].emissionPerSecond == emissionsPerSecond[i], 'INVALID_CONFIGURATION');
 
       assetsConfig[i].totalStaked = IScaledBalanceToken(assets[i]).scaledTotalSupply();
+
+      _registerAsset(assets[i]);
     }
     _configureAssets(assetsConfig);
   }
 
+  /**
+   * @dev Configure a schedule of emission segments for an asset, replacing its current emission
+   * @param asset The asset to incentivize
+   * @param ends The end timestamps of the segments, strictly increasing
+   * @param emissionsPerSecond The emission per second of each segment
+   */
+  function setEmissionSchedule(
+    address asset,
+    uint256[] calldata ends,
+    uint256[] calldata emissionsPerSecond
+  ) external onlyEmissionManager {
+    _registerAsset(asset);
+    _setEmissionSchedule(
+      asset,
+      IScaledBalanceToken(asset).scaledTotalSupply(),
+      ends,
+      emissionsPerSecond
+    );
+  }
+
+  /**
+   * @dev Configure a schedule of emission segments for an asset with fixed size arrays, as the
+   * Vyper RewardsManager can't pass dynamic ones. Only the first `segments` entries are used
+   * @param asset The asset to incentivize
+   * @param ends The end timestamps of the segments, strictly increasing
+   * @param emissionsPerSecond The emission per second of each segment
+   * @param segments The number of the segments
+   */
+  function setEmissionScheduleSegments(
+    address asset,
+    uint256[MAX_SCHEDULE_SEGMENTS] calldata ends,
+    uint256[MAX_SCHEDULE_SEGMENTS] calldata emissionsPerSecond,
+    uint256 segments
+  ) external onlyEmissionManager {
+    require(segments <= MAX_SCHEDULE_SEGMENTS, 'INVALID_CONFIGURATION');
+    uint256[] memory scheduleEnds = new uint256[](segments);
+    uint256[] memory scheduleEmissionsPerSecond = new uint256[](segments);
+    for (uint256 i = 0; i < segments; i++) {
+      scheduleEnds[i] = ends[i];
+      scheduleEmissionsPerSecond[i] = emissionsPerSecond[i];
+    }
+    _registerAsset(asset);
+    _setEmissionSchedule(
+      asset,
+      IScaledBalanceToken(asset).scaledTotalSupply(),
+      scheduleEnds,
+      scheduleEmissionsPerSecond
+    );
+  }
+
   /// @inheritdoc IAaveIncentivesController
   function handleAction(
     address user,
     uint256 totalSupply,
     uint256 userBalance
   ) external override {
-    uint256 accruedRewards = _updateUserAssetInternal(user, msg.sender, userBalance, totalSupply);
-    if (accruedRewards != 0) {
-      _usersUnclaimedRewards[user] = _usersUnclaimedRewards[user].add(accruedRewards);
-      emit RewardsAccrued(user, accruedRewards);
+    AssetData storage assetData = assets[msg.sender];
+    uint256 newIndex = _updateAssetStateInternal(msg.sender, assetData, totalSupply);
+    _updateUserInternal(user, msg.sender, assetData, userBalance, newIndex);
+    _trackUserAsset(user, assetData.id);
+  }
+
+  /**
+   * @dev Called by the corresponding asset on an update that affects several users at once,
+   * e.g. transfers and liquidations. The distribution index is updated only once for the batch
+   * @param users The addresses of the users
+   * @param totalSupply The total supply of the asset in the lending pool
+   * @param userBalances The balances of the users of the asset in the lending pool
+   **/
+  function handleActions(
+    address[] calldata users,
+    uint256 totalSupply,
+    uint256[] calldata userBalances
+  ) external {
+    require(users.length == userBalances.length, 'INVALID_INPUT');
+
+    AssetData storage assetData = assets[msg.sender];
+    uint256 newIndex = _updateAssetStateInternal(msg.sender, assetData, totalSupply);
+
+    uint8 assetId = assetData.id;
+
+    for (uint256 i = 0; i < users.length; i++) {
+      _updateUserInternal(users[i], msg.sender, assetData, userBalances[i], newIndex);
+      _trackUserAsset(users[i], assetId);
     }
   }
 
@@ -95,17 +208,24 @@ contract ERC20TokenIncentivesController is
     override
     returns (uint256)
   {
-    uint256 unclaimedRewards = _usersUnclaimedRewards[user];
+    return _getRewardsBalanceAt(assets, user, block.timestamp);
+  }
 
-    DistributionTypes.UserStakeInput[] memory userState =
-      new DistributionTypes.UserStakeInput[](assets.length);
-    for (uint256 i = 0; i < assets.length; i++) {
-      userState[i].underlyingAsset = assets[i];
-      (userState[i].stakedByUser, userState[i].totalStaked) = IScaledBalanceToken(assets[i])
-        .getScaledUserBalanceAndSupply(user);
-    }
-    unclaimedRewards = unclaimedRewards.add(_getUnclaimedRewards(user, userState));
-    return unclaimedRewards;
+  /**
+   * @dev Returns the total of rewards an user will have by the moment, already accrued + not yet accrued,
+   * assuming the current emission, the distribution end and the balances stay unchanged until then
+   * @param assets The assets to account the rewards for
+   * @param user The address of the user
+   * @param timestamp The moment to project the rewards to, not earlier than the current block
+   * @return The rewards
+   **/
+  function getRewardsBalanceAt(
+    address[] calldata assets,
+    address user,
+    uint256 timestamp
+  ) external view returns (uint256) {
+    require(timestamp >= block.timestamp, 'INVALID_TIMESTAMP');
+    return _getRewardsBalanceAt(assets, user, timestamp);
   }
 
   /// @inheritdoc IAaveIncentivesController
@@ -118,6 +238,20 @@ contract ERC20TokenIncentivesController is
     return _claimRewards(assets, amount, msg.sender, msg.sender, to);
   }
 
+  /**
+   * @dev Claims reward for an user on all the assets he may have a position in, accumulating the
+   * pending rewards. Assets the user doesn't hold anymore are removed from his assets, the held
+   * ones are added, so users carried over from the revision 1 are tracked after their first claim
+   * @param amount Amount of rewards to claim
+   * @param to Address that will be receiving the rewards
+   * @return Rewards claimed
+   **/
+  function claimAllRewards(uint256 amount, address to) external returns (uint256) {
+    require(to != address(0), 'INVALID_TO_ADDRESS');
+    address[] memory userAssets = _getUserAssets(msg.sender);
+    return _claimRewards(userAssets, amount, msg.sender, msg.sender, to);
+  }
+
   /// @inheritdoc IAaveIncentivesController
   function claimRewardsOnBehalf(
     address[] calldata assets,
@@ -151,12 +285,63 @@ contract ERC20TokenIncentivesController is
 
   /// @inheritdoc IAaveIncentivesController
   function getUserUnclaimedRewards(address _user) external view override returns (uint256) {
-    return _usersUnclaimedRewards[_user];
+    return _getUserUnclaimedRewards(_user);
   }
 
   /// @inheritdoc IAaveIncentivesController
   function REWARD_TOKEN() external view override returns (address) {
-    return TOKEN;
+    return TOKEN();
+  }
+
+  /**
+   * @dev Returns the assets the user may have a position in
+   * @param user The address of the user
+   * @return The assets of the user
+   **/
+  function getUserAssets(address user) external view returns (address[] memory) {
+    return _getUserAssets(user);
+  }
+
+  /**
+   * @dev Returns the rewards owed to all the users, claimable at the moment or later without any
+   * further emission, together with the rewards token balance of the controller.
+   * Emission not yet accounted in the distribution indexes is included as if the assets had
+   * stakers, so the liabilities are never underestimated.
+   * Reads the storage of every configured asset, so the cost is O(assets), bounded by the 255
+   * assets the controller may have. It's a view for off-chain monitoring and no transaction of
+   * the controller calls it, while a global emission rate would have to follow every segment of
+   * the emission schedules on chain
+   * @return liabilities The total rewards owed to the users
+   * @return balance The rewards token balance of the controller
+   **/
+  function getRewardsLiabilities() external view returns (uint256 liabilities, uint256 balance) {
+    liabilities = _rewardsLiabilities;
+    uint256 distributionEnd = _distributionEnd;
+    uint256 currentTimestamp =
+      block.timestamp > distributionEnd ? distributionEnd : block.timestamp;
+
+    for (uint256 i = 0; i < _assetsList.length; i++) {
+      AssetData storage assetConfig = assets[_assetsList[i]];
+      uint256 lastUpdateTimestamp = assetConfig.lastUpdateTimestamp;
+      if (assetConfig.emissionPerSecond == 0 && assetConfig.schedule.length != 0) {
+        liabilities = liabilities.add(
+          _getScheduledEmission(assetConfig.schedule, lastUpdateTimestamp, block.timestamp)
+        );
+      } else if (lastUpdateTimestamp < currentTimestamp) {
+        liabilities = liabilities.add(
+          uint256(assetConfig.emissionPerSecond).mul(currentTimestamp - lastUpdateTimestamp)
+        );
+      }
+    }
+    balance = IERC20(TOKEN()).balanceOf(address(this));
+  }
+
+  /**
+   * @dev Returns all the assets ever configured in the controller
+   * @return The configured assets
+   **/
+  function getAssetsList() external view returns (address[] memory) {
+    return _assetsList;
   }
 
   /**
@@ -166,6 +351,260 @@ contract ERC20TokenIncentivesController is
     return REVISION;
   }
 
+  function _getRewardsBalanceAt(
+    address[] calldata assets,
+    address user,
+    uint256 timestamp
+  ) internal view returns (uint256) {
+    uint256 unclaimedRewards = _getUserUnclaimedRewards(user);
+
+    DistributionTypes.UserStakeInput[] memory userState =
+      new DistributionTypes.UserStakeInput[](assets.length);
+    for (uint256 i = 0; i < assets.length; i++) {
+      userState[i].underlyingAsset = assets[i];
+      (userState[i].stakedByUser, userState[i].totalStaked) = IScaledBalanceToken(assets[i])
+        .getScaledUserBalanceAndSupply(user);
+    }
+    unclaimedRewards = unclaimedRewards.add(_getUnclaimedRewardsAt(user, userState, timestamp));
+    return unclaimedRewards;
+  }
+
+  /**
+   * @dev Assigns an id to the asset on its first configuration
+   * @param asset The address of the asset
+   **/
+  function _registerAsset(address asset) internal {
+    AssetData storage assetData = assets[asset];
+    if (assetData.id != 0) {
+      return;
+    }
+    require(_assetsList.length < type(uint8).max, 'TOO_MANY_ASSETS');
+    _assetsList.push(asset);
+    assetData.id = uint8(_assetsList.length);
+  }
+
+  /**
+   * @dev Marks the asset as one the user has interacted with
+   * @param user The address of the user
+   * @param assetId The id of the asset, 0 for not configured assets
+   **/
+  function _trackUserAsset(address user, uint8 assetId) internal {
+    if (assetId == 0) {
+      return;
+    }
+    uint256 userAssets = _usersAssets[user];
+    uint256 assetMask = uint256(1) << assetId;
+    if (userAssets & assetMask == 0) {
+      _usersAssets[user] = userAssets | assetMask;
+    }
+  }
+
+  function _getAssetId(address asset) internal view returns (uint8) {
+    return assets[asset].id;
+  }
+
+  /**
+   * @dev Returns the assets of the user bitmap. Users of the revision 1 only had positions in the
+   * primary asset and have an empty bitmap until they act, so the primary asset is returned for
+   * users with an empty bitmap not migrated to the packed layout yet
+   * @param user The address of the user
+   * @return The assets the user may have a position in
+   **/
+  function _getUserAssets(address user) internal view returns (address[] memory) {
+    uint256 userAssets = _usersAssets[user];
+    if (
+      userAssets == 0 && _usersData[user] & USER_DATA_MIGRATED == 0 && _assetsList.length != 0
+    ) {
+      userAssets = uint256(1) << PRIMARY_ASSET_ID;
+    }
+    uint256 assetsCount = 0;
+    for (uint256 bitmap = userAssets >> 1; bitmap != 0; bitmap >>= 1) {
+      assetsCount += bitmap & 1;
+    }
+
+    address[] memory result = new address[](assetsCount);
+    uint256 j = 0;
+    for (uint256 id = 1; j < assetsCount; id++) {
+      if (userAssets & (uint256(1) << id) != 0) {
+        result[j++] = _assetsList[id - 1];
+      }
+    }
+    return result;
+  }
+
+  /// @inheritdoc DistributionManager
+  function _allocateRewards(
+    uint256 oldIndex,
+    uint256 newIndex,
+    uint256 totalStaked
+  ) internal override {
+    _rewardsLiabilities = _rewardsLiabilities.add(_getRewards(totalStaked, newIndex, oldIndex));
+  }
+
+  /**
+   * @dev Moves the index of an user in a distribution and adds the accrued rewards to his unclaimed
+   * rewards. On the primary asset both are stored with a single write of the packed user data
+   * @param user The address of the user
+   * @param asset The address of the reference asset of the distribution
+   * @param assetData Storage pointer to the distribution's config
+   * @param stakedByUser Amount of tokens staked by the user in the distribution at the moment
+   * @param newIndex The current index of the distribution
+   **/
+  function _updateUserInternal(
+    address user,
+    address asset,
+    AssetData storage assetData,
+    uint256 stakedByUser,
+    uint256 newIndex
+  ) internal {
+    if (assetData.id != PRIMARY_ASSET_ID) {
+      _accrueRewards(
+        user,
+        _updateUserIndexInternal(user, asset, assetData, stakedByUser, newIndex)
+      );
+      return;
+    }
+
+    uint256 userIndex = _getUserIndex(user, assetData);
+    if (userIndex == newIndex) {
+      return;
+    }
+    uint256 accruedRewards = 0;
+    if (stakedByUser != 0) {
+      accruedRewards = _getRewards(stakedByUser, newIndex, userIndex);
+    }
+    // the primary asset is registered, so the user is always migrated here
+    (uint256 userData, ) = _loadUserData(user);
+    _usersData[user] = _packUserData(
+      newIndex,
+      ((userData >> 104) & USER_DATA_UNCLAIMED_MASK).add(accruedRewards)
+    );
+    _emitUserIndexUpdated(user, asset, newIndex, accruedRewards);
+    if (accruedRewards != 0) {
+      _emitRewardsAccrued(user, accruedRewards);
+    }
+  }
+
+  /**
+   * @dev Adds rewards accrued by an user to his unclaimed rewards
+   * @param user The address of the user
+   * @param accruedRewards Amount of the accrued rewards
+   **/
+  function _accrueRewards(address user, uint256 accruedRewards) internal {
+    if (accruedRewards != 0) {
+      (uint256 userData, bool migrated) = _loadUserData(user);
+      if (migrated) {
+        _usersData[user] = _packUserData(
+          userData & USER_DATA_INDEX_MASK,
+          ((userData >> 104) & USER_DATA_UNCLAIMED_MASK).add(accruedRewards)
+        );
+      } else {
+        _usersUnclaimedRewards[user] = _usersUnclaimedRewards[user].add(accruedRewards);
+      }
+      _emitRewardsAccrued(user, accruedRewards);
+    }
+  }
+
+  /// @inheritdoc DistributionManager
+  function _getUserIndex(address user, AssetData storage assetData)
+    internal
+    view
+    override
+    returns (uint256)
+  {
+    if (assetData.id == PRIMARY_ASSET_ID) {
+      uint256 userData = _usersData[user];
+      if (userData & USER_DATA_MIGRATED != 0) {
+        return userData & USER_DATA_INDEX_MASK;
+      }
+    }
+    return assetData.users[user];
+  }
+
+  /// @inheritdoc DistributionManager
+  function _setUserIndex(
+    address user,
+    AssetData storage assetData,
+    uint256 newIndex
+  ) internal override {
+    if (assetData.id != PRIMARY_ASSET_ID) {
+      assetData.users[user] = newIndex;
+      return;
+    }
+    // the primary asset is registered, so the user is always migrated here
+    (uint256 userData, ) = _loadUserData(user);
+    _usersData[user] = (userData & ~USER_DATA_INDEX_MASK) | newIndex;
+  }
+
+  /**
+   * @dev Returns the rewards accrued by an user and not claimed yet
+   * @param user The address of the user
+   * @return The unclaimed rewards
+   **/
+  function _getUserUnclaimedRewards(address user) internal view returns (uint256) {
+    uint256 userData = _usersData[user];
+    if (userData & USER_DATA_MIGRATED != 0) {
+      return (userData >> 104) & USER_DATA_UNCLAIMED_MASK;
+    }
+    return _usersUnclaimedRewards[user];
+  }
+
+  /**
+   * @dev Stores the rewards accrued by an user and not claimed yet
+   * @param user The address of the user
+   * @param unclaimedRewards The unclaimed rewards
+   **/
+  function _setUserUnclaimedRewards(address user, uint256 unclaimedRewards) internal {
+    (uint256 userData, bool migrated) = _loadUserData(user);
+    if (migrated) {
+      _usersData[user] = _packUserData(userData & USER_DATA_INDEX_MASK, unclaimedRewards);
+    } else {
+      _usersUnclaimedRewards[user] = unclaimedRewards;
+    }
+  }
+
+  /**
+   * @dev Returns the packed data of an user to be overwritten. Data of a not migrated user is
+   * built from the revision 1 layout and the old slots are cleared, the caller must store the result.
+   * Users aren't migrated while no primary asset is registered, as their index in it is unknown
+   * @param user The address of the user
+   * @return userData The packed data of the user
+   * @return migrated False if the user stays in the revision 1 layout, the caller must write there
+   **/
+  function _loadUserData(address user) internal returns (uint256 userData, bool migrated) {
+    userData = _usersData[user];
+    if (userData & USER_DATA_MIGRATED != 0) {
+      return (userData, true);
+    }
+    if (_assetsList.length == 0) {
+      return (0, false);
+    }
+    AssetData storage primaryAssetData = assets[_assetsList[PRIMARY_ASSET_ID - 1]];
+    uint256 index = primaryAssetData.users[user];
+    if (index != 0) {
+      delete primaryAssetData.users[user];
+    }
+    uint256 unclaimedRewards = _usersUnclaimedRewards[user];
+    if (unclaimedRewards != 0) {
+      delete _usersUnclaimedRewards[user];
+    }
+    return (_packUserData(index, unclaimedRewards), true);
+  }
+
+  function _packUserData(uint256 index, uint256 unclaimedRewards) internal pure returns (uint256) {
+    require(unclaimedRewards <= USER_DATA_UNCLAIMED_MASK, 'UNCLAIMED_REWARDS_OVERFLOW');
+    return USER_DATA_MIGRATED | (unclaimedRewards << 104) | index;
+  }
+
+  /**
+   * @dev Logs rewards accrued by an user. Overridden by the builds with reduced events
+   * @param user The address of the user
+   * @param accruedRewards Amount of the accrued rewards
+   **/
+  function _emitRewardsAccrued(address user, uint256 accruedRewards) internal virtual {
+    emit RewardsAccrued(user, accruedRewards);
+  }
+
   /**
    * @dev Claims reward for an user on behalf, on all the assets of the lending pool, accumulating the pending rewards.
    * @param amount Amount of rewards to claim
@@ -174,7 +613,7 @@ contract ERC20TokenIncentivesController is
    * @return Rewards claimed
    **/
   function _claimRewards(
-    address[] calldata assets,
+    address[] memory assets,
     uint256 amount,
     address claimer,
     address user,
@@ -183,7 +622,9 @@ contract ERC20TokenIncentivesController is
     if (amount == 0) {
       return 0;
     }
-    uint256 unclaimedRewards = _usersUnclaimedRewards[user];
+    uint256 unclaimedRewards = _getUserUnclaimedRewards(user);
+    uint256 userAssets = _usersAssets[user];
+    uint256 heldAssets = userAssets;
 
     DistributionTypes.UserStakeInput[] memory userState =
       new DistributionTypes.UserStakeInput[](assets.length);
@@ -191,12 +632,22 @@ contract ERC20TokenIncentivesController is
       userState[i].underlyingAsset = assets[i];
       (userState[i].stakedByUser, userState[i].totalStaked) = IScaledBalanceToken(assets[i])
         .getScaledUserBalanceAndSupply(user);
+      uint8 assetId = _getAssetId(assets[i]);
+      if (userState[i].stakedByUser == 0) {
+        // rewards of the asset are fully accrued below, the asset may be forgotten
+        heldAssets &= ~(uint256(1) << assetId);
+      } else if (assetId != 0) {
+        heldAssets |= uint256(1) << assetId;
+      }
     }
 
     uint256 accruedRewards = _claimRewards(user, userState);
+    if (heldAssets != userAssets) {
+      _usersAssets[user] = heldAssets;
+    }
     if (accruedRewards != 0) {
       unclaimedRewards = unclaimedRewards.add(accruedRewards);
-      emit RewardsAccrued(user, accruedRewards);
+      _emitRewardsAccrued(user, accruedRewards);
     }
 
     if (unclaimedRewards == 0) {
@@ -204,9 +655,14 @@ contract ERC20TokenIncentivesController is
     }
 
     uint256 amountToClaim = amount > unclaimedRewards ? unclaimedRewards : amount;
-    _usersUnclaimedRewards[user] = unclaimedRewards - amountToClaim; // Safe due to the previous line
-
-    IERC20(TOKEN).transfer(to, amountToClaim);
+    _setUserUnclaimedRewards(user, unclaimedRewards - amountToClaim); // Safe due to the previous line
+    // rewards accrued before the liabilities were tracked are not accounted in them
+    uint256 rewardsLiabilities = _rewardsLiabilities;
+    _rewardsLiabilities = rewardsLiabilities > amountToClaim
+      ? rewardsLiabilities - amountToClaim
+      : 0;
+
+    IERC20(TOKEN()).transfer(to, amountToClaim);
     emit RewardsClaimed(user, to, claimer, amountToClaim);
 
     return amountToClaim;
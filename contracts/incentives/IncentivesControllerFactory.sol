@@ -0,0 +1,89 @@
+// SPDX-License-Identifier: agpl-3.0
+pragma solidity 0.7.5;
+pragma experimental ABIEncoderV2;
+
+import {ClonableIncentivesController} from './ClonableIncentivesController.sol';
+
+/**
+ * @title IncentivesControllerFactory
+ * @notice Deploys EIP-1167 minimal clones of a shared ClonableIncentivesController, one per
+ * incentivized reserve, and keeps the registry of the deployed controllers
+ **/
+contract IncentivesControllerFactory {
+  struct ControllerInfo {
+    address controller;
+    address asset;
+    address rewardToken;
+    address emissionManager;
+  }
+
+  event ControllerCreated(
+    address indexed controller,
+    address indexed asset,
+    address rewardToken,
+    address emissionManager
+  );
+
+  address public immutable IMPLEMENTATION;
+
+  address public immutable OWNER;
+
+  ControllerInfo[] internal _controllers;
+
+  mapping(address => address) public controllerOfAsset;
+
+  constructor(address implementation, address owner) {
+    IMPLEMENTATION = implementation;
+    OWNER = owner;
+  }
+
+  /**
+   * @dev Deploys and initializes a controller clone for the reserve
+   * @param asset The asset incentivized by the controller, one controller per asset
+   * @param rewardToken The token distributed as rewards
+   * @param emissionManager The address allowed to configure the distributions
+   * @return controller The address of the new controller
+   **/
+  function createController(
+    address asset,
+    address rewardToken,
+    address emissionManager
+  ) external returns (address controller) {
+    require(msg.sender == OWNER, 'ONLY_OWNER');
+    require(controllerOfAsset[asset] == address(0), 'CONTROLLER_EXISTS');
+
+    controller = _clone(IMPLEMENTATION);
+    ClonableIncentivesController(controller).initializeClone(rewardToken, emissionManager);
+
+    _controllers.push(ControllerInfo(controller, asset, rewardToken, emissionManager));
+    controllerOfAsset[asset] = controller;
+    emit ControllerCreated(controller, asset, rewardToken, emissionManager);
+  }
+
+  /**
+   * @dev Returns all the controllers deployed by the factory
+   * @return The controllers with their assets, reward tokens and emission managers
+   **/
+  function getControllers() external view returns (ControllerInfo[] memory) {
+    return _controllers;
+  }
+
+  /**
+   * @dev Returns the number of the controllers deployed by the factory
+   * @return The number of the controllers
+   **/
+  function getControllersCount() external view returns (uint256) {
+    return _controllers.length;
+  }
+
+  function _clone(address implementation) internal returns (address instance) {
+    assembly {
+      let ptr := mload(0x40)
+      mstore(ptr, 0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000)
+      mstore(add(ptr, 0x14), shl(0x60, implementation))
+      mstore(add(ptr, 0x28), 0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000)
+      instance := create(0, ptr, 0x37)
+    }
+    require(instance != address(0), 'CLONE_FAILED');
+  }
+}
@@ -0,0 +1,28 @@
+// SPDX-License-Identifier: agpl-3.0
+pragma solidity 0.7.5;
+pragma experimental ABIEncoderV2;
+
+import {ERC20TokenIncentivesController} from './ERC20TokenIncentivesController.sol';
+
+/**
+ * @title NoEventsIncentivesController
+ * @notice ERC20TokenIncentivesController logging nothing on index moves and accruals. Only the
+ * configuration events and RewardsClaimed are kept, the per-user state has to be replayed from
+ * the handleAction calldata (see monitoring/reconstruct.py)
+ **/
+contract NoEventsIncentivesController is ERC20TokenIncentivesController {
+  constructor(address rewardToken, address emissionManager)
+    ERC20TokenIncentivesController(rewardToken, emissionManager)
+  {}
+
+  function _emitAssetIndexUpdated(address, uint256) internal override {}
+
+  function _emitUserIndexUpdated(
+    address,
+    address,
+    uint256,
+    uint256
+  ) internal override {}
+
+  function _emitRewardsAccrued(address, uint256) internal override {}
+}
@@ -0,0 +1,148 @@
+// SPDX-License-Identifier: agpl-3.0
+pragma solidity 0.7.5;
+
+import {SafeMath} from '../lib/SafeMath.sol';
+import {IERC20} from '../interfaces/IERC20.sol';
+import {IScaledBalanceToken} from '../interfaces/IScaledBalanceToken.sol';
+import {VersionedInitializable} from '../utils/VersionedInitializable.sol';
+
+/**
+ * @title IncentivesControllerRevision1Mock
+ * @notice The revision 1 of ERC20TokenIncentivesController with its storage layout, reduced to
+ * the calls of the upgrade tests: one asset, no claims on behalf
+ **/
+contract IncentivesControllerRevision1Mock is VersionedInitializable {
+  using SafeMath for uint256;
+
+  struct AssetData {
+    uint104 emissionPerSecond;
+    uint104 index;
+    uint40 lastUpdateTimestamp;
+    mapping(address => uint256) users;
+  }
+
+  uint256 public constant REVISION = 1;
+
+  uint8 public constant PRECISION = 18;
+
+  address public immutable TOKEN;
+
+  address public immutable EMISSION_MANAGER;
+
+  mapping(address => AssetData) public assets;
+
+  uint256 internal _distributionEnd;
+
+  mapping(address => uint256) internal _usersUnclaimedRewards;
+
+  mapping(address => address) internal _authorizedClaimers;
+
+  constructor(address rewardToken, address emissionManager) {
+    TOKEN = rewardToken;
+    EMISSION_MANAGER = emissionManager;
+  }
+
+  function initialize(address addressesProvider) external initializer {
+    // no-op
+  }
+
+  function setDistributionEnd(uint256 distributionEnd) external {
+    require(msg.sender == EMISSION_MANAGER, 'ONLY_EMISSION_MANAGER');
+    _distributionEnd = distributionEnd;
+  }
+
+  function configureAssets(address[1] calldata assetsToConfigure, uint256[1] calldata emissionsPerSecond)
+    external
+  {
+    require(msg.sender == EMISSION_MANAGER, 'ONLY_EMISSION_MANAGER');
+    address asset = assetsToConfigure[0];
+    AssetData storage assetData = assets[asset];
+    _updateAssetState(assetData, IScaledBalanceToken(asset).scaledTotalSupply());
+    assetData.emissionPerSecond = uint104(emissionsPerSecond[0]);
+  }
+
+  function handleAction(
+    address user,
+    uint256 totalSupply,
+    uint256 userBalance
+  ) external {
+    uint256 accruedRewards = _updateUser(user, msg.sender, userBalance, totalSupply);
+    if (accruedRewards != 0) {
+      _usersUnclaimedRewards[user] = _usersUnclaimedRewards[user].add(accruedRewards);
+    }
+  }
+
+  function claimRewards(
+    address[] calldata assetsToClaim,
+    uint256 amount,
+    address to
+  ) external returns (uint256) {
+    uint256 unclaimedRewards = _usersUnclaimedRewards[msg.sender];
+    for (uint256 i = 0; i < assetsToClaim.length; i++) {
+      (uint256 stakedByUser, uint256 totalStaked) =
+        IScaledBalanceToken(assetsToClaim[i]).getScaledUserBalanceAndSupply(msg.sender);
+      unclaimedRewards = unclaimedRewards.add(
+        _updateUser(msg.sender, assetsToClaim[i], stakedByUser, totalStaked)
+      );
+    }
+    uint256 amountToClaim = amount > unclaimedRewards ? unclaimedRewards : amount;
+    _usersUnclaimedRewards[msg.sender] = unclaimedRewards - amountToClaim;
+    IERC20(TOKEN).transfer(to, amountToClaim);
+    return amountToClaim;
+  }
+
+  function getUserAssetData(address user, address asset) external view returns (uint256) {
+    return assets[asset].users[user];
+  }
+
+  function getUserUnclaimedRewards(address user) external view returns (uint256) {
+    return _usersUnclaimedRewards[user];
+  }
+
+  function getRevision() internal pure override returns (uint256) {
+    return REVISION;
+  }
+
+  function _updateUser(
+    address user,
+    address asset,
+    uint256 stakedByUser,
+    uint256 totalStaked
+  ) internal returns (uint256 accruedRewards) {
+    AssetData storage assetData = assets[asset];
+    uint256 newIndex = _updateAssetState(assetData, totalStaked);
+    uint256 userIndex = assetData.users[user];
+    if (userIndex != newIndex) {
+      accruedRewards = stakedByUser.mul(newIndex.sub(userIndex)) / 10**uint256(PRECISION);
+      assetData.users[user] = newIndex;
+    }
+  }
+
+  function _updateAssetState(AssetData storage assetData, uint256 totalStaked)
+    internal
+    returns (uint256)
+  {
+    uint256 oldIndex = assetData.index;
+    uint256 lastUpdateTimestamp = assetData.lastUpdateTimestamp;
+    uint256 distributionEnd = _distributionEnd;
+    if (
+      block.timestamp == lastUpdateTimestamp ||
+      assetData.emissionPerSecond == 0 ||
+      totalStaked == 0 ||
+      lastUpdateTimestamp >= distributionEnd
+    ) {
+      assetData.lastUpdateTimestamp = uint40(block.timestamp);
+      return oldIndex;
+    }
+    uint256 currentTimestamp = block.timestamp > distributionEnd ? distributionEnd : block.timestamp;
+    uint256 newIndex =
+      uint256(assetData.emissionPerSecond)
+        .mul(currentTimestamp - lastUpdateTimestamp)
+        .mul(10**uint256(PRECISION))
+        .div(totalStaked)
+        .add(oldIndex);
+    assetData.index = uint104(newIndex);
+    assetData.lastUpdateTimestamp = uint40(block.timestamp);
+    return newIndex;
+  }
+}
@@ -2,10 +2,20 @@
 pragma solidity 0.7.5;
 
 import {IScaledBalanceToken} from '../interfaces/IScaledBalanceToken.sol';
+import {IAaveIncentivesController} from '../interfaces/IAaveIncentivesController.sol';
+
+interface IBatchedIncentivesController {
+  function handleActions(
+    address[] calldata users,
+    uint256 totalSupply,
+    uint256[] calldata userBalances
+  ) external;
+}
 
 contract ScaledBalanceTokenMock is IScaledBalanceToken {
     uint256 public totalSupply;
     mapping(address => uint256) balances;
+    IAaveIncentivesController public incentivesController;
   /**
    * @dev Returns the scaled balance of the user. The scaled balance is the sum of all the
    * updated stored balance divided by the reserve's liquidity index at the moment of the update
@@ -34,13 +44,103 @@ contract ScaledBalanceTokenMock is IScaledBalanceToken {
       return totalSupply;
   }
 
+  /**
+   * @dev Sets the incentives controller notified on every balance change, as aTokens do.
+   * Zero address disables notifications
+   * @param controller The address of the incentives controller
+   **/
+  function setIncentivesController(address controller) external {
+      incentivesController = IAaveIncentivesController(controller);
+  }
+
   function mint(address user, uint256 amount) external {
-      balances[user] += amount;
-      totalSupply += amount;
+      _mint(user, amount);
   }
 
   function burn(address user, uint256 amount) external {
-      balances[user] -= amount;
-      totalSupply += amount;
+      _burn(user, amount);
+  }
+
+  function transfer(address from, address to, uint256 amount) external {
+      _transfer(from, to, amount);
+  }
+
+  /**
+   * @dev Transfers as `transfer` does, notifying the incentives controller of the sender and
+   * the receiver with one handleActions call
+   **/
+  function transferBatched(address from, address to, uint256 amount) external {
+      uint256 oldFromBalance = balances[from];
+      uint256 oldToBalance = balances[to];
+      require(oldFromBalance >= amount, 'TRANSFER_EXCEEDS_BALANCE');
+      require(from != to, 'SELF_TRANSFER');
+      balances[from] = oldFromBalance - amount;
+      balances[to] = oldToBalance + amount;
+      address[] memory users = new address[](2);
+      uint256[] memory userBalances = new uint256[](2);
+      (users[0], users[1]) = (from, to);
+      (userBalances[0], userBalances[1]) = (oldFromBalance, oldToBalance);
+      IBatchedIncentivesController(address(incentivesController)).handleActions(
+          users, totalSupply, userBalances);
+  }
+
+  function mintBatch(address[] calldata users, uint256[] calldata amounts) external {
+      require(users.length == amounts.length, 'INVALID_INPUT');
+      for (uint256 i = 0; i < users.length; i++) {
+          _mint(users[i], amounts[i]);
+      }
+  }
+
+  function burnBatch(address[] calldata users, uint256[] calldata amounts) external {
+      require(users.length == amounts.length, 'INVALID_INPUT');
+      for (uint256 i = 0; i < users.length; i++) {
+          _burn(users[i], amounts[i]);
+      }
+  }
+
+  function transferBatch(
+      address[] calldata from,
+      address[] calldata to,
+      uint256[] calldata amounts
+  ) external {
+      require(from.length == to.length && from.length == amounts.length, 'INVALID_INPUT');
+      for (uint256 i = 0; i < from.length; i++) {
+          _transfer(from[i], to[i], amounts[i]);
+      }
+  }
+
+  function _mint(address user, uint256 amount) internal {
+      uint256 oldTotalSupply = totalSupply;
+      uint256 oldUserBalance = balances[user];
+      balances[user] = oldUserBalance + amount;
+      totalSupply = oldTotalSupply + amount;
+      _handleAction(user, oldTotalSupply, oldUserBalance);
+  }
+
+  function _burn(address user, uint256 amount) internal {
+      uint256 oldTotalSupply = totalSupply;
+      uint256 oldUserBalance = balances[user];
+      require(oldUserBalance >= amount, 'BURN_EXCEEDS_BALANCE');
+      balances[user] = oldUserBalance - amount;
+      totalSupply = oldTotalSupply - amount;
+      _handleAction(user, oldTotalSupply, oldUserBalance);
+  }
+
+  function _transfer(address from, address to, uint256 amount) internal {
+      uint256 oldFromBalance = balances[from];
+      uint256 oldToBalance = balances[to];
+      require(oldFromBalance >= amount, 'TRANSFER_EXCEEDS_BALANCE');
+      balances[from] = oldFromBalance - amount;
+      balances[to] = balances[to] + amount;
+      _handleAction(from, totalSupply, oldFromBalance);
+      if (from != to) {
+          _handleAction(to, totalSupply, oldToBalance);
+      }
+  }
+
+  function _handleAction(address user, uint256 oldTotalSupply, uint256 oldUserBalance) internal {
+      if (address(incentivesController) != address(0)) {
+          incentivesController.handleAction(user, oldTotalSupply, oldUserBalance);
+      }
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,134 @@
+// SPDX-License-Identifier: agpl-3.0
+pragma solidity 0.7.5;
+
+import {Address} from '../lib/Address.sol';
+
+/**
+ * @title MinimalUpgradeabilityProxy
+ * @notice Upgradeable proxy keeping the implementation and the admin in the EIP-1967 slots.
+ * Unlike the transparent proxy, the fallback forwards every call without checking the caller,
+ * so the hot path costs a single storage read and the delegatecall. The admin functions are
+ * the only selectors served by the proxy itself, the implementation must not define them.
+ **/
+contract MinimalUpgradeabilityProxy {
+  // bytes32(uint256(keccak256('eip1967.proxy.implementation')) - 1)
+  bytes32 internal constant IMPLEMENTATION_SLOT =
+    0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc;
+
+  // bytes32(uint256(keccak256('eip1967.proxy.admin')) - 1)
+  bytes32 internal constant ADMIN_SLOT =
+    0xb53127684a568b3173ae13b9f8a6016e243e63b6e8ee1178d6a717850b5d6103;
+
+  event Upgraded(address indexed implementation);
+
+  event AdminChanged(address previousAdmin, address newAdmin);
+
+  modifier onlyProxyAdmin() {
+    require(msg.sender == _getAdmin(), 'CALLER_NOT_PROXY_ADMIN');
+    _;
+  }
+
+  /**
+   * @dev Sets the implementation and the admin and calls the implementation with the data
+   * @param implementation The address of the initial implementation
+   * @param admin The address allowed to upgrade the proxy
+   * @param data The calldata of the initialization call, skipped if empty
+   **/
+  constructor(
+    address implementation,
+    address admin,
+    bytes memory data
+  ) {
+    _setAdmin(admin);
+    _upgradeToAndCall(implementation, data);
+  }
+
+  /**
+   * @dev Returns the address of the proxy admin
+   * @return The address of the admin
+   **/
+  function proxyAdmin() external view returns (address) {
+    return _getAdmin();
+  }
+
+  /**
+   * @dev Returns the address of the current implementation
+   * @return The address of the implementation
+   **/
+  function proxyImplementation() external view returns (address) {
+    return _getImplementation();
+  }
+
+  /**
+   * @dev Upgrades the proxy to a new implementation and calls it with the data
+   * @param implementation The address of the new implementation
+   * @param data The calldata of the initialization call, skipped if empty
+   **/
+  function upgradeProxyToAndCall(address implementation, bytes calldata data)
+    external
+    onlyProxyAdmin
+  {
+    _upgradeToAndCall(implementation, data);
+  }
+
+  /**
+   * @dev Transfers the right to upgrade the proxy
+   * @param admin The address of the new admin
+   **/
+  function changeProxyAdmin(address admin) external onlyProxyAdmin {
+    _setAdmin(admin);
+  }
+
+  fallback() external payable {
+    address implementation = _getImplementation();
+    assembly {
+      calldatacopy(0, 0, calldatasize())
+      let result := delegatecall(gas(), implementation, 0, calldatasize(), 0, 0)
+      returndatacopy(0, 0, returndatasize())
+      switch result
+        case 0 {
+          revert(0, returndatasize())
+        }
+        default {
+          return(0, returndatasize())
+        }
+    }
+  }
+
+  function _upgradeToAndCall(address implementation, bytes memory data) internal {
+    require(Address.isContract(implementation), 'IMPLEMENTATION_NOT_CONTRACT');
+    bytes32 slot = IMPLEMENTATION_SLOT;
+    assembly {
+      sstore(slot, implementation)
+    }
+    emit Upgraded(implementation);
+
+    if (data.length > 0) {
+      (bool success, ) = implementation.delegatecall(data);
+      require(success, 'INITIALIZATION_FAILED');
+    }
+  }
+
+  function _setAdmin(address admin) internal {
+    require(admin != address(0), 'INVALID_ADMIN');
+    emit AdminChanged(_getAdmin(), admin);
+    bytes32 slot = ADMIN_SLOT;
+    assembly {
+      sstore(slot, admin)
+    }
+  }
+
+  function _getImplementation() internal view returns (address implementation) {
+    bytes32 slot = IMPLEMENTATION_SLOT;
+    assembly {
+      implementation := sload(slot)
+    }
+  }
+
+  function _getAdmin() internal view returns (address admin) {
+    bytes32 slot = ADMIN_SLOT;
+    assembly {
+      admin := sload(slot)
+    }
+  }
+}
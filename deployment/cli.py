@@ -0,0 +1,152 @@
+"""
+Operations CLI for the incentives contracts.
+
+    python -m deployment.cli status --rpc <url> --state deployment_state.json
+    python -m deployment.cli claim-report --rpc <url> --controller <address> <user> ...
+    python -m deployment.cli deploy <config.json> --network mainnet --account deployer
+    python -m deployment.cli rollover --network mainnet --account initializer --state ...
+
+Read-only commands talk JSON-RPC through monitoring.client and never import
+brownie. Brownie, the project and the network are loaded only by the commands
+which send transactions.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+PROJECT_PATH = Path(__file__).resolve().parent.parent
+
+
+def _state_addresses(state_path):
+    steps = json.loads(Path(state_path).read_text())['steps']
+    return {step: data.get('address') for step, data in steps.items()}
+
+
+def _resolve(args, name, *steps):
+    """
+    Address from the command line argument or the first of the deployment steps
+    found in the state file.
+    """
+    address = getattr(args, name)
+    if address is None and args.state is not None:
+        addresses = _state_addresses(args.state)
+        address = next((addresses[step] for step in steps if step in addresses), None)
+    if address is None:
+        raise SystemExit(f'--{name.replace("_", "-")} or --state with "{steps[0]}" is required')
+    return address
+
+
+def _load_brownie(network_name):
+    from brownie import network, project
+    brownie_project = project.load(PROJECT_PATH)
+    brownie_project.load_config()
+    network.connect(network_name)
+    return brownie_project
+
+
+async def _status(args):
+    from monitoring.client import (
+        ContractReader, IncentivesControllerReader, RewardsManagerReader, RpcClient)
+    rewards_manager_address = _resolve(args, 'rewards_manager', 'rewards_manager')
+    async with RpcClient(args.rpc) as client:
+        block = await client.block_number()
+        status = await RewardsManagerReader(client, rewards_manager_address).get_status(block)
+        controller = IncentivesControllerReader(client, status['rewards_contract'])
+        status['distribution_end'] = await controller.get_distribution_end(block)
+        [status['liabilities'], status['balance']] = await controller.read(
+            'getRewardsLiabilities()', [], [], ['uint256', 'uint256'], block)
+        status['asset_data'] = await controller.get_asset_data(status['staking_token'], block)
+        status['total_staked'] = await ContractReader(client, status['staking_token']).read(
+            'scaledTotalSupply()', [], [], ['uint256'], block)
+    print(f'block: {block}')
+    for name, value in status.items():
+        print(f'{name}: {value}')
+
+
+async def _claim_report(args):
+    from monitoring.client import IncentivesControllerReader, RpcClient
+    controller_address = _resolve(args, 'controller', 'proxy', 'implementation')
+    async with RpcClient(args.rpc) as client:
+        block = await client.block_number()
+        controller = IncentivesControllerReader(client, controller_address)
+        assets = await controller.read('getAssetsList()', [], [], ['address[]'], block)
+        balances = await controller.get_rewards_balances(assets, args.users, block)
+        unclaimed = await controller.get_users_unclaimed_rewards(args.users, block)
+    print(f'{"user":<44}{"unclaimed":>26}{"claimable":>26}')
+    for user in args.users:
+        print(f'{user:<44}{unclaimed[user]:>26}{balances[user]:>26}')
+    print(f'{"total":<44}{sum(unclaimed.values()):>26}{sum(balances.values()):>26}')
+
+
+def status(args):
+    asyncio.run(_status(args))
+
+
+def claim_report(args):
+    asyncio.run(_claim_report(args))
+
+
+def deploy(args):
+    _load_brownie(args.network)
+    from brownie import accounts
+    from deployment.deploy import run_deployment
+    [rewards_manager, incentives_controller] = run_deployment(
+        args.config, args.state or 'deployment_state.json', accounts.load(args.account))
+    print('RewardsManager:', rewards_manager.address)
+    print('ERC20TokenIncentivesController (proxy):', incentives_controller.address)
+
+
+def rollover(args):
+    rewards_manager_address = _resolve(args, 'rewards_manager', 'rewards_manager')
+    _load_brownie(args.network)
+    from brownie import RewardsManager, accounts
+    rewards_manager = RewardsManager.at(rewards_manager_address)
+    if not rewards_manager.is_rewards_period_finished():
+        raise SystemExit(
+            f'rewards period is not finished till {rewards_manager.period_finish()}')
+    tx = rewards_manager.start_next_rewards_period({'from': accounts.load(args.account)})
+    print('new period finish:', rewards_manager.period_finish(), 'tx:', tx.txid)
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    status_parser = commands.add_parser('status', help='rewards manager and controller state')
+    status_parser.add_argument('--rpc', default='http://127.0.0.1:8545')
+    status_parser.add_argument('--state')
+    status_parser.add_argument('--rewards-manager')
+    status_parser.set_defaults(handler=status)
+
+    report_parser = commands.add_parser('claim-report', help='rewards claimable by the users')
+    report_parser.add_argument('--rpc', default='http://127.0.0.1:8545')
+    report_parser.add_argument('--state')
+    report_parser.add_argument('--controller')
+    report_parser.add_argument('users', nargs='+')
+    report_parser.set_defaults(handler=claim_report)
+
+    deploy_parser = commands.add_parser('deploy', help='deploy or resume a deployment')
+    deploy_parser.add_argument('config')
+    deploy_parser.add_argument('--state')
+    deploy_parser.add_argument('--network', default='mainnet')
+    deploy_parser.add_argument('--account', default='deployer')
+    deploy_parser.set_defaults(handler=deploy)
+
+    rollover_parser = commands.add_parser('rollover', help='start the next rewards period')
+    rollover_parser.add_argument('--state')
+    rollover_parser.add_argument('--rewards-manager')
+    rollover_parser.add_argument('--network', default='mainnet')
+    rollover_parser.add_argument('--account', required=True)
+    rollover_parser.set_defaults(handler=rollover)
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,5 +1,40 @@
-from brownie import ERC20TokenIncentivesController
-from brownie import ZERO_ADDRESS
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+from brownie import ClonableIncentivesController, ERC20TokenIncentivesController
+from brownie import IncentivesControllerFactory, MinimalUpgradeabilityProxy, RewardsManager
+from brownie import ZERO_ADDRESS, Contract, accounts, chain, config, history, project
+
+# 'aave': behind the Aave InitializableAdminUpgradeabilityProxy
+# 'eip1967': behind MinimalUpgradeabilityProxy, no admin check on every call
+# 'immutable': no proxy, the controller can't be upgraded
+PROXY_MODES = ['aave', 'eip1967', 'immutable']
+
+
+aave_project = None
+
+
+def load_dependency_contract(name):
+    global aave_project
+    if aave_project is None:
+        aave_project = project.load(Path.home() / ".brownie" /
+                                    "packages" / config["dependencies"][0])
+    return getattr(aave_project, name)
+
+
+@contextmanager
+def undone_transactions():
+    """
+    Undoes the transactions sent inside the block on exit. Unlike chain.snapshot, it
+    doesn't take the snapshot slot of brownie that the test isolation relies on.
+    """
+    sent = len(history)
+    try:
+        yield
+    finally:
+        if len(history) > sent:
+            chain.undo(len(history) - sent)
 
 
 def deploy_implementation(reward_token, emission_manager, tx_params):
@@ -7,8 +42,249 @@ def deploy_implementation(reward_token, emission_manager, tx_params):
         reward_token, emission_manager, tx_params)
 
 
-# def deploy_and_init_proxy(admin, implementation, tx_params):
-#     proxy = InitializableAdminUpgradeabilityProxy.deploy(tx_params)
-#     proxy.initialize(implementation, admin,
-#                      implementation.initialize.encode_input(ZERO_ADDRESS), tx_params)
-#     return proxy
+def deploy_and_init_proxy(admin, implementation, tx_params):
+    InitializableAdminUpgradeabilityProxy = load_dependency_contract(
+        'InitializableAdminUpgradeabilityProxy')
+    proxy = InitializableAdminUpgradeabilityProxy.deploy(tx_params)
+    proxy.initialize(implementation, admin,
+                     implementation.initialize.encode_input(ZERO_ADDRESS), tx_params)
+    return proxy
+
+
+def deploy_controller(reward_token, emission_manager, proxy_admin, tx_params, proxy_mode='aave'):
+    """
+    Deploys ERC20TokenIncentivesController in one of PROXY_MODES and returns
+    the contract object users and assets have to interact with.
+    """
+    if proxy_mode not in PROXY_MODES:
+        raise ValueError(f'unknown proxy mode "{proxy_mode}"')
+    implementation = deploy_implementation(reward_token, emission_manager, tx_params)
+    if proxy_mode == 'immutable':
+        return implementation
+    if proxy_mode == 'aave':
+        proxy = deploy_and_init_proxy(proxy_admin, implementation, tx_params)
+    else:
+        proxy = MinimalUpgradeabilityProxy.deploy(
+            implementation, proxy_admin,
+            implementation.initialize.encode_input(ZERO_ADDRESS), tx_params)
+    return Contract.from_abi(
+        "ERC20TokenIncentivesController", proxy, ERC20TokenIncentivesController.abi)
+
+
+def deploy_controller_factory(owner, tx_params):
+    """
+    Deploys the shared ClonableIncentivesController implementation and the
+    factory of its clones, `owner` is allowed to create controllers.
+    """
+    implementation = ClonableIncentivesController.deploy(tx_params)
+    return IncentivesControllerFactory.deploy(implementation, owner, tx_params)
+
+
+def create_controller_clone(factory, asset, reward_token, emission_manager, tx_params):
+    tx = factory.createController(asset, reward_token, emission_manager, tx_params)
+    return Contract.from_abi(
+        "ClonableIncentivesController", tx.events['ControllerCreated']['controller'],
+        ClonableIncentivesController.abi)
+
+
+class DeploymentState:
+    """
+    Progress of a deployment run, persisted as json after every broadcast
+    so that an interrupted run can be resumed without redeploying.
+    """
+
+    def __init__(self, path, chain_id):
+        self.path = Path(path)
+        self.chain_id = chain_id
+        self.steps = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data['chain_id'] != chain_id:
+                raise ValueError(
+                    f'state file {self.path} belongs to chain {data["chain_id"]}')
+            self.steps = data['steps']
+
+    def save(self):
+        self.path.write_text(json.dumps(
+            {'chain_id': self.chain_id, 'steps': self.steps}, indent=2))
+
+    def address(self, step):
+        return self.steps[step]['address']
+
+    def is_done(self, step):
+        return self.steps.get(step, {}).get('status') == 'confirmed'
+
+    def record(self, step, tx):
+        self.steps[step] = {'tx': tx.txid, 'status': 'pending'}
+        self.save()
+
+    def confirm(self, step, tx):
+        self.steps[step] = {
+            'tx': tx.txid,
+            'status': 'confirmed',
+            'address': tx.contract_address,
+            'gas_used': tx.gas_used,
+        }
+        self.save()
+
+
+def load_config(path):
+    """
+    Reads the deployment config. Expected keys:
+        reward_token, asset, proxy_admin, rewards_initializer,
+        rewards_period_duration
+    and optional proxy_mode, one of PROXY_MODES, 'aave' by default. The zero
+    asset skips set_asset of the rewards manager, e.g. when the asset is
+    deployed with the controller as its incentives controller.
+    """
+    deploy_config = json.loads(Path(path).read_text())
+    for key in ['reward_token', 'asset', 'proxy_admin', 'rewards_initializer',
+                'rewards_period_duration']:
+        if key not in deploy_config:
+            raise ValueError(f'deployment config: missing "{key}"')
+    deploy_config.setdefault('proxy_mode', 'aave')
+    if deploy_config['proxy_mode'] not in PROXY_MODES:
+        raise ValueError(
+            f'deployment config: unknown proxy_mode "{deploy_config["proxy_mode"]}"')
+    return deploy_config
+
+
+def _resume_pending(state, step):
+    """
+    Waits for a transaction broadcast by a previous run. Returns True when the
+    step is confirmed, False when it has to be submitted again.
+    """
+    if step not in state.steps or state.is_done(step):
+        return state.is_done(step)
+    try:
+        tx = chain.get_transaction(state.steps[step]['tx'])
+        tx.wait(1)
+    except Exception:
+        return False
+    if tx.status != 1:
+        return False
+    state.confirm(step, tx)
+    return True
+
+
+def _submit_batch(state, deployer, batch, tx_params):
+    """
+    Broadcasts every not yet confirmed step of the batch with consecutive
+    explicit nonces without waiting for confirmations, then waits for all
+    of them. Steps of one batch must not depend on each other.
+    """
+    batch = [(step, send) for step, send in batch
+             if not _resume_pending(state, step)]
+    pending = []
+    nonce = deployer.nonce
+    for step, send in batch:
+        params = dict(tx_params, nonce=nonce, required_confs=0)
+        tx = send(params)
+        state.record(step, tx)
+        pending.append((step, tx))
+        nonce += 1
+
+    for step, tx in pending:
+        tx.wait(1)
+        if tx.status != 1:
+            raise RuntimeError(f'deployment step "{step}" reverted: {tx.txid}')
+        state.confirm(step, tx)
+
+
+def run_deployment(config_path, state_path, deployer, tx_params=None,
+                   Controller=ERC20TokenIncentivesController):
+    """
+    Deploys and configures RewardsManager and ERC20TokenIncentivesController
+    in the configured proxy mode. Idempotent: steps recorded as confirmed
+    in the state file are skipped, so a failed run may simply be restarted.
+    Returns the RewardsManager and the incentives controller (proxy, unless
+    the mode is 'immutable'). `Controller` is the container of the controller
+    build to deploy.
+    """
+    deploy_config = load_config(config_path)
+    proxy_mode = deploy_config['proxy_mode']
+    tx_params = dict(tx_params or {}, **{'from': deployer})
+    state = DeploymentState(state_path, chain.id)
+    InitializableAdminUpgradeabilityProxy = load_dependency_contract(
+        'InitializableAdminUpgradeabilityProxy')
+
+    # rewards manager and the Aave proxy don't depend on anything
+    batch = [('rewards_manager', lambda params: RewardsManager.deploy(
+        deploy_config['rewards_initializer'], params))]
+    if proxy_mode == 'aave':
+        batch.append(('proxy', lambda params: InitializableAdminUpgradeabilityProxy.deploy(
+            params)))
+    _submit_batch(state, deployer, batch, tx_params)
+    rewards_manager = RewardsManager.at(state.address('rewards_manager'))
+
+    # implementation needs rewards manager as emission manager
+    _submit_batch(state, deployer, [
+        ('implementation', lambda params: Controller.deploy(
+            deploy_config['reward_token'], rewards_manager, params)),
+    ], tx_params)
+    implementation = Controller.at(state.address('implementation'))
+    initialize_data = implementation.initialize.encode_input(ZERO_ADDRESS)
+
+    batch = []
+    if proxy_mode == 'aave':
+        proxy = InitializableAdminUpgradeabilityProxy.at(state.address('proxy'))
+        batch.append(('proxy_initialize', lambda params: proxy.initialize(
+            implementation, deploy_config['proxy_admin'], initialize_data, params)))
+    elif proxy_mode == 'eip1967':
+        # the minimal proxy is initialized in its constructor
+        _submit_batch(state, deployer, [
+            ('proxy', lambda params: MinimalUpgradeabilityProxy.deploy(
+                implementation, deploy_config['proxy_admin'], initialize_data, params)),
+        ], tx_params)
+        proxy = MinimalUpgradeabilityProxy.at(state.address('proxy'))
+    else:
+        proxy = implementation
+
+    # a zero asset is left unset, it's set once the reserve is initialized with the controller
+    if deploy_config['asset'] != ZERO_ADDRESS:
+        batch.append(('set_asset', lambda params: rewards_manager.set_asset(
+            deploy_config['asset'], params)))
+    _submit_batch(state, deployer, batch + [
+        ('set_rewards_contract', lambda params: rewards_manager.set_rewards_contract(
+            proxy, params)),
+        ('set_rewards_period_duration', lambda params: rewards_manager.set_rewards_period_duration(
+            deploy_config['rewards_period_duration'], params)),
+    ], tx_params)
+
+    incentives_controller = Contract.from_abi(Controller._name, proxy, Controller.abi)
+    verify_deployment(deploy_config, rewards_manager, incentives_controller)
+    return [rewards_manager, incentives_controller]
+
+
+def verify_deployment(deploy_config, rewards_manager, incentives_controller):
+    checks = [
+        ('rewards manager asset',
+         rewards_manager.staking_token(), deploy_config['asset']),
+        ('rewards manager rewards contract',
+         rewards_manager.rewards_contract(), incentives_controller.address),
+        ('rewards manager period duration',
+         rewards_manager.rewards_duration(), deploy_config['rewards_period_duration']),
+        ('rewards manager initializer',
+         rewards_manager.rewards_initializer(), deploy_config['rewards_initializer']),
+        ('incentives controller reward token',
+         incentives_controller.REWARD_TOKEN(), deploy_config['reward_token']),
+        ('incentives controller emission manager',
+         incentives_controller.EMISSION_MANAGER(), rewards_manager.address),
+    ]
+    failed = [(name, actual, expected) for name, actual, expected in checks
+              if actual != expected]
+    for name, actual, expected in failed:
+        print(f'{name}: expected {expected}, got {actual}')
+    if failed:
+        raise RuntimeError('deployment verification failed')
+
+
+def main(config_path, state_path='deployment_state.json', account='deployer'):
+    """
+    brownie run deployment/deploy.py main <config.json> [state.json] [account] --network mainnet
+    """
+    deployer = accounts.load(account)
+    [rewards_manager, incentives_controller] = run_deployment(
+        config_path, state_path, deployer)
+    print('RewardsManager:', rewards_manager.address)
+    print('ERC20TokenIncentivesController (proxy):', incentives_controller.address)
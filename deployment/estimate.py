@@ -0,0 +1,144 @@
+"""
+Dry run of the full incentives setup on a local (forked) chain, reporting
+gas used by every step, bytecode sizes and the total cost at a given gas price.
+The deployment itself is run by the pipeline of deploy.py, the chain is
+reverted after the run.
+
+    brownie run deployment/estimate.py main [gas_price_gwei] --network development
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from brownie import ERC20TokenIncentivesController
+from brownie import ZERO_ADDRESS, Contract, Wei, accounts, chain, interface, web3
+from deployment.deploy import (
+    DeploymentState, load_dependency_contract, run_deployment, undone_transactions)
+
+LDO_ADDRESS = '0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32'
+AGENT_ADDRESS = '0x3e40D73EB977Dc6a537aF587D48316feE66E9C8c'
+POOL_ADMIN_ADDRESS = '0xEE56e2B3D491590B5b31738cC34d5232F378a8D5'
+LENDING_POOL_ADDRESS = '0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9'
+LENDING_POOL_CONFIGURATOR_ADDRESS = '0x311Bb771e4F8952E6Da169b425E7e92d6Ac45756'
+STETH_ADDRESS = '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84'
+INTEREST_RATE_STRATEGY_ADDRESS = '0x4ce076b9dD956196b814e54E1714338F18fde3F4'
+
+REWARDS_PERIOD_DURATION = 30 * 24 * 60 * 60
+REWARD_AMOUNT = Wei('1000 ether')
+
+
+class GasReport:
+    def __init__(self):
+        self.steps = []
+        self.bytecode_sizes = {}
+        self.contracts = {}
+
+    def add(self, step, tx):
+        self.add_step(step, tx.gas_used, tx.contract_address)
+        return tx
+
+    def add_step(self, step, gas_used, contract_address=None):
+        self.steps.append((step, gas_used))
+        if contract_address is not None:
+            self.bytecode_sizes[step] = len(web3.eth.get_code(contract_address))
+
+    def add_deployment(self, state):
+        """
+        Adds the steps of a deployment run recorded in its DeploymentState.
+        """
+        for step, data in state.steps.items():
+            self.add_step(step, data['gas_used'], data['address'])
+
+    def total_gas(self):
+        return sum(gas_used for _, gas_used in self.steps)
+
+    def print(self, gas_price):
+        print(f'{"step":<40}{"gas used":>12}{"cost, ETH":>14}')
+        for step, gas_used in self.steps:
+            print(f'{step:<40}{gas_used:>12}{gas_used * gas_price / 10**18:>14.6f}')
+        total_gas = self.total_gas()
+        print(f'{"total":<40}{total_gas:>12}{total_gas * gas_price / 10**18:>14.6f}')
+        print()
+        print(f'{"contract":<40}{"runtime bytecode, bytes":>24}')
+        for step, size in self.bytecode_sizes.items():
+            print(f'{step:<40}{size:>24}')
+
+
+def estimate_deployment(deployer, rewards_initializer, proxy_admin,
+                        Controller=ERC20TokenIncentivesController):
+    """
+    Runs the deployment pipeline of deploy.py, the AStETH reserve
+    initialization, setting the reserve as the asset of the rewards manager and
+    the start of the first rewards period. Must be run on a fork of mainnet.
+    The deployed contracts are kept in `contracts` of the report. `Controller`
+    is the container of the controller build to deploy.
+    """
+    report = GasReport()
+    tx_params = {'from': deployer}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_path = Path(work_dir) / 'config.json'
+        state_path = Path(work_dir) / 'deployment_state.json'
+        # the reserve is initialized with the controller, so the pipeline skips set_asset
+        config_path.write_text(json.dumps({
+            'reward_token': LDO_ADDRESS,
+            'asset': ZERO_ADDRESS,
+            'proxy_admin': str(proxy_admin),
+            'rewards_initializer': str(rewards_initializer),
+            'rewards_period_duration': REWARDS_PERIOD_DURATION,
+            'proxy_mode': 'aave',
+        }))
+        [rewards_manager, incentives_controller] = run_deployment(
+            config_path, state_path, deployer, Controller=Controller)
+        report.add_deployment(DeploymentState(state_path, chain.id))
+
+    AStETH = load_dependency_contract('AStETH')
+    VariableDebtStETH = load_dependency_contract('VariableDebtStETH')
+    StableDebtStETH = load_dependency_contract('StableDebtStETH')
+    asteth_impl = AStETH.deploy(
+        LENDING_POOL_ADDRESS, STETH_ADDRESS, ZERO_ADDRESS, 'AAVE stETH', 'astETH',
+        incentives_controller, tx_params)
+    report.add('AStETH deploy', asteth_impl.tx)
+    variable_debt_steth_impl = VariableDebtStETH.deploy(
+        LENDING_POOL_ADDRESS, STETH_ADDRESS, 'Variable debt stETH', 'variableDebtStETH',
+        ZERO_ADDRESS, tx_params)
+    report.add('VariableDebtStETH deploy', variable_debt_steth_impl.tx)
+    stable_debt_steth_impl = StableDebtStETH.deploy(
+        LENDING_POOL_ADDRESS, STETH_ADDRESS, 'Stable debt stETH', 'stableDebtStETH',
+        ZERO_ADDRESS, tx_params)
+    report.add('StableDebtStETH deploy', stable_debt_steth_impl.tx)
+
+    pool_admin = accounts.at(POOL_ADMIN_ADDRESS, force=True)
+    lending_pool_configurator = interface.LendingPoolConfigurator(
+        LENDING_POOL_CONFIGURATOR_ADDRESS)
+    lending_pool = interface.LendingPool(LENDING_POOL_ADDRESS)
+    report.add('reserve init', lending_pool_configurator.initReserve(
+        asteth_impl, stable_debt_steth_impl, variable_debt_steth_impl, 18,
+        INTEREST_RATE_STRATEGY_ADDRESS, {'from': pool_admin}))
+    asteth = Contract.from_abi(
+        'AStETH', lending_pool.getReserveData(STETH_ADDRESS)[7], AStETH.abi)
+    report.add('AStETH initializeDebtToken',
+               asteth.initializeDebtToken(tx_params))
+
+    report.add('set_asset astETH', rewards_manager.set_asset(asteth, tx_params))
+
+    ldo = interface.ERC20(LDO_ADDRESS)
+    ldo.transfer(rewards_manager, REWARD_AMOUNT, {
+                 'from': accounts.at(AGENT_ADDRESS, force=True)})
+    report.add('start_next_rewards_period', rewards_manager.start_next_rewards_period(
+        {'from': rewards_initializer}))
+    report.contracts = {
+        'rewards_manager': rewards_manager,
+        'incentives_controller': incentives_controller,
+        'asteth': asteth,
+    }
+    return report
+
+
+def main(gas_price_gwei=50):
+    gas_price = Wei(f'{gas_price_gwei} gwei')
+    [deployer, proxy_admin, rewards_initializer] = accounts[0:3]
+    with undone_transactions():
+        report = estimate_deployment(deployer, rewards_initializer, proxy_admin)
+    print(f'Gas price: {gas_price_gwei} gwei')
+    report.print(gas_price)
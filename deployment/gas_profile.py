@@ -0,0 +1,191 @@
+"""
+Opcode level gas profile of the incentives transactions. Replays
+`handleAction`, `claimRewards` and `start_next_rewards_period` on the local
+chain (or profiles the given transactions), maps every step of
+`debug_traceTransaction` to the source line it was compiled from and reports
+SLOAD, SSTORE, CALL and LOG costs per line.
+
+    brownie run deployment/gas_profile.py main [tx_hash ...] --network development
+"""
+from collections import defaultdict
+from pathlib import Path
+
+import brownie
+from brownie import Wei, accounts, chain, interface
+from deployment.estimate import AGENT_ADDRESS, LDO_ADDRESS
+
+PROFILED_SOURCES = [
+    'contracts/incentives/DistributionManager.sol',
+    'contracts/incentives/ERC20TokenIncentivesController.sol',
+    'contracts/incentives/CustomIncentivesController.sol',
+    'contracts/RewardsManager.vy',
+]
+
+CALL_OPCODES = ['CALL', 'CALLCODE', 'DELEGATECALL', 'STATICCALL']
+LOG_OPCODES = ['LOG0', 'LOG1', 'LOG2', 'LOG3', 'LOG4']
+PROFILED_OPCODES = ['SLOAD', 'SSTORE', 'CALL', 'LOG']
+
+REWARDS_PERIOD_DURATION = 30 * 24 * 60 * 60
+REWARD_AMOUNT = Wei('1000 ether')
+
+
+def _opcode_group(op):
+    if op in CALL_OPCODES:
+        return 'CALL'
+    if op in LOG_OPCODES:
+        return 'LOG'
+    if op in ('SLOAD', 'SSTORE'):
+        return op
+    return None
+
+
+def _call_gas(trace, i):
+    """
+    Gas spent by the call at step i including the execution of the callee:
+    the difference of the gas left at the call and at the next step of the
+    same depth, i.e. right after the callee returned.
+    """
+    depth = trace[i]['depth']
+    for step in trace[i + 1:]:
+        if step['depth'] == depth:
+            return trace[i]['gas'] - step['gas']
+        if step['depth'] < depth:
+            break
+    return trace[i]['gasCost']
+
+
+class GasProfile:
+    def __init__(self, name, gas_used, source_files=PROFILED_SOURCES):
+        self.name = name
+        self.gas_used = gas_used
+        self.source_files = source_files
+        # (path, line) -> opcode group -> [count, gas]
+        self.lines = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        self._sources = {}
+
+    def add_trace(self, trace):
+        for i, step in enumerate(trace):
+            group = _opcode_group(step['op'])
+            source = step.get('source')
+            if group is None or not source or source['filename'] not in self.source_files:
+                continue
+            gas = _call_gas(trace, i) if group == 'CALL' else step['gasCost']
+            line = self.line_number(source['filename'], source['offset'][0])
+            stats = self.lines[(source['filename'], line)][group]
+            stats[0] += 1
+            stats[1] += gas
+
+    def source_lines(self, path):
+        if path not in self._sources:
+            self._sources[path] = Path(path).read_text()
+        return self._sources[path]
+
+    def line_number(self, path, offset):
+        return self.source_lines(path).count('\n', 0, offset) + 1
+
+    def line_text(self, path, line):
+        return self.source_lines(path).splitlines()[line - 1].strip()
+
+    def totals(self):
+        totals = defaultdict(lambda: [0, 0])
+        for groups in self.lines.values():
+            for group, [count, gas] in groups.items():
+                totals[group][0] += count
+                totals[group][1] += gas
+        return totals
+
+    def print(self, limit=None):
+        print(f'{self.name}: {self.gas_used} gas used')
+        header = ''.join(f'{group:>16}' for group in PROFILED_OPCODES)
+        print(f'{"line":<44}{header}{"total":>10}  source')
+        rows = sorted(self.lines.items(),
+                      key=lambda row: -sum(gas for _, gas in row[1].values()))
+        for (path, line), groups in rows[:limit]:
+            location = f'{Path(path).name}:{line}'
+            cells = ''.join(
+                f'{_format_cell(groups.get(group)):>16}' for group in PROFILED_OPCODES)
+            total = sum(gas for _, gas in groups.values())
+            print(f'{location:<44}{cells}{total:>10}  {self.line_text(path, line)[:60]}')
+        totals = self.totals()
+        cells = ''.join(f'{_format_cell(totals.get(group)):>16}' for group in PROFILED_OPCODES)
+        total = sum(gas for _, gas in totals.values())
+        print(f'{"total":<44}{cells}{total:>10}')
+        print()
+
+
+def _format_cell(stats):
+    if stats is None:
+        return '-'
+    [count, gas] = stats
+    return f'{count}x {gas}'
+
+
+def profile_transaction(tx, name=None, source_files=PROFILED_SOURCES):
+    profile = GasProfile(name or tx.fn_name or tx.txid, tx.gas_used, source_files)
+    profile.add_trace(tx.trace)
+    return profile
+
+
+def replay_transactions(deployer, rewards_initializer, emission_manager, depositors,
+                        project=brownie):
+    """
+    Runs the profiled actions of both controllers and the rewards manager on
+    the local chain and returns the list of (name, transaction). Contracts
+    are deployed from the containers of `project`, the loaded one by default.
+    """
+    ERC20TokenIncentivesController = project.ERC20TokenIncentivesController
+    IncentivesController = project.IncentivesController
+    RewardsManager = project.RewardsManager
+    ScaledBalanceTokenMock = project.ScaledBalanceTokenMock
+    tx_params = {'from': deployer}
+    ldo = interface.ERC20(LDO_ADDRESS)
+    agent = accounts.at(AGENT_ADDRESS, force=True)
+    [depositor1, depositor2] = depositors
+    transactions = []
+
+    rewards_manager = RewardsManager.deploy(rewards_initializer, tx_params)
+    controller = ERC20TokenIncentivesController.deploy(LDO_ADDRESS, rewards_manager, tx_params)
+    token = ScaledBalanceTokenMock.deploy(tx_params)
+    token.setIncentivesController(controller, tx_params)
+    rewards_manager.set_asset(token, tx_params)
+    rewards_manager.set_rewards_contract(controller, tx_params)
+    rewards_manager.set_rewards_period_duration(REWARDS_PERIOD_DURATION, tx_params)
+    token.mint(depositor1, Wei('1 ether'), tx_params)
+
+    ldo.transfer(rewards_manager, REWARD_AMOUNT, {'from': agent})
+    transactions.append(('RewardsManager.start_next_rewards_period',
+                         rewards_manager.start_next_rewards_period({'from': rewards_initializer})))
+    chain.sleep(24 * 60 * 60)
+    transactions.append(('ERC20TokenIncentivesController.handleAction (first deposit)',
+                         token.mint(depositor2, Wei('1 ether'), tx_params)))
+    chain.sleep(24 * 60 * 60)
+    transactions.append(('ERC20TokenIncentivesController.handleAction',
+                         token.mint(depositor1, Wei('1 ether'), tx_params)))
+    transactions.append(('ERC20TokenIncentivesController.claimRewards',
+                         controller.claimRewards([token], REWARD_AMOUNT, depositor1,
+                                                 {'from': depositor1})))
+
+    custom_controller = IncentivesController.deploy(LDO_ADDRESS, emission_manager, tx_params)
+    custom_token = ScaledBalanceTokenMock.deploy(tx_params)
+    custom_controller.setStakingToken(custom_token, tx_params)
+    custom_controller.setRewardsDuration(REWARDS_PERIOD_DURATION, tx_params)
+    custom_token.mint(depositor1, Wei('1 ether'), tx_params)
+    ldo.approve(custom_controller, REWARD_AMOUNT, {'from': agent})
+    custom_controller.startRewardPeriod(REWARD_AMOUNT, agent, tx_params)
+    chain.sleep(24 * 60 * 60)
+    transactions.append(('IncentivesController.handleAction',
+                         custom_controller.handleAction(
+                             depositor1, Wei('1 ether'), Wei('1 ether'), tx_params)))
+    transactions.append(('IncentivesController.claimReward',
+                         custom_controller.claimReward({'from': depositor1})))
+    return transactions
+
+
+def main(*tx_hashes, limit=20):
+    if tx_hashes:
+        transactions = [(None, chain.get_transaction(tx_hash)) for tx_hash in tx_hashes]
+    else:
+        transactions = replay_transactions(
+            accounts[0], accounts[1], accounts[2], accounts[3:5])
+    for name, tx in transactions:
+        profile_transaction(tx, name).print(limit)
@@ -0,0 +1,167 @@
+"""
+Optimizer settings sweep: recompiles the project for every combination of
+solc optimizer runs and EVM version, replays the hot paths of
+deployment/gas_profile.py with every build and reports deployment gas
+against runtime gas, marking the Pareto optimal settings.
+
+    brownie run deployment/optimizer_sweep.py main [runs] [evm_versions] --network development
+
+`runs` and `evm_versions` are comma separated, `off` disables the optimizer,
+e.g. `main off,200,1000000 petersburg,istanbul`. Solc contracts follow both
+settings, Vyper 0.3.0 has no optimizer runs and follows only the EVM version.
+The EVM version applies to every compiler of the project, so versions one of
+them can't target (berlin with solc 0.7.5) are skipped.
+Runtime gas is measured on the local chain, i.e. with the gas schedule of its
+hardfork whatever EVM version the bytecode targets.
+"""
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+import yaml
+from brownie import accounts, project
+
+from deployment.deploy import undone_transactions
+from deployment.gas_profile import replay_transactions
+
+PROJECT_PATH = Path(__file__).resolve().parent.parent
+PROJECT_DIRS = ['contracts', 'interfaces']
+
+DEPLOYED_CONTRACTS = ['ERC20TokenIncentivesController', 'IncentivesController', 'RewardsManager']
+
+# first solc release targeting the EVM version
+SOLC_EVM_VERSIONS = {
+    'byzantium': (0, 4, 21),
+    'constantinople': (0, 4, 21),
+    'petersburg': (0, 5, 5),
+    'istanbul': (0, 5, 13),
+    'berlin': (0, 8, 5),
+    'london': (0, 8, 7),
+}
+VYPER_EVM_VERSIONS = ['byzantium', 'constantinople', 'petersburg', 'istanbul', 'berlin']
+
+
+def pinned_solc_versions():
+    """
+    Solc versions pinned by the pragmas of the project contracts.
+    """
+    versions = set()
+    for name in PROJECT_DIRS:
+        for path in (PROJECT_PATH / name).rglob('*.sol'):
+            match = re.search(r'pragma solidity (\d+)\.(\d+)\.(\d+);', path.read_text())
+            if match:
+                versions.add(tuple(int(part) for part in match.groups()))
+    return sorted(versions)
+
+
+def unsupported_compilers(evm_version, solc_versions):
+    """
+    Compilers of the project that can't target the EVM version.
+    """
+    compilers = ['solc ' + '.'.join(map(str, version)) for version in solc_versions
+                 if evm_version not in SOLC_EVM_VERSIONS or
+                 version < SOLC_EVM_VERSIONS[evm_version]]
+    if evm_version not in VYPER_EVM_VERSIONS:
+        compilers.append('vyper 0.3.0')
+    return compilers
+
+
+def _parse_runs(value):
+    return None if value == 'off' else int(value)
+
+
+def write_variant(path, runs, evm_version):
+    """
+    Copies the project sources to the path with the optimizer settings in its config.
+    """
+    path = Path(path)
+    for name in PROJECT_DIRS:
+        shutil.copytree(PROJECT_PATH / name, path / name)
+    config = yaml.safe_load((PROJECT_PATH / 'brownie-config.yaml').read_text())
+    compiler = config.setdefault('compiler', {})
+    compiler['evm_version'] = evm_version
+    compiler.setdefault('solc', {})['optimizer'] = {
+        'enabled': runs is not None, 'runs': 200 if runs is None else runs}
+    (path / 'brownie-config.yaml').write_text(yaml.safe_dump(config))
+    return path
+
+
+def measure_variant(variant):
+    """
+    Deployment and runtime gas of the hot paths with the contracts of the loaded variant.
+    """
+    with undone_transactions():
+        transactions = replay_transactions(
+            accounts[0], accounts[1], accounts[2], accounts[3:5], project=variant)
+        deploy_gas = {name: getattr(variant, name)[-1].tx.gas_used for name in DEPLOYED_CONTRACTS}
+        runtime_gas = {name: tx.gas_used for name, tx in transactions}
+    return {
+        'deploy_gas': deploy_gas,
+        'runtime_gas': runtime_gas,
+        'total_deploy_gas': sum(deploy_gas.values()),
+        'total_runtime_gas': sum(runtime_gas.values()),
+    }
+
+
+def sweep(runs_list, evm_versions, work_dir):
+    results = []
+    solc_versions = pinned_solc_versions()
+    for evm_version in evm_versions:
+        unsupported = unsupported_compilers(evm_version, solc_versions)
+        if unsupported:
+            print(f'evm {evm_version}: skipped, not supported by {", ".join(unsupported)}')
+            continue
+        for runs in runs_list:
+            path = write_variant(Path(work_dir) / f'{evm_version}-{runs}', runs, evm_version)
+            variant = project.load(path, name=f'OptimizerSweep{len(results)}')
+            try:
+                result = measure_variant(variant)
+            finally:
+                variant.close()
+            result.update(runs=runs, evm_version=evm_version)
+            results.append(result)
+            print(f'evm {evm_version}, runs {runs}: deploy {result["total_deploy_gas"]}, '
+                  f'runtime {result["total_runtime_gas"]}')
+    return results
+
+
+def pareto_front(results):
+    """
+    Results not dominated by another one in both the total deployment and runtime gas.
+    """
+    def dominates(a, b):
+        return (a['total_deploy_gas'] <= b['total_deploy_gas'] and
+                a['total_runtime_gas'] <= b['total_runtime_gas'] and
+                (a['total_deploy_gas'], a['total_runtime_gas']) !=
+                (b['total_deploy_gas'], b['total_runtime_gas']))
+    return [result for result in results
+            if not any(dominates(other, result) for other in results)]
+
+
+def print_results(results):
+    front = pareto_front(results)
+    runtime_names = list(results[0]['runtime_gas'])
+    print(f'{"evm":<10}{"runs":>10}{"deploy gas":>14}{"runtime gas":>14}  pareto')
+    for result in sorted(results, key=lambda result: result['total_deploy_gas']):
+        runs = 'off' if result['runs'] is None else result['runs']
+        mark = '*' if result in front else ''
+        print(f'{result["evm_version"]:<10}{runs:>10}{result["total_deploy_gas"]:>14}'
+              f'{result["total_runtime_gas"]:>14}  {mark}')
+    print()
+    print(f'{"evm":<10}{"runs":>10}  gas per step')
+    for result in results:
+        runs = 'off' if result['runs'] is None else result['runs']
+        print(f'{result["evm_version"]:<10}{runs:>10}')
+        for name, gas_used in result['deploy_gas'].items():
+            print(f'{"":<22}{name + " deploy":<64}{gas_used:>10}')
+        for name in runtime_names:
+            print(f'{"":<22}{name:<64}{result["runtime_gas"][name]:>10}')
+
+
+def main(runs='off,1,200,10000,1000000', evm_versions='petersburg,istanbul'):
+    runs_list = [_parse_runs(value) for value in runs.split(',')]
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = sweep(runs_list, evm_versions.split(','), work_dir)
+    print_results(results)
+    return results
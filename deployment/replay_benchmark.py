@@ -0,0 +1,286 @@
+"""
+Replays a recorded trace of astETH activity against the local stack (AStETH,
+the incentives controller and RewardsManager, or the custom
+IncentivesController) and reports gas per operation type and the replay
+throughput. Must be run on a fork of mainnet.
+
+    brownie run deployment/replay_benchmark.py main trace.csv [variants] [max_time_jump] \\
+        [amount_divisor] --network development
+
+The trace is a csv of `timestamp,operation,user,amount,to` rows, where the
+operation is one of deposit, withdraw, transfer (to the `to` user) or claim
+and amounts are in wei of stETH. Trace users are mapped to fresh local
+accounts. Gaps between the rows longer than `max_time_jump` seconds are
+compressed to it, and amounts are divided by `amount_divisor` to fit the
+balances of the local accounts. Withdrawals and transfers are capped to the
+balance of the user. `variants` is a comma separated list of standard,
+compact, none (the controller builds with reduced events) and custom.
+"""
+import csv
+import math
+import time
+from collections import defaultdict
+
+from brownie import CompactEventsIncentivesController, ERC20TokenIncentivesController
+from brownie import IncentivesController, NoEventsIncentivesController
+from brownie import ZERO_ADDRESS, Contract, Wei, accounts, chain, interface
+from deployment.deploy import load_dependency_contract, undone_transactions
+from deployment.estimate import (
+    AGENT_ADDRESS, INTEREST_RATE_STRATEGY_ADDRESS, LDO_ADDRESS, LENDING_POOL_ADDRESS,
+    LENDING_POOL_CONFIGURATOR_ADDRESS, POOL_ADMIN_ADDRESS, REWARD_AMOUNT,
+    REWARDS_PERIOD_DURATION, STETH_ADDRESS, estimate_deployment)
+
+OPERATIONS = ['deposit', 'withdraw', 'transfer', 'claim']
+CONTROLLERS = {
+    'standard': ERC20TokenIncentivesController,
+    'compact': CompactEventsIncentivesController,
+    'none': NoEventsIncentivesController,
+}
+MAX_UINT256 = 2**256 - 1
+# ether kept by the local accounts for gas
+GAS_RESERVE = Wei('1 ether')
+
+
+def read_trace(path):
+    """
+    (timestamp, operation, user, amount, to) rows of the trace csv.
+    """
+    with open(path) as f:
+        for row in csv.DictReader(f):
+            if row['operation'] not in OPERATIONS:
+                raise ValueError(f'unknown operation in the trace: {row["operation"]}')
+            yield (int(row['timestamp']), row['operation'], row['user'],
+                   int(row.get('amount') or 0), row.get('to') or None)
+
+
+def compress_time(rows, max_time_jump):
+    """
+    (seconds to sleep, row) for every trace row, gaps capped to `max_time_jump`.
+    """
+    previous = None
+    for row in rows:
+        yield 0 if previous is None else min(max(row[0] - previous, 0), max_time_jump), row
+        previous = row[0]
+
+
+def percentile(sorted_values, share):
+    """
+    Nearest rank percentile of the sorted values.
+    """
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(share * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class ReplayReport:
+    def __init__(self, name):
+        self.name = name
+        self.gas_used = defaultdict(list)
+        self.rollover_gas_used = []
+        self.skipped = defaultdict(int)
+        self.elapsed = 0
+        self.traced_seconds = 0
+
+    def add(self, operation, tx):
+        self.gas_used[operation].append(tx.gas_used)
+
+    def add_rollover(self, tx):
+        self.rollover_gas_used.append(tx.gas_used)
+
+    def rows(self):
+        """
+        (operation, count, cumulative gas, mean, p50, p90, p99, max) per operation, in total
+        and for the rollovers of the rewards periods, which the total doesn't include.
+        """
+        rows = []
+        groups = [(operation, self.gas_used[operation]) for operation in self.gas_used]
+        groups.append(('total', [gas for values in self.gas_used.values() for gas in values]))
+        groups.append(('rollover', self.rollover_gas_used))
+        for operation, values in groups:
+            values = sorted(values)
+            total = sum(values)
+            rows.append((operation, len(values), total, total // max(len(values), 1),
+                         percentile(values, 0.5), percentile(values, 0.9),
+                         percentile(values, 0.99), values[-1] if values else 0))
+        return rows
+
+    def print(self):
+        print(f'{self.name}')
+        print(f'{"operation":<12}{"count":>8}{"total gas":>14}{"mean":>10}'
+              f'{"p50":>10}{"p90":>10}{"p99":>10}{"max":>10}')
+        for row in self.rows():
+            print(f'{row[0]:<12}' + ''.join(f'{value:>{width}}' for value, width in zip(
+                row[1:], [8, 14, 10, 10, 10, 10, 10])))
+        count = sum(len(values) for values in self.gas_used.values())
+        print(f'replayed {count} transactions covering {self.traced_seconds} seconds '
+              f'in {self.elapsed:.1f}s: {count / max(self.elapsed, 1e-9):.1f} tx/s')
+        if self.skipped:
+            print('skipped (zero amount or balance):', dict(self.skipped))
+        print()
+
+
+class LocalStack:
+    """
+    AStETH reserve with one of the controller variants and its rewards source.
+    """
+
+    def __init__(self, variant, deployer):
+        self.variant = variant
+        self.deployer = deployer
+        self.lending_pool = interface.LendingPool(LENDING_POOL_ADDRESS)
+        self.steth = interface.StETH(STETH_ADDRESS)
+        self.ldo = interface.ERC20(LDO_ADDRESS)
+        self.agent = accounts.at(AGENT_ADDRESS, force=True)
+        if variant == 'custom':
+            self._deploy_custom()
+        else:
+            report = estimate_deployment(deployer, deployer, accounts[1], CONTROLLERS[variant])
+            self.rewards_manager = report.contracts['rewards_manager']
+            self.controller = report.contracts['incentives_controller']
+            self.asteth = report.contracts['asteth']
+
+    def _deploy_custom(self):
+        tx_params = {'from': self.deployer}
+        self.rewards_manager = None
+        self.controller = IncentivesController.deploy(LDO_ADDRESS, self.deployer, tx_params)
+        AStETH = load_dependency_contract('AStETH')
+        VariableDebtStETH = load_dependency_contract('VariableDebtStETH')
+        StableDebtStETH = load_dependency_contract('StableDebtStETH')
+        asteth_impl = AStETH.deploy(
+            LENDING_POOL_ADDRESS, STETH_ADDRESS, ZERO_ADDRESS, 'AAVE stETH', 'astETH',
+            self.controller, tx_params)
+        variable_debt_steth_impl = VariableDebtStETH.deploy(
+            LENDING_POOL_ADDRESS, STETH_ADDRESS, 'Variable debt stETH', 'variableDebtStETH',
+            ZERO_ADDRESS, tx_params)
+        stable_debt_steth_impl = StableDebtStETH.deploy(
+            LENDING_POOL_ADDRESS, STETH_ADDRESS, 'Stable debt stETH', 'stableDebtStETH',
+            ZERO_ADDRESS, tx_params)
+        interface.LendingPoolConfigurator(LENDING_POOL_CONFIGURATOR_ADDRESS).initReserve(
+            asteth_impl, stable_debt_steth_impl, variable_debt_steth_impl, 18,
+            INTEREST_RATE_STRATEGY_ADDRESS, {'from': accounts.at(POOL_ADMIN_ADDRESS, force=True)})
+        self.asteth = Contract.from_abi(
+            'AStETH', self.lending_pool.getReserveData(STETH_ADDRESS)[7], AStETH.abi)
+        self.asteth.initializeDebtToken(tx_params)
+        self.controller.setStakingToken(self.asteth, tx_params)
+        self.controller.setRewardsDuration(REWARDS_PERIOD_DURATION, tx_params)
+        self.rollover()
+
+    def rollover(self):
+        """
+        Starts the next rewards period if the current one is finished, returns the transaction.
+        """
+        if self.variant == 'custom':
+            if self.controller.periodFinish() > chain.time():
+                return None
+            self.ldo.approve(self.controller, REWARD_AMOUNT, {'from': self.agent})
+            return self.controller.startRewardPeriod(
+                REWARD_AMOUNT, self.agent, {'from': self.deployer})
+        if not self.rewards_manager.is_rewards_period_finished():
+            return None
+        self.ldo.transfer(self.rewards_manager, REWARD_AMOUNT, {'from': self.agent})
+        return self.rewards_manager.start_next_rewards_period({'from': self.deployer})
+
+    def deposit(self, user, amount):
+        self.steth.approve(self.lending_pool, amount, {'from': user})
+        return self.lending_pool.deposit(self.steth, amount, user, 0, {'from': user})
+
+    def withdraw(self, user, amount):
+        return self.lending_pool.withdraw(self.steth, amount, user, {'from': user})
+
+    def transfer(self, user, to, amount):
+        return self.asteth.transfer(to, amount, {'from': user})
+
+    def claim(self, user):
+        if self.variant == 'custom':
+            return self.controller.claimReward({'from': user})
+        return self.controller.claimRewards([self.asteth], MAX_UINT256, user, {'from': user})
+
+
+class LocalUsers:
+    """
+    Fresh local accounts for the trace users, funded with ether from the default accounts.
+    """
+
+    def __init__(self, steth):
+        self.steth = steth
+        self.accounts = {}
+
+    def get(self, name):
+        if name not in self.accounts:
+            self.accounts[name] = accounts.add()
+            self._fund(self.accounts[name], GAS_RESERVE)
+        return self.accounts[name]
+
+    def _fund(self, account, amount):
+        for funder in accounts[:10]:
+            available = funder.balance() - GAS_RESERVE
+            if available <= 0:
+                continue
+            value = min(available, amount)
+            funder.transfer(account, value)
+            amount -= value
+            if amount == 0:
+                return
+        raise ValueError('local accounts ran out of ether, raise amount_divisor')
+
+    def fund_steth(self, account, amount):
+        """
+        Mints the missing stETH of the account by submitting ether to Lido.
+        """
+        missing = amount - self.steth.balanceOf(account)
+        if missing > 0:
+            # stETH shares round down, submit a bit more
+            self._fund(account, missing + 2)
+            account.transfer(self.steth, missing + 2)
+
+
+def replay(stack, rows, max_time_jump, amount_divisor, name=None):
+    report = ReplayReport(name or stack.variant)
+    users = LocalUsers(stack.steth)
+    for sleep, (_, operation, user_name, amount, to_name) in compress_time(rows, max_time_jump):
+        if sleep:
+            chain.sleep(sleep)
+            report.traced_seconds += sleep
+        tx = stack.rollover()
+        if tx is not None:
+            report.add_rollover(tx)
+        user = users.get(user_name)
+        amount //= amount_divisor
+        if operation == 'deposit':
+            if amount == 0:
+                report.skipped[operation] += 1
+                continue
+            users.fund_steth(user, amount)
+            send, args = stack.deposit, (user, amount)
+        elif operation == 'claim':
+            send, args = stack.claim, (user,)
+        else:
+            amount = min(amount, stack.asteth.balanceOf(user))
+            if amount == 0:
+                report.skipped[operation] += 1
+                continue
+            if operation == 'withdraw':
+                send, args = stack.withdraw, (user, amount)
+            else:
+                send, args = stack.transfer, (user, users.get(to_name), amount)
+        # only the operation is timed, funding of the users and rollovers are not
+        started_at = time.perf_counter()
+        tx = send(*args)
+        report.elapsed += time.perf_counter() - started_at
+        report.add(operation, tx)
+    return report
+
+
+def main(trace_path, variants='standard', max_time_jump=3600, amount_divisor=1):
+    reports = []
+    for variant in variants.split(','):
+        if variant != 'custom' and variant not in CONTROLLERS:
+            raise ValueError(f'unknown variant: {variant}')
+        with undone_transactions():
+            stack = LocalStack(variant, accounts[0])
+            reports.append(replay(stack, read_trace(trace_path), int(max_time_jump),
+                                  int(amount_divisor)))
+    for report in reports:
+        report.print()
+    return reports
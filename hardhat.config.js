@@ -0,0 +1,18 @@
+// Hardhat node of the hardhat-fork network of brownie-config.yaml, with the chain
+// settings of the ganache development network. Brownie inspects failed
+// transactions itself, so the node must not throw on them.
+module.exports = {
+  networks: {
+    hardhat: {
+      blockGasLimit: 30000000,
+      gasPrice: 0,
+      initialBaseFeePerGas: 0,
+      accounts: {
+        mnemonic: 'brownie',
+        count: 10,
+      },
+      throwOnTransactionFailures: false,
+      throwOnCallFailures: false,
+    },
+  },
+};
@@ -0,0 +1,277 @@
+"""
+Rewards analytics HTTP service for ERC20TokenIncentivesController.
+
+Indexes the controller events incrementally as new blocks arrive and serves
+per-asset APR, total emitted and claimed rewards and per-user rewards from
+memory. Reads from the node are pinned to a block and kept in an LRU cache,
+so repeated requests within a block never reach the node. The APR annualizes
+the growth of the distribution index over the next APR_WINDOW seconds, so it
+follows emission schedules and drops to zero at the distribution end.
+
+    python -m monitoring.analytics --rpc http://127.0.0.1:8545 \\
+        --controller 0x... --from-block 13000000 --port 8080
+
+    GET /assets            emission and APR of every configured asset
+    GET /totals            emitted, accrued, claimed rewards and liabilities
+    GET /users/<address>   accrued, claimed and claimable rewards of the user
+"""
+import argparse
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+
+from aiohttp import web
+from eth_abi import decode_abi
+from eth_utils import event_signature_to_log_topic, to_checksum_address
+
+from monitoring.client import ContractReader, IncentivesControllerReader, RpcClient
+from monitoring.rewards import PRECISION, get_distribution_index
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+# APR is the emission over this window from the current block, annualized
+APR_WINDOW = 24 * 60 * 60
+
+REWARDS_ACCRUED_TOPIC = '0x' + event_signature_to_log_topic(
+    'RewardsAccrued(address,uint256)').hex()
+REWARDS_CLAIMED_TOPIC = '0x' + event_signature_to_log_topic(
+    'RewardsClaimed(address,address,address,uint256)').hex()
+ASSET_CONFIG_UPDATED_TOPIC = '0x' + event_signature_to_log_topic(
+    'AssetConfigUpdated(address,uint256)').hex()
+
+
+class LRUCache:
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, key):
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def set(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+def _topic_address(topic):
+    return to_checksum_address('0x' + topic[-40:])
+
+
+class RewardsIndex:
+    """
+    Aggregates of the controller events, updated block range by block range.
+    """
+
+    def __init__(self):
+        self.assets = []
+        self.total_accrued = 0
+        self.total_claimed = 0
+        self.accrued = defaultdict(int)
+        self.claimed = defaultdict(int)
+
+    def apply(self, log):
+        topics = log['topics']
+        if topics[0] == REWARDS_ACCRUED_TOPIC:
+            [amount] = decode_abi(['uint256'], bytes.fromhex(log['data'][2:]))
+            self.accrued[_topic_address(topics[1])] += amount
+            self.total_accrued += amount
+        elif topics[0] == REWARDS_CLAIMED_TOPIC:
+            [amount] = decode_abi(['uint256'], bytes.fromhex(log['data'][2:]))
+            self.claimed[_topic_address(topics[1])] += amount
+            self.total_claimed += amount
+        elif topics[0] == ASSET_CONFIG_UPDATED_TOPIC:
+            asset = _topic_address(topics[1])
+            if asset not in self.assets:
+                self.assets.append(asset)
+
+
+class RewardsAnalytics:
+    def __init__(self, client, controller, from_block, price_ratio=1,
+                 block_ttl=2, logs_chunk_size=5000, cache_size=10000, apr_window=APR_WINDOW):
+        self.client = client
+        self.controller = IncentivesControllerReader(client, controller)
+        self.price_ratio = price_ratio
+        self.apr_window = apr_window
+        self.block_ttl = block_ttl
+        self.logs_chunk_size = logs_chunk_size
+        self.index = RewardsIndex()
+        self.cache = LRUCache(cache_size)
+        self.indexed_block = from_block - 1
+        self._block = None
+        self._block_fetched_at = 0
+        self._refresh_lock = asyncio.Lock()
+
+    async def block(self):
+        """
+        Latest block, asked from the node at most once per `block_ttl` seconds.
+        """
+        if self._block is None or time.monotonic() - self._block_fetched_at > self.block_ttl:
+            self._block = await self.client.block_number()
+            self._block_fetched_at = time.monotonic()
+        return self._block
+
+    async def refresh(self):
+        """
+        Indexes events of the blocks mined since the previous refresh.
+        """
+        async with self._refresh_lock:
+            latest_block = await self.block()
+            while self.indexed_block < latest_block:
+                to_block = min(self.indexed_block + self.logs_chunk_size, latest_block)
+                logs = await self.client.call('eth_getLogs', [{
+                    'address': self.controller.address,
+                    'fromBlock': hex(self.indexed_block + 1),
+                    'toBlock': hex(to_block),
+                    'topics': [[REWARDS_ACCRUED_TOPIC, REWARDS_CLAIMED_TOPIC,
+                                ASSET_CONFIG_UPDATED_TOPIC]],
+                }])
+                for log in logs:
+                    self.index.apply(log)
+                self.indexed_block = to_block
+
+    async def _cached(self, key, block, read):
+        value = self.cache.get((block, key))
+        if value is None:
+            value = await read()
+            self.cache.set((block, key), value)
+        return value
+
+    async def assets(self):
+        block = await self.block()
+        return await self._cached('assets', block, lambda: self._read_assets(block))
+
+    async def _read_assets(self, block):
+        block_data = await self.client.call('eth_getBlockByNumber', [hex(block), False])
+        timestamp = int(block_data['timestamp'], 16)
+        distribution_end = await self.controller.get_distribution_end(block)
+        result = []
+        for asset in self.index.assets:
+            [index, emission_per_second, last_update_timestamp] = \
+                await self.controller.get_asset_data(asset, block)
+            [ends, emissions_per_second] = await self.controller.read(
+                'getEmissionSchedule(address)', ['address'], [asset],
+                ['uint256[]', 'uint256[]'], block)
+            [scaled_total_supply, total_supply] = await ContractReader(
+                self.client, asset).read_batch([
+                    ('scaledTotalSupply()', [], [], ['uint256']),
+                    ('totalSupply()', [], [], ['uint256'])], block)
+            [current_index, next_index] = [get_distribution_index(
+                index, emission_per_second, last_update_timestamp, scaled_total_supply,
+                distribution_end, ends, emissions_per_second, at)
+                for at in [timestamp, timestamp + self.apr_window]]
+            # the index grows by the rewards per scaled unit, the deposits are worth
+            # total_supply / scaled_total_supply per scaled unit
+            apr = 0
+            if total_supply != 0:
+                apr = ((next_index - current_index) * scaled_total_supply * SECONDS_PER_YEAR *
+                       self.price_ratio / (10**PRECISION * total_supply * self.apr_window))
+            result.append({
+                'asset': asset,
+                'index': index,
+                'emission_per_second': emission_per_second,
+                'emission_schedule': list(zip(ends, emissions_per_second)),
+                'last_update_timestamp': last_update_timestamp,
+                'scaled_total_supply': scaled_total_supply,
+                'total_supply': total_supply,
+                'apr': apr,
+            })
+        return result
+
+    async def totals(self):
+        block = await self.block()
+        return await self._cached('totals', block, lambda: self._read_totals(block))
+
+    async def _read_totals(self, block):
+        [liabilities, balance] = await self.controller.read(
+            'getRewardsLiabilities()', [], [], ['uint256', 'uint256'], block)
+        return {
+            'block': block,
+            'total_emitted': liabilities + self.index.total_claimed,
+            'total_accrued': self.index.total_accrued,
+            'total_claimed': self.index.total_claimed,
+            'liabilities': liabilities,
+            'balance': balance,
+        }
+
+    async def user(self, user):
+        user = to_checksum_address(user)
+        block = await self.block()
+        rewards_balance = await self._cached(
+            ('user', user), block, lambda: self._read_user_rewards(user, block))
+        return {
+            'user': user,
+            'block': block,
+            'accrued': self.index.accrued.get(user, 0),
+            'claimed': self.index.claimed.get(user, 0),
+            'rewards_balance': rewards_balance,
+        }
+
+    async def _read_user_rewards(self, user, block):
+        balances = await self.controller.get_rewards_balances(self.index.assets, [user], block)
+        return balances[user]
+
+
+def create_app(analytics, poll_interval=5):
+    routes = web.RouteTableDef()
+
+    @routes.get('/assets')
+    async def assets(request):
+        return web.json_response(await analytics.assets())
+
+    @routes.get('/totals')
+    async def totals(request):
+        return web.json_response(await analytics.totals())
+
+    @routes.get('/users/{address}')
+    async def user(request):
+        try:
+            return web.json_response(await analytics.user(request.match_info['address']))
+        except ValueError:
+            raise web.HTTPBadRequest(text='invalid address')
+
+    async def poll(app):
+        while True:
+            await analytics.refresh()
+            await asyncio.sleep(poll_interval)
+
+    async def start_polling(app):
+        app['poll'] = asyncio.create_task(poll(app))
+
+    async def stop_polling(app):
+        app['poll'].cancel()
+        await analytics.client.close()
+
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(start_polling)
+    app.on_cleanup.append(stop_polling)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rpc', default='http://127.0.0.1:8545')
+    parser.add_argument('--controller', required=True)
+    parser.add_argument('--from-block', type=int, default=0)
+    parser.add_argument('--price-ratio', type=float, default=1,
+                        help='price of the reward token in units of the asset')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--poll-interval', type=float, default=5)
+    args = parser.parse_args()
+
+    async def create():
+        client = RpcClient(args.rpc)
+        await client.open()
+        analytics = RewardsAnalytics(client, args.controller, args.from_block,
+                                     price_ratio=args.price_ratio)
+        return create_app(analytics, args.poll_interval)
+
+    web.run_app(create(), port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""
+Streaming payout audit of ERC20TokenIncentivesController.
+
+Replays the controller events in block order and recomputes the rewards
+accrued and claimed by every user, then adds the rewards pending on a snapshot
+of the scaled balances at the audited block. Only the discrepancies are
+written out, one JSON object per line, as soon as they are found:
+
+    index_mismatch     a user index was moved to a value other than the index
+                       of its distribution
+    orphan_accrual     rewards accrued without a move of the user indexes
+    accrual_mismatch   rewards accrued other than the scaled balance of the user
+                       times the moves of its indexes in the transaction
+    overclaim          a claim above the rewards accrued and not claimed yet
+    asset_index        the replayed index of a distribution differs from the
+                       contract at the audited block
+    unclaimed          getUserUnclaimedRewards of a sampled user differs
+    rewards_balance    getRewardsBalance of a sampled user differs
+
+    python -m monitoring.audit --rpc <archive node url> --controller 0x... \\
+        --from-block 13000000 --block 14000000 --balances balances.csv
+
+Logs are fetched in block ranges (or read from a JSON lines file with
+--logs) and the balances csv of `user,asset,scaled_balance` rows is read
+row by row, so memory depends on the number of users, not on the number of
+events. All rewards math is the exact integer math of monitoring.rewards.
+The audit must start at the deployment block of the controller, as claims
+are checked against the accruals seen before them.
+
+Accruals are recomputed with get_rewards from the scaled balance the
+controller accrued on, read from the asset at the block before the transaction. The index of a
+distribution doesn't move within a block, so a user index moves at most once
+per block and the balance before its block is the one of the move.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+import sys
+
+from eth_utils import event_signature_to_log_topic, to_checksum_address
+
+from monitoring.client import ContractReader, IncentivesControllerReader, RpcClient
+from monitoring.rewards import get_distribution_index, get_rewards
+
+ASSET_INDEX_UPDATED_TOPIC = '0x' + event_signature_to_log_topic(
+    'AssetIndexUpdated(address,uint256)').hex()
+USER_INDEX_UPDATED_TOPIC = '0x' + event_signature_to_log_topic(
+    'UserIndexUpdated(address,address,uint256)').hex()
+REWARDS_ACCRUED_TOPIC = '0x' + event_signature_to_log_topic(
+    'RewardsAccrued(address,uint256)').hex()
+REWARDS_CLAIMED_TOPIC = '0x' + event_signature_to_log_topic(
+    'RewardsClaimed(address,address,address,uint256)').hex()
+AUDITED_TOPICS = [ASSET_INDEX_UPDATED_TOPIC, USER_INDEX_UPDATED_TOPIC,
+                  REWARDS_ACCRUED_TOPIC, REWARDS_CLAIMED_TOPIC]
+
+
+def _topic_address(topic):
+    # lowercase keys, checksummed only in the output
+    return '0x' + topic[-40:].lower()
+
+
+def _word(data, position=0):
+    return int(data[2 + 64 * position:66 + 64 * position], 16)
+
+
+async def iter_logs(client, address, from_block, to_block, chunk_size=5000):
+    """
+    Audited logs of the controller, fetched one block range at a time.
+    """
+    while from_block <= to_block:
+        chunk_end = min(from_block + chunk_size - 1, to_block)
+        logs = await client.call('eth_getLogs', [{
+            'address': to_checksum_address(address),
+            'fromBlock': hex(from_block),
+            'toBlock': hex(chunk_end),
+            'topics': [AUDITED_TOPICS],
+        }])
+        for log in logs:
+            yield log
+        from_block = chunk_end + 1
+
+
+async def read_logs_file(path, to_block):
+    """
+    Logs of a JSON lines file with raw eth_getLogs entries in block order.
+    """
+    with open(path) as f:
+        for line in f:
+            log = json.loads(line)
+            if int(log['blockNumber'], 16) > to_block:
+                break
+            yield log
+
+
+def read_balances(path):
+    """
+    (user, asset, scaled balance) rows of the balances csv.
+    """
+    with open(path) as f:
+        for row in csv.DictReader(f):
+            yield row['user'].lower(), row['asset'].lower(), int(row['scaled_balance'])
+
+
+class UserState:
+    __slots__ = ('accrued', 'claimed', 'pending', 'indexes')
+
+    def __init__(self):
+        self.accrued = 0
+        self.claimed = 0
+        self.pending = 0
+        self.indexes = {}
+
+    @property
+    def unclaimed(self):
+        return self.accrued - self.claimed
+
+
+class PayoutAudit:
+    def __init__(self):
+        self.asset_indexes = {}
+        self.users = {}
+        self._transaction = None
+        self._last_log = None
+        self._moved_users = set()
+        # rewards recomputed from the user index moves not matched by an accrual yet
+        self._expected_accruals = {}
+
+    def _user(self, user):
+        state = self.users.get(user)
+        if state is None:
+            state = self.users[user] = UserState()
+        return state
+
+    def apply(self, log, scaled_balances=None):
+        """
+        Applies a raw log of the controller, yields the discrepancies it reveals.
+        `scaled_balances` maps the (user, asset) index moves of the transaction to
+        the scaled balance of the user before it, accruals are recomputed when given.
+        """
+        if log['transactionHash'] != self._transaction:
+            yield from self.finish()
+            self._transaction = log['transactionHash']
+        self._last_log = log
+        topics = log['topics']
+        if topics[0] == ASSET_INDEX_UPDATED_TOPIC:
+            self.asset_indexes[_topic_address(topics[1])] = _word(log['data'])
+        elif topics[0] == USER_INDEX_UPDATED_TOPIC:
+            user = _topic_address(topics[1])
+            asset = _topic_address(topics[2])
+            index = _word(log['data'])
+            asset_index = self.asset_indexes.get(asset, 0)
+            if index != asset_index:
+                yield self._discrepancy(log, 'index_mismatch', user, asset=asset,
+                                        expected=asset_index, actual=index)
+            state = self._user(user)
+            if scaled_balances is not None:
+                expected = self._expected_accruals.get(user, 0)
+                self._expected_accruals[user] = expected + get_rewards(
+                    scaled_balances[(user, asset)], index, state.indexes.get(asset, 0))
+            state.indexes[asset] = index
+            self._moved_users.add(user)
+        elif topics[0] == REWARDS_ACCRUED_TOPIC:
+            user = _topic_address(topics[1])
+            amount = _word(log['data'])
+            if user not in self._moved_users:
+                yield self._discrepancy(log, 'orphan_accrual', user, expected=0, actual=amount)
+            elif user in self._expected_accruals:
+                expected = self._expected_accruals.pop(user)
+                if amount != expected:
+                    yield self._discrepancy(log, 'accrual_mismatch', user,
+                                            expected=expected, actual=amount)
+            self._user(user).accrued += amount
+        elif topics[0] == REWARDS_CLAIMED_TOPIC:
+            user = _topic_address(topics[1])
+            amount = _word(log['data'])
+            state = self._user(user)
+            if amount > state.unclaimed:
+                yield self._discrepancy(log, 'overclaim', user,
+                                        expected=state.unclaimed, actual=amount)
+            state.claimed += amount
+
+    def finish(self):
+        """
+        Ends the transaction of the last applied log, yields the recomputed rewards
+        the transaction hasn't accrued.
+        """
+        for user, expected in self._expected_accruals.items():
+            if expected != 0:
+                yield self._discrepancy(self._last_log, 'accrual_mismatch', user,
+                                        expected=expected, actual=0)
+        self._expected_accruals.clear()
+        self._moved_users.clear()
+
+    def apply_balance(self, user, asset, scaled_balance, asset_index):
+        """
+        Adds the rewards pending on the balance since the last move of the user index.
+        """
+        state = self._user(user)
+        state.pending += get_rewards(scaled_balance, asset_index, state.indexes.get(asset, 0))
+
+    @staticmethod
+    def _discrepancy(log, kind, user, expected, actual, asset=None):
+        discrepancy = {
+            'kind': kind,
+            'block': int(log['blockNumber'], 16),
+            'transaction': log['transactionHash'],
+            'user': to_checksum_address(user),
+            'expected': expected,
+            'actual': actual,
+        }
+        if asset is not None:
+            discrepancy['asset'] = to_checksum_address(asset)
+        return discrepancy
+
+
+def sample_users(users, size, seed=0):
+    """
+    Reservoir sample of the users, the iterable is consumed once.
+    """
+    rng = random.Random(seed)
+    sample = []
+    for i, user in enumerate(users):
+        if i < size:
+            sample.append(user)
+        else:
+            j = rng.randrange(i + 1)
+            if j < size:
+                sample[j] = user
+    return sample
+
+
+async def iter_transactions(logs):
+    """
+    Lists of the consecutive logs of every transaction.
+    """
+    transaction_logs = []
+    async for log in logs:
+        if transaction_logs and log['transactionHash'] != transaction_logs[0]['transactionHash']:
+            yield transaction_logs
+            transaction_logs = []
+        transaction_logs.append(log)
+    if transaction_logs:
+        yield transaction_logs
+
+
+async def read_scaled_balances(client, moves, block):
+    """
+    Scaled balances of the (user, asset) pairs at the block, as the controller reads them.
+    """
+    results = await client.eth_calls([
+        (asset, ContractReader.encode(
+            'getScaledUserBalanceAndSupply(address)', ['address'], [to_checksum_address(user)]))
+        for user, asset in moves], block)
+    return {move: ContractReader.decode(['uint256', 'uint256'], result)[0]
+            for move, result in zip(moves, results)}
+
+
+async def read_asset_indexes(controller, assets, block, timestamp):
+    """
+    Index of every distribution at the timestamp of the block, with the
+    stored state of the distribution at the block.
+    """
+    distribution_end = await controller.get_distribution_end(block)
+    indexes = {}
+    for asset in assets:
+        [index, emission_per_second, last_update_timestamp] = \
+            await controller.get_asset_data(asset, block)
+        [ends, emissions_per_second] = await controller.read(
+            'getEmissionSchedule(address)', ['address'], [to_checksum_address(asset)],
+            ['uint256[]', 'uint256[]'], block)
+        total_staked = await ContractReader(controller.client, asset).read(
+            'scaledTotalSupply()', [], [], ['uint256'], block)
+        indexes[asset.lower()] = (index, get_distribution_index(
+            index, emission_per_second, last_update_timestamp, total_staked,
+            distribution_end, ends, emissions_per_second, timestamp))
+    return indexes
+
+
+async def run_audit(client, controller_address, logs, balances, block, sample_size=100,
+                    seed=0):
+    """
+    Audits the controller at the block, yields the discrepancies. `logs` is
+    an async iterable of raw logs up to the block and `balances` an iterable
+    of (user, asset, scaled balance) at the block.
+    """
+    audit = PayoutAudit()
+    async for transaction_logs in iter_transactions(logs):
+        moves = list(dict.fromkeys(
+            (_topic_address(log['topics'][1]), _topic_address(log['topics'][2]))
+            for log in transaction_logs if log['topics'][0] == USER_INDEX_UPDATED_TOPIC))
+        scaled_balances = await read_scaled_balances(
+            client, moves, int(transaction_logs[0]['blockNumber'], 16) - 1)
+        for log in transaction_logs:
+            for discrepancy in audit.apply(log, scaled_balances):
+                yield discrepancy
+    for discrepancy in audit.finish():
+        yield discrepancy
+
+    # the distributions are the assets of the replayed logs and of the balances
+    # csv, the latter read on their first row as the csv is streamed once
+    controller = IncentivesControllerReader(client, controller_address)
+    header = await client.call('eth_getBlockByNumber', [hex(block), False])
+    timestamp = int(header['timestamp'], 16)
+    asset_indexes = {}
+
+    async def read_distributions(assets):
+        new_indexes = await read_asset_indexes(controller, assets, block, timestamp)
+        asset_indexes.update(new_indexes)
+        for asset, (stored_index, _) in new_indexes.items():
+            replayed_index = audit.asset_indexes.get(asset, 0)
+            if replayed_index != stored_index:
+                yield {'kind': 'asset_index', 'block': block,
+                       'asset': to_checksum_address(asset),
+                       'expected': replayed_index, 'actual': stored_index}
+
+    async for discrepancy in read_distributions(list(audit.asset_indexes)):
+        yield discrepancy
+    for user, asset, scaled_balance in balances:
+        if asset not in asset_indexes:
+            async for discrepancy in read_distributions([asset]):
+                yield discrepancy
+        audit.apply_balance(user, asset, scaled_balance, asset_indexes[asset][1])
+
+    sample = [to_checksum_address(user)
+              for user in sample_users(iter(audit.users), sample_size, seed)]
+    unclaimed = await controller.get_users_unclaimed_rewards(sample, block)
+    rewards_balances = await controller.get_rewards_balances(list(asset_indexes), sample, block)
+    for user in sample:
+        state = audit.users[user.lower()]
+        if unclaimed[user] != state.unclaimed:
+            yield {'kind': 'unclaimed', 'block': block, 'user': user,
+                   'expected': state.unclaimed, 'actual': unclaimed[user]}
+        if rewards_balances[user] != state.unclaimed + state.pending:
+            yield {'kind': 'rewards_balance', 'block': block, 'user': user,
+                   'expected': state.unclaimed + state.pending, 'actual': rewards_balances[user]}
+
+
+async def _main(args, out):
+    async with RpcClient(args.rpc) as client:
+        block = args.block if args.block is not None else await client.block_number()
+        if args.logs is not None:
+            logs = read_logs_file(args.logs, block)
+        else:
+            logs = iter_logs(client, args.controller, args.from_block, block, args.chunk_size)
+        count = 0
+        async for discrepancy in run_audit(client, args.controller, logs,
+                                           read_balances(args.balances), block,
+                                           args.sample_size, args.seed):
+            out.write(json.dumps(discrepancy) + '\n')
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rpc', default='http://127.0.0.1:8545')
+    parser.add_argument('--controller', required=True)
+    parser.add_argument('--from-block', type=int, default=0,
+                        help='deployment block of the controller')
+    parser.add_argument('--block', type=int, help='audited block, the latest one by default')
+    parser.add_argument('--balances', required=True,
+                        help='csv with user,asset,scaled_balance rows at the audited block')
+    parser.add_argument('--logs', help='JSON lines file of the controller logs')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--sample-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    count = asyncio.run(_main(args, sys.stdout))
+    sys.exit(1 if count else 0)
+
+
+if __name__ == '__main__':
+    main()
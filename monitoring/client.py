@@ -0,0 +1,239 @@
+"""
+Asynchronous read-only client for ERC20TokenIncentivesController and
+RewardsManager. Uses one pooled HTTP session, JSON-RPC batch requests and a
+read cache pinned to block numbers, so sweeps over many users cost a few
+round trips instead of one blocking call per user.
+
+    async with RpcClient('http://127.0.0.1:8545') as client:
+        controller = IncentivesControllerReader(client, controller_address)
+        block = await client.block_number()
+        balances = await controller.get_rewards_balances([asset], users, block)
+"""
+import asyncio
+import itertools
+
+import aiohttp
+from eth_abi import decode_abi, encode_abi
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+
+class RpcError(Exception):
+    pass
+
+
+class RpcClient:
+    """
+    JSON-RPC client over a pooled aiohttp session. Results of eth_call
+    pinned to a block number are cached, as they can never change.
+    """
+
+    def __init__(self, url, max_connections=16, batch_size=100, cache_size=100000):
+        self.url = url
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._session = None
+        self._ids = itertools.count()
+        self._semaphore = None
+        self._cache = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def open(self):
+        if self._session is None:
+            # bound to the running event loop, so created here rather than in __init__
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections))
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _post(self, payload):
+        async with self._semaphore:
+            async with self._session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    def _request(self, method, params):
+        return {'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': params}
+
+    @staticmethod
+    def _result(response):
+        if 'error' in response:
+            raise RpcError(response['error'])
+        return response['result']
+
+    async def call(self, method, params):
+        return self._result(await self._post(self._request(method, params)))
+
+    async def batch(self, calls):
+        """
+        Sends (method, params) pairs as JSON-RPC batches of `batch_size`
+        requests, concurrently. Returns the results in order.
+        """
+        requests = [self._request(method, params) for method, params in calls]
+        chunks = [requests[i:i + self.batch_size]
+                  for i in range(0, len(requests), self.batch_size)]
+        responses = await asyncio.gather(*[self._post(chunk) for chunk in chunks])
+        for chunk in responses:
+            # a node rejecting the whole batch answers with a single error object
+            if not isinstance(chunk, list):
+                raise RpcError(chunk.get('error', chunk) if isinstance(chunk, dict) else chunk)
+        by_id = {response['id']: response
+                 for chunk in responses for response in chunk}
+        return [self._result(by_id[request['id']]) for request in requests]
+
+    async def block_number(self):
+        return int(await self.call('eth_blockNumber', []), 16)
+
+    async def eth_calls(self, calls, block):
+        """
+        Executes (to, data) eth_calls at the block, serving repeated ones from cache.
+        """
+        keys = [(block, to.lower(), data) for to, data in calls]
+        missing = list(dict.fromkeys(key for key in keys if key not in self._cache))
+        if missing:
+            results = await self.batch([
+                ('eth_call', [{'to': to, 'data': data}, hex(block)])
+                for block, to, data in missing])
+            if len(self._cache) + len(missing) > self.cache_size:
+                self._cache.clear()
+            self._cache.update(zip(missing, results))
+        return [self._cache[key] for key in keys]
+
+
+def _split_types(types):
+    """
+    Top level components of a comma separated list of ABI types.
+    """
+    components, depth, start = [], 0, 0
+    for i, char in enumerate(types):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            components.append(types[start:i])
+            start = i + 1
+    if types:
+        components.append(types[start:])
+    return components
+
+
+def checksum_addresses(abi_type, value):
+    """
+    The decoded value with every address of the ABI type checksummed, as eth-abi returns them
+    in lowercase.
+    """
+    if abi_type == 'address':
+        return to_checksum_address(value)
+    if abi_type.endswith(']'):
+        item_type = abi_type[:abi_type.rindex('[')]
+        return [checksum_addresses(item_type, item) for item in value]
+    if abi_type.startswith('('):
+        return tuple(checksum_addresses(component_type, component) for component_type, component
+                     in zip(_split_types(abi_type[1:-1]), value))
+    return value
+
+
+class ContractReader:
+    def __init__(self, client, address):
+        self.client = client
+        self.address = to_checksum_address(address)
+
+    @staticmethod
+    def encode(signature, arg_types, args):
+        selector = function_signature_to_4byte_selector(signature)
+        return '0x' + (selector + encode_abi(arg_types, args)).hex()
+
+    @staticmethod
+    def decode(return_types, result):
+        values = [checksum_addresses(return_type, value) for return_type, value in
+                  zip(return_types, decode_abi(return_types, bytes.fromhex(result[2:])))]
+        return values[0] if len(values) == 1 else values
+
+    async def read_batch(self, reads, block):
+        """
+        Executes (signature, arg_types, args, return_types) reads in one batch.
+        """
+        results = await self.client.eth_calls([
+            (self.address, self.encode(signature, arg_types, args))
+            for signature, arg_types, args, _ in reads], block)
+        return [self.decode(read[3], result) for read, result in zip(reads, results)]
+
+    async def read_many(self, signature, arg_types, args_list, return_types, block):
+        return await self.read_batch(
+            [(signature, arg_types, args, return_types) for args in args_list], block)
+
+    async def read(self, signature, arg_types, args, return_types, block):
+        return (await self.read_many(signature, arg_types, [args], return_types, block))[0]
+
+
+class IncentivesControllerReader(ContractReader):
+    async def get_rewards_balances(self, assets, users, block):
+        """
+        Rewards balance of every user over the assets, fetched concurrently.
+        """
+        assets = [to_checksum_address(asset) for asset in assets]
+        balances = await self.read_many(
+            'getRewardsBalance(address[],address)', ['address[]', 'address'],
+            [[assets, to_checksum_address(user)] for user in users], ['uint256'], block)
+        return dict(zip(users, balances))
+
+    async def get_users_unclaimed_rewards(self, users, block):
+        unclaimed = await self.read_many(
+            'getUserUnclaimedRewards(address)', ['address'],
+            [[to_checksum_address(user)] for user in users], ['uint256'], block)
+        return dict(zip(users, unclaimed))
+
+    async def get_asset_data(self, asset, block):
+        return await self.read(
+            'getAssetData(address)', ['address'], [to_checksum_address(asset)],
+            ['uint256', 'uint256', 'uint256'], block)
+
+    async def get_distribution_end(self, block):
+        return await self.read('getDistributionEnd()', [], [], ['uint256'], block)
+
+    async def get_reward_token(self, block):
+        return await self.read('REWARD_TOKEN()', [], [], ['address'], block)
+
+
+class RewardsManagerReader(ContractReader):
+    FIELDS = {
+        'owner': 'address',
+        'rewards_contract': 'address',
+        'rewards_initializer': 'address',
+        'rewards_duration': 'uint256',
+        'staking_token': 'address',
+        'period_finish': 'uint256',
+        'is_rewards_period_finished': 'bool',
+    }
+
+    async def get_status(self, block):
+        """
+        All public state of the manager, fetched in one batch.
+        """
+        values = await self.read_batch([
+            (f'{name}()', [], [], [return_type])
+            for name, return_type in self.FIELDS.items()], block)
+        return dict(zip(self.FIELDS, values))
+
+
+class ControllerFactoryReader(ContractReader):
+    FIELDS = ['controller', 'asset', 'reward_token', 'emission_manager']
+
+    async def get_controllers(self, block):
+        """
+        Registry of the controllers deployed by IncentivesControllerFactory.
+        """
+        controllers = await self.read(
+            'getControllers()', [], [], ['(address,address,address,address)[]'], block)
+        return [dict(zip(self.FIELDS, controller)) for controller in controllers]
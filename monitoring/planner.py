@@ -0,0 +1,170 @@
+"""
+Emission planner: backtests candidate RewardsManager schedules over a series
+of astETH `scaledTotalSupply` values and recommends rewards period durations.
+
+Every candidate is an (amount, rewards_duration) pair: `amount` is the reward
+token balance of the manager at every `start_next_rewards_period`, which is
+called `rollover_delay` seconds after the end of the previous period. As in
+the contracts, the emission per second is `amount // rewards_duration` and the
+rewards of the seconds when nothing is staked are lost, because the index of
+the distribution doesn't move.
+
+    python -m monitoring.planner supply.csv --amount 1000e18 \\
+        --durations 86400:7776000:86400 --price-ratio 0.002
+
+The csv has `timestamp,scaled_total_supply` rows, the supply is held constant
+until the next row.
+"""
+import argparse
+import csv
+
+import numpy as np
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+
+def load_supply_series(path):
+    with open(path) as f:
+        rows = [(int(row['timestamp']), float(row['scaled_total_supply']))
+                for row in csv.DictReader(f)]
+    timestamps, supply = zip(*sorted(rows))
+    return np.array(timestamps, dtype=np.int64), np.array(supply, dtype=np.float64)
+
+
+def synthetic_supply_series(duration, step, initial_supply, daily_growth=0, volatility=0,
+                            zero_supply_spans=(), seed=0):
+    """
+    Geometric random walk of the supply sampled every `step` seconds, with the
+    supply forced to zero over the (start, end) offsets of `zero_supply_spans`.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0, duration, step, dtype=np.int64)
+    steps_per_day = 24 * 60 * 60 / step
+    log_returns = rng.normal(
+        daily_growth / steps_per_day, volatility / np.sqrt(steps_per_day), len(timestamps))
+    log_returns[0] = 0
+    supply = initial_supply * np.exp(np.cumsum(log_returns))
+    for start, end in zero_supply_spans:
+        supply[(timestamps >= start) & (timestamps < end)] = 0
+    return timestamps, supply
+
+
+def _active_seconds(offsets, durations, cycles):
+    """
+    Seconds of [0, offset) covered by rewards periods, for every candidate
+    (rows) and offset (columns). Periods of `durations` repeat every `cycles`.
+    """
+    durations = durations[:, None]
+    cycles = cycles[:, None]
+    return offsets[None, :] // cycles * durations + np.minimum(offsets[None, :] % cycles, durations)
+
+
+def backtest(timestamps, supply, amounts, durations, rollover_delay=0, price_ratio=1,
+             keep_apr=False, chunk_size=512):
+    """
+    Simulates every candidate schedule over the whole series at once. `amounts`
+    and `durations` are arrays of the same length, amounts in the units of the
+    supply. Returns a dict of per-candidate arrays:
+        emission_per_second, emitted, lost_to_zero_supply, rounding_loss,
+        mean_apr, min_apr, max_apr, apr_std
+    and with `keep_apr` also `apr`, the APR over time of every candidate
+    (candidates x intervals).
+    """
+    # same integer division as the manager
+    emission_per_second = np.array(
+        [int(amount) // int(duration) for amount, duration in zip(amounts, durations)],
+        dtype=np.float64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    durations = np.asarray(durations, dtype=np.int64)
+    cycles = durations + rollover_delay
+    offsets = timestamps - timestamps[0]
+    interval_supply = supply[:-1]
+    zero_supply = interval_supply == 0
+    apr_per_emission = np.divide(
+        SECONDS_PER_YEAR * price_ratio, interval_supply,
+        out=np.zeros_like(interval_supply), where=~zero_supply)
+    interval_lengths = np.diff(offsets).astype(np.float64)
+
+    count = len(amounts)
+    result = {name: np.zeros(count) for name in [
+        'emitted', 'lost_to_zero_supply', 'mean_apr', 'min_apr', 'max_apr', 'apr_std']}
+    if keep_apr:
+        result['apr'] = np.zeros((count, len(interval_supply)))
+    for start in range(0, count, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        active = np.diff(_active_seconds(offsets, durations[chunk], cycles[chunk]), axis=1)
+        emitted = active * emission_per_second[chunk, None]
+        result['emitted'][chunk] = emitted.sum(axis=1)
+        result['lost_to_zero_supply'][chunk] = emitted[:, zero_supply].sum(axis=1)
+
+        # APR while rewards are distributed, weighted by time
+        apr = (active > 0) * emission_per_second[chunk, None] * apr_per_emission[None, :]
+        if keep_apr:
+            result['apr'][chunk] = apr
+        weights = interval_lengths * ~zero_supply
+        mean_apr = (apr * weights).sum(axis=1) / max(weights.sum(), 1)
+        result['mean_apr'][chunk] = mean_apr
+        result['apr_std'][chunk] = np.sqrt(
+            ((apr - mean_apr[:, None]) ** 2 * weights).sum(axis=1) / max(weights.sum(), 1))
+        masked_apr = np.where(zero_supply, np.nan, apr)
+        if (~zero_supply).any():
+            result['min_apr'][chunk] = np.nanmin(masked_apr, axis=1)
+            result['max_apr'][chunk] = np.nanmax(masked_apr, axis=1)
+
+    result['emission_per_second'] = emission_per_second
+    periods = np.ceil(offsets[-1] / cycles)
+    result['rounding_loss'] = (amounts - emission_per_second * durations) * periods
+    return result
+
+
+def recommend_durations(durations, result, min_mean_apr=0, top=5):
+    """
+    Durations of the candidates wasting the smallest share of the rewards (lost
+    to zero supply and to rounding), ties broken by the most stable APR.
+    Candidates with mean APR below `min_mean_apr` are skipped.
+    """
+    durations = np.asarray(durations)
+    wasted = result['lost_to_zero_supply'] + result['rounding_loss']
+    waste = wasted / np.maximum(result['emitted'] + result['rounding_loss'], 1)
+    order = np.lexsort((result['apr_std'], waste))
+    order = order[result['mean_apr'][order] >= min_mean_apr]
+    recommended = []
+    for i in order:
+        if durations[i] not in recommended:
+            recommended.append(int(durations[i]))
+        if len(recommended) == top:
+            break
+    return recommended
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('supply', help='csv with timestamp,scaled_total_supply rows')
+    parser.add_argument('--amount', type=float, action='append', required=True,
+                        help='reward amount per period, may be repeated')
+    parser.add_argument('--durations', default='86400:7776000:86400',
+                        help='start:stop:step of the rewards_duration grid, in seconds')
+    parser.add_argument('--rollover-delay', type=int, default=0)
+    parser.add_argument('--price-ratio', type=float, default=1,
+                        help='price of the reward token in units of the staked asset')
+    parser.add_argument('--min-mean-apr', type=float, default=0)
+    args = parser.parse_args()
+
+    timestamps, supply = load_supply_series(args.supply)
+    grid = np.arange(*[int(value) for value in args.durations.split(':')])
+    amounts = np.repeat(args.amount, len(grid))
+    durations = np.tile(grid, len(args.amount))
+    result = backtest(timestamps, supply, amounts, durations,
+                      args.rollover_delay, args.price_ratio)
+
+    print(f'{"amount":>24}{"duration":>10}{"emitted":>24}{"lost":>24}{"mean APR":>10}{"APR std":>10}')
+    for i in np.argsort(result['lost_to_zero_supply'])[:20]:
+        print(f'{amounts[i]:>24.0f}{durations[i]:>10}{result["emitted"][i]:>24.0f}'
+              f'{result["lost_to_zero_supply"][i]:>24.0f}{result["mean_apr"][i]:>10.2%}'
+              f'{result["apr_std"][i]:>10.2%}')
+    print('recommended set_rewards_period_duration values:',
+          recommend_durations(durations, result, args.min_mean_apr))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Off-chain reconstruction of the per-user rewards state of the controller
+builds with reduced events.
+
+CompactEventsIncentivesController logs UserRewardsUpdated with the new index
+and the accrued rewards on every move of an user index, so the state follows
+from its logs and RewardsClaimed directly (`CompactEventsState`).
+
+NoEventsIncentivesController logs only the configuration and the claims, the
+indexes are replayed with the contract math from the handleAction calldata
+(`ReplayedState`). Calldata of the internal handleAction calls is taken from
+call traces. Claims and configuration read the total staked from the asset,
+the caller supplies it, e.g. from the following handleAction of the asset.
+"""
+from collections import defaultdict
+
+from eth_abi import decode_abi
+from eth_utils import event_signature_to_log_topic, to_checksum_address
+
+from monitoring.rewards import get_asset_index, get_rewards, get_scheduled_asset_index
+
+USER_REWARDS_UPDATED_TOPIC = '0x' + event_signature_to_log_topic(
+    'UserRewardsUpdated(address,address,uint256,uint256)').hex()
+REWARDS_CLAIMED_TOPIC = '0x' + event_signature_to_log_topic(
+    'RewardsClaimed(address,address,address,uint256)').hex()
+
+
+def _topic_address(topic):
+    return to_checksum_address('0x' + topic[-40:])
+
+
+class CompactEventsState:
+    def __init__(self):
+        self.asset_indexes = {}
+        self.user_indexes = defaultdict(dict)
+        self.unclaimed_rewards = defaultdict(int)
+
+    def apply_user_rewards_updated(self, user, asset, index, accrued_rewards):
+        # the user index is always moved to the just updated index of the distribution
+        self.asset_indexes[asset] = index
+        self.user_indexes[user][asset] = index
+        self.unclaimed_rewards[user] += accrued_rewards
+
+    def apply_rewards_claimed(self, user, amount):
+        self.unclaimed_rewards[user] -= amount
+
+    def apply_log(self, log):
+        """
+        Applies a raw eth_getLogs entry of the controller.
+        """
+        topics = log['topics']
+        data = bytes.fromhex(log['data'][2:])
+        if topics[0] == USER_REWARDS_UPDATED_TOPIC:
+            [asset, index, accrued_rewards] = decode_abi(['address', 'uint256', 'uint256'], data)
+            self.apply_user_rewards_updated(
+                _topic_address(topics[1]), to_checksum_address(asset), index, accrued_rewards)
+        elif topics[0] == REWARDS_CLAIMED_TOPIC:
+            [amount] = decode_abi(['uint256'], data)
+            self.apply_rewards_claimed(_topic_address(topics[1]), amount)
+
+
+class ReplayedAsset:
+    def __init__(self):
+        self.index = 0
+        self.emission_per_second = 0
+        self.last_update_timestamp = 0
+        self.ends = []
+        self.emissions_per_second = []
+
+
+class ReplayedState(CompactEventsState):
+    def __init__(self, distribution_end=0):
+        super().__init__()
+        self.distribution_end = distribution_end
+        self.assets = defaultdict(ReplayedAsset)
+
+    def _update_asset(self, asset, total_staked, timestamp):
+        """
+        Same as `_updateAssetStateInternal`.
+        """
+        state = self.assets[asset]
+        if timestamp == state.last_update_timestamp:
+            return state.index
+        if state.emission_per_second == 0 and len(state.ends) != 0:
+            state.index = get_scheduled_asset_index(
+                state.index, state.last_update_timestamp, total_staked,
+                state.ends, state.emissions_per_second, timestamp)
+        else:
+            state.index = get_asset_index(
+                state.index, state.emission_per_second, state.last_update_timestamp,
+                total_staked, self.distribution_end, timestamp)
+        state.last_update_timestamp = timestamp
+        self.asset_indexes[asset] = state.index
+        return state.index
+
+    def _update_user(self, user, asset, staked_by_user, total_staked, timestamp):
+        """
+        Same as `_updateUserAssetInternal`, returns the accrued rewards.
+        """
+        index = self._update_asset(asset, total_staked, timestamp)
+        user_index = self.user_indexes[user].get(asset, 0)
+        if user_index == index:
+            return 0
+        self.user_indexes[user][asset] = index
+        return get_rewards(staked_by_user, index, user_index)
+
+    def apply_distribution_end(self, distribution_end):
+        self.distribution_end = distribution_end
+
+    def apply_asset_config(self, asset, emission_per_second, total_staked, timestamp):
+        self._update_asset(asset, total_staked, timestamp)
+        self.assets[asset].emission_per_second = emission_per_second
+        self.assets[asset].ends = []
+        self.assets[asset].emissions_per_second = []
+
+    def apply_emission_schedule(self, asset, ends, emissions_per_second, total_staked, timestamp):
+        self._update_asset(asset, total_staked, timestamp)
+        self.assets[asset].emission_per_second = 0
+        self.assets[asset].ends = list(ends)
+        self.assets[asset].emissions_per_second = list(emissions_per_second)
+
+    def apply_handle_action(self, asset, user, total_supply, user_balance, timestamp):
+        """
+        Applies `handleAction(user, totalSupply, userBalance)` called by the asset.
+        """
+        self.unclaimed_rewards[user] += self._update_user(
+            user, asset, user_balance, total_supply, timestamp)
+
+    def apply_claim(self, user, stakes, amount, timestamp):
+        """
+        Applies a claim of the user. `stakes` are (asset, staked by user, total
+        staked) of the claimed assets and `amount` is the RewardsClaimed amount.
+        """
+        for asset, staked_by_user, total_staked in stakes:
+            self.unclaimed_rewards[user] += self._update_user(
+                user, asset, staked_by_user, total_staked, timestamp)
+        self.apply_rewards_claimed(user, amount)
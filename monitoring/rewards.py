@@ -0,0 +1,91 @@
+"""
+Off-chain replica of the DistributionManager rewards math. All values are
+integers and rounding follows the contracts exactly.
+"""
+
+PRECISION = 18
+
+
+def get_asset_index(current_index, emission_per_second, last_update_timestamp,
+                    total_balance, distribution_end, timestamp):
+    """
+    Index of the distribution at the timestamp, same as `_getAssetIndexAt`.
+    """
+    if (emission_per_second == 0 or total_balance == 0 or
+            last_update_timestamp == timestamp or
+            last_update_timestamp >= distribution_end):
+        return current_index
+    current_timestamp = min(timestamp, distribution_end)
+    time_delta = current_timestamp - last_update_timestamp
+    return emission_per_second * time_delta * 10**PRECISION // total_balance + current_index
+
+
+def get_scheduled_emission(ends, emissions_per_second, start, end):
+    """
+    Emission of a schedule over [start, end), same as `_getScheduledEmission`.
+    """
+    emission = 0
+    segment_start = 0
+    for segment_end, emission_per_second in zip(ends, emissions_per_second):
+        if segment_end > start:
+            emission += emission_per_second * \
+                (min(end, segment_end) - max(start, segment_start))
+            if end <= segment_end:
+                break
+        segment_start = segment_end
+    return emission
+
+
+def get_scheduled_asset_index(current_index, last_update_timestamp, total_balance,
+                              ends, emissions_per_second, timestamp):
+    """
+    Index of a distribution with an emission schedule at the timestamp, same as
+    `_getScheduledAssetIndexAt`.
+    """
+    if total_balance == 0 or last_update_timestamp >= timestamp:
+        return current_index
+    emission = get_scheduled_emission(
+        ends, emissions_per_second, last_update_timestamp, timestamp)
+    return emission * 10**PRECISION // total_balance + current_index
+
+
+def get_distribution_index(current_index, emission_per_second, last_update_timestamp,
+                           total_balance, distribution_end, ends, emissions_per_second,
+                           timestamp):
+    """
+    Index of a distribution at the timestamp, with the emission schedule used
+    while the emission per second is zero, same as `_updateAssetStateInternal`.
+    """
+    if emission_per_second == 0 and len(ends) != 0:
+        return get_scheduled_asset_index(current_index, last_update_timestamp, total_balance,
+                                         ends, emissions_per_second, timestamp)
+    return get_asset_index(current_index, emission_per_second, last_update_timestamp,
+                           total_balance, distribution_end, timestamp)
+
+
+def get_rewards(principal_user_balance, reserve_index, user_index):
+    """
+    Rewards of the user between two index values, same as `_getRewards`.
+    """
+    return principal_user_balance * (reserve_index - user_index) // 10**PRECISION
+
+
+def project_rewards_balance(incentives_controller, assets, user, timestamp):
+    """
+    Python counterpart of `getRewardsBalanceAt`: rewards the user will have by
+    the timestamp if emission and balances stay unchanged until then.
+    `assets` are contract objects implementing IScaledBalanceToken.
+    """
+    distribution_end = incentives_controller.getDistributionEnd()
+    rewards = incentives_controller.getUserUnclaimedRewards(user)
+    for asset in assets:
+        [index, emission_per_second, last_update_timestamp] = \
+            incentives_controller.getAssetData(asset)
+        [staked_by_user, total_staked] = asset.getScaledUserBalanceAndSupply(user)
+        [ends, emissions_per_second] = incentives_controller.getEmissionSchedule(asset)
+        asset_index = get_distribution_index(
+            index, emission_per_second, last_update_timestamp, total_staked, distribution_end,
+            ends, emissions_per_second, timestamp)
+        user_index = incentives_controller.getUserAssetData(user, asset)
+        rewards += get_rewards(staked_by_user, asset_index, user_index)
+    return rewards
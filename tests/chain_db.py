@@ -0,0 +1,199 @@
+"""
+Persisted chain database with the shared test contracts already deployed.
+
+When CHAIN_DB is set, ganache keeps its chain in a database under that
+directory. The first session builds it: the first test module deploys every
+shared contract fixture (CHAIN_DB_FIXTURES of conftest.py) through `deployed`,
+which records their addresses, and ganache is stopped right after to store
+the database under a key hashing the bytecode of the project contracts,
+conftest.py and the chain settings. Ganache is booted again from a copy of the
+stored database. Later sessions boot from a copy straight away and the
+fixtures load the recorded contracts instead of deploying them, until the key
+changes and the database is built again.
+
+    CHAIN_DB=.chain_db FORK_BLOCK=13500000 brownie test
+
+Brownie resets the chain at the start of every module to the state it was
+booted with, so every module starts from the freshly deployed contracts, as
+it does without CHAIN_DB.
+
+The fork must be pinned to a block (FORK_BLOCK, or FORK_CACHE with its
+block), as the stored chain continues the forked one. Hardhat keeps its chain
+in memory only, so CHAIN_DB requires the ganache development network.
+
+The stETH reserve is not in the database. Tests initialize it by
+`init_reserve` with their own controllers and token variants, and a reserve
+initialized in the stored chain would make those calls fail. So reserve
+initialization still runs in every test that needs it.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# seconds to wait for ganache to exit and close the database
+STOP_TIMEOUT = 60
+
+CONFTEST_PATH = Path(__file__).resolve().parent / 'conftest.py'
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'brownie-config.yaml'
+CHAIN_SETTINGS = ['fork', 'mnemonic', 'accounts', 'evm_version', 'gas_limit']
+
+
+def bytecode_key(contracts, config, extra=()):
+    """
+    Hash of the bytecode of the (name, bytecode) contracts, the chain settings and `extra` strings.
+    """
+    digest = hashlib.sha256()
+    for name, bytecode in sorted(contracts):
+        digest.update(f'{name}:{bytecode}\n'.encode())
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    for value in extra:
+        digest.update(value.encode())
+    return digest.hexdigest()[:16]
+
+
+class ChainDb:
+    def __init__(self, root, key, chain):
+        self.root = Path(root)
+        self.key = key
+        self.path = self.root / key
+        self.chain = chain
+        self.deployments = {}
+        self.ready = (self.path / 'deployments.json').exists()
+        self._work_dir = None
+        if self.ready:
+            self.deployments = json.loads((self.path / 'deployments.json').read_text())
+            self._boot_copy()
+        else:
+            self.db_path = self.root / f'{key}.building' / 'db'
+            shutil.rmtree(self.db_path.parent, ignore_errors=True)
+            self.db_path.mkdir(parents=True)
+
+    @property
+    def building(self):
+        return not self.ready
+
+    def deployed(self, name, deploy, load):
+        """
+        The contract recorded as `name` loaded with `load(address)`, or deployed with `deploy()`.
+        """
+        if name in self.deployments:
+            return load(self.deployments[name])
+        contract = deploy()
+        if self.building:
+            self.deployments[name] = contract.address
+        return contract
+
+    def store(self):
+        """
+        Stops the chain of a database being built, stores the database under its key, dropping
+        databases of other keys, and starts the chain again from a copy of it.
+        """
+        self.chain.stop()
+        building = self.db_path.parent
+        (building / 'deployments.json').write_text(json.dumps(self.deployments, indent=1))
+        for path in self.root.iterdir():
+            if path != building:
+                shutil.rmtree(path, ignore_errors=True)
+        building.rename(self.path)
+        self.ready = True
+        self._boot_copy()
+        self.chain.start(self.db_path)
+
+    def finish(self):
+        """
+        Stops the chain and drops the working copy of the database, or the database being built
+        if the session hasn't stored it.
+        """
+        self.chain.stop()
+        shutil.rmtree(self._work_dir or self.db_path.parent, ignore_errors=True)
+
+    def _boot_copy(self):
+        self._work_dir = tempfile.mkdtemp(prefix='chain_db_')
+        self.db_path = Path(self._work_dir) / 'db'
+        shutil.copytree(self.path / 'db', self.db_path)
+
+
+class _NoChainDb:
+    ready = False
+    building = False
+
+    def deployed(self, name, deploy, load):
+        return deploy()
+
+    def store(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+class DevelopmentChain:
+    """
+    Ganache of the development network, launched by brownie on the database.
+    """
+
+    def __init__(self, network_config):
+        self.network_config = network_config
+
+    def set_db(self, db_path):
+        cmd = self.network_config['cmd'].split(' --db ')[0]
+        self.network_config['cmd'] = f'{cmd} --db {db_path}'
+
+    def stop(self):
+        """
+        Disconnects brownie and waits until ganache and its child processes have exited,
+        so the database is closed.
+        """
+        import psutil
+        from brownie import network
+        from brownie.network.rpc import Rpc
+        process = Rpc().process
+        processes = [] if process is None else [process] + process.children(recursive=True)
+        if network.is_connected():
+            network.disconnect()
+        _, alive = psutil.wait_procs(processes, timeout=STOP_TIMEOUT)
+        if alive:
+            raise RuntimeError(f'ganache has not exited in {STOP_TIMEOUT}s, database is in use')
+
+    def start(self, db_path):
+        from brownie import network
+        self.set_db(db_path)
+        network.connect('development')
+
+
+def start_from_env(network_id='development'):
+    """
+    Points ganache of the development network at the database when CHAIN_DB
+    is set. Returns the database, or a stand-in deploying every contract.
+    """
+    if 'CHAIN_DB' not in os.environ:
+        return _NoChainDb()
+    import pytest
+    if network_id != 'development':
+        raise pytest.UsageError(f'CHAIN_DB requires the development network, not {network_id}')
+    from brownie import project
+    from brownie._config import CONFIG
+    network = CONFIG.networks['development']
+    settings = network['cmd_settings']
+    fork = settings.get('fork')
+    if fork and '@' not in fork:
+        if 'FORK_BLOCK' not in os.environ:
+            raise pytest.UsageError('CHAIN_DB requires a pinned fork, set FORK_BLOCK')
+        if fork in CONFIG.networks:
+            fork = CONFIG.networks[fork]['host']
+        settings['fork'] = fork = f'{fork}@{os.environ["FORK_BLOCK"]}'
+    brownie_project = project.get_loaded_projects()[0]
+    contracts = [(name, container.bytecode) for name, container in brownie_project.dict().items()]
+    chain_settings = {name: settings.get(name) for name in CHAIN_SETTINGS}
+    # the url of the fork cache server changes between sessions, its block doesn't
+    if fork and os.environ.get('FORK_CACHE'):
+        chain_settings['fork'] = fork.split('@')[1]
+    chain_settings['config'] = CONFIG_PATH.read_text()
+    key = bytecode_key(contracts, chain_settings, [CONFTEST_PATH.read_text()])
+    chain = DevelopmentChain(network)
+    chain_db = ChainDb(os.environ['CHAIN_DB'], key, chain)
+    chain.set_db(chain_db.db_path)
+    return chain_db
@@ -1,19 +1,62 @@
 import pytest
-from deployment.deploy import deploy_implementation
-from brownie import ZERO_ADDRESS, project, config
-from pathlib import Path
+import chain_db
+import fork_cache
+from deployment.deploy import deploy_implementation, load_dependency_contract
+from brownie import ZERO_ADDRESS
 
 AGENT = '0x3e40D73EB977Dc6a537aF587D48316feE66E9C8c'
+# fixtures of the contracts stored in the chain database, see chain_db.py
+CHAIN_DB_FIXTURES = ['scaled_balane_token_mock', 'rewards_manager', 'implementation',
+                     'incentives_controller', 'asteth_impl', 'variable_debt_steth_impl',
+                     'stable_debt_steth_impl']
 
-aave_project = None
 
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    # runs after brownie has loaded the project config and before it launches the fork
+    from brownie._config import CONFIG
+    network_id = CONFIG.argv['network'] or CONFIG.settings['networks']['default']
+    config.fork_cache_server = fork_cache.start_from_env(network_id)
+    config.chain_db = chain_db.start_from_env(network_id)
 
-def load_dependency_contract(name):
-    global aave_project
-    if aave_project is None:
-        aave_project = project.load(Path.home() / ".brownie" /
-                                    "packages" / config["dependencies"][0])
-    return getattr(aave_project, name)
+
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config):
+    # after the teardown of brownie, ganache reads the fork through the fork cache until it is stopped
+    if getattr(config, 'chain_db', None) is not None:
+        config.chain_db.finish()
+    if getattr(config, 'fork_cache_server', None) is not None:
+        config.fork_cache_server.stop()
+
+
+@pytest.fixture(scope='session')
+def deployed(pytestconfig):
+    return pytestconfig.chain_db.deployed
+
+
+@pytest.fixture(scope='module', autouse=True)
+def chain_db_build(request, pytestconfig, module_isolation):
+    # the first module of a session building the chain database deploys all the stored
+    # contracts after the reset of the chain and stores the database right away
+    if pytestconfig.chain_db.building:
+        for name in CHAIN_DB_FIXTURES:
+            request.getfixturevalue(name)
+        pytestconfig.chain_db.store()
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    # every test is reverted to the snapshot taken after the module fixtures, on ganache
+    # or on hardhat (brownie test --network hardhat-fork), whose snapshots are in-process
+    pass
+
+
+@pytest.fixture
+def cached_reads(monkeypatch):
+    # utils imports this module, so it is imported here
+    from utils import CachedReads, watch_chain
+    watch_chain(monkeypatch)
+    return CachedReads
 
 
 @pytest.fixture(scope='module')
@@ -55,8 +98,10 @@ def ldo(interface):
 
 
 @pytest.fixture(scope='module')
-def scaled_balane_token_mock(ScaledBalanceTokenMock, owner):
-    return ScaledBalanceTokenMock.deploy({'from': owner})
+def scaled_balane_token_mock(ScaledBalanceTokenMock, owner, deployed):
+    return deployed('scaled_balane_token_mock',
+                    lambda: ScaledBalanceTokenMock.deploy({'from': owner}),
+                    ScaledBalanceTokenMock.at)
 
 
 @pytest.fixture(scope='module')
@@ -75,24 +120,32 @@ def proxy_factory(owner):
 
 
 @pytest.fixture(scope='module')
-def implementation(owner, ldo, rewards_manager):
-    return deploy_implementation(
-        ldo, rewards_manager, {'from': owner})
+def implementation(ERC20TokenIncentivesController, owner, ldo, rewards_manager, deployed):
+    return deployed('implementation',
+                    lambda: deploy_implementation(ldo, rewards_manager, {'from': owner}),
+                    ERC20TokenIncentivesController.at)
 
 
 @pytest.fixture(scope='module')
-def incentives_controller(Contract, ERC20TokenIncentivesController, proxy_factory, owner, admin, implementation):
-    proxy = proxy_factory()
-    proxy.initialize(
-        implementation, admin, implementation.initialize.encode_input(
-            ZERO_ADDRESS)
-    )
+def incentives_controller(Contract, ERC20TokenIncentivesController, proxy_factory, owner, admin, implementation,
+                          deployed):
+    def deploy():
+        proxy = proxy_factory()
+        proxy.initialize(
+            implementation, admin, implementation.initialize.encode_input(
+                ZERO_ADDRESS)
+        )
+        return proxy
+
+    proxy = deployed('incentives_controller', deploy, lambda address: address)
     return Contract.from_abi("ERC20TokenIncentivesController", proxy, ERC20TokenIncentivesController.abi)
 
 
 @pytest.fixture(scope='module')
-def rewards_manager(owner, RewardsManager, rewards_initializer, scaled_balane_token_mock):
-    return RewardsManager.deploy(rewards_initializer, {'from': owner})
+def rewards_manager(owner, RewardsManager, rewards_initializer, scaled_balane_token_mock, deployed):
+    return deployed('rewards_manager',
+                    lambda: RewardsManager.deploy(rewards_initializer, {'from': owner}),
+                    RewardsManager.at)
 
 
 @pytest.fixture(scope='module')
@@ -101,65 +154,77 @@ def lending_pool_configurator(interface):
 
 
 @pytest.fixture(scope='module')
-def asteth_impl(Contract, owner, proxy_factory, admin, incentives_controller):
+def asteth_impl(Contract, owner, proxy_factory, admin, incentives_controller, deployed):
     AStETH = load_dependency_contract('AStETH')
-    asteth = AStETH.deploy(
-        '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # lending pool,
-        '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84',  # underlying asset
-        ZERO_ADDRESS,  # treasury,
-        'AAVE stETH',
-        'astETH',
-        incentives_controller,
-        {'from': owner})
-    asteth.initialize(
-        18,
-        'AAVE stETH',
-        'astETH',
-        {'from': owner}
-    )
-    return asteth
-
-
-@pytest.fixture(scope='module')
-def variable_debt_steth_impl(Contract, owner, admin, incentives_controller, proxy_factory):
+
+    def deploy():
+        asteth = AStETH.deploy(
+            '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # lending pool,
+            '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84',  # underlying asset
+            ZERO_ADDRESS,  # treasury,
+            'AAVE stETH',
+            'astETH',
+            incentives_controller,
+            {'from': owner})
+        asteth.initialize(
+            18,
+            'AAVE stETH',
+            'astETH',
+            {'from': owner}
+        )
+        return asteth
+
+    return deployed('asteth_impl', deploy, AStETH.at)
+
+
+@pytest.fixture(scope='module')
+def variable_debt_steth_impl(Contract, owner, admin, incentives_controller, proxy_factory, deployed):
     VariableDebtStETH = load_dependency_contract('VariableDebtStETH')
-    variable_debt_steth = VariableDebtStETH.deploy(
-        '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # lending pool,
-        '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84',  # underlying asset
-        'Variable debt stETH',
-        'variableDebtStETH',
-        ZERO_ADDRESS,
-        {'from': owner}
-    )
-
-    variable_debt_steth.initialize(
-        18,
-        'Variable debt stETH',
-        'variableDebtStETH',
-        {'from': owner}
-    )
-    return variable_debt_steth
-
-
-@pytest.fixture(scope='module')
-def stable_debt_steth_impl(Contract, owner, admin, incentives_controller, proxy_factory):
+
+    def deploy():
+        variable_debt_steth = VariableDebtStETH.deploy(
+            '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # lending pool,
+            '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84',  # underlying asset
+            'Variable debt stETH',
+            'variableDebtStETH',
+            ZERO_ADDRESS,
+            {'from': owner}
+        )
+
+        variable_debt_steth.initialize(
+            18,
+            'Variable debt stETH',
+            'variableDebtStETH',
+            {'from': owner}
+        )
+        return variable_debt_steth
+
+    return deployed('variable_debt_steth_impl', deploy, VariableDebtStETH.at)
+
+
+@pytest.fixture(scope='module')
+def stable_debt_steth_impl(Contract, owner, admin, incentives_controller, proxy_factory, deployed):
     StableDebtStETH = load_dependency_contract('StableDebtStETH')
-    stable_debt_steth = StableDebtStETH.deploy(
-        '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # lending pool,
-        '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84',  # underlying asset
-        'Variable debt stETH',
-        'variableDebtStETH',
-        ZERO_ADDRESS,
-        {'from': owner}
-    )
-
-    stable_debt_steth.initialize(
-        18,
-        'Variable debt stETH',
-        'variableDebtStETH',
-        {'from': owner}
-    ),
-    return stable_debt_steth
+
+    def deploy():
+        stable_debt_steth = StableDebtStETH.deploy(
+            '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # lending pool,
+            '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84',  # underlying asset
+            'Variable debt stETH',
+            'variableDebtStETH',
+            ZERO_ADDRESS,
+            {'from': owner}
+        )
+
+        stable_debt_steth.initialize(
+            18,
+            'Variable debt stETH',
+            'variableDebtStETH',
+            {'from': owner}
+        ),
+        return stable_debt_steth
+
+    return deployed('stable_debt_steth_impl', deploy, StableDebtStETH.at)
 
 
 @pytest.fixture(scope='module')
@@ -0,0 +1,135 @@
+"""
+Record/replay cache of the remote state read by the forked ganache.
+
+Ganache fetches accounts, code and storage of the forked chain lazily through
+JSON-RPC. When FORK_CACHE is set, the tests start a local JSON-RPC server in
+front of the archive node and point the fork at it: every response is served
+from the cache file and only missing reads reach FORK_UPSTREAM, so a recorded
+file replays the whole suite offline.
+
+    FORK_CACHE=tests/fork_cache.json FORK_UPSTREAM=<archive node url> \\
+        FORK_BLOCK=13500000 brownie test     # record
+    FORK_CACHE=tests/fork_cache.json brownie test     # replay offline
+
+The fork is always pinned to the block of the cache file, otherwise reads of
+the latest state would make the recorded responses stale. The cache serves
+the hardhat-fork network the same way.
+"""
+import atexit
+import json
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class ForkCache:
+    def __init__(self, path, block=None, upstream=None):
+        self.path = Path(path)
+        self.upstream = upstream
+        self.responses = {}
+        self.block = block
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            if block is not None and data['block'] != block:
+                raise ValueError(f'fork cache {self.path} is pinned to block {data["block"]}')
+            self.block = data['block']
+            self.responses = data['responses']
+        if self.block is None:
+            raise ValueError('fork block is required to record a new fork cache')
+
+    @staticmethod
+    def key(request):
+        return json.dumps([request['method'], request.get('params', [])], separators=(',', ':'))
+
+    def handle(self, request):
+        key = self.key(request)
+        response = self.responses.get(key)
+        if response is None:
+            response = self._fetch(request)
+            if 'result' in response:
+                with self._lock:
+                    self.responses[key] = response
+                    self.misses += 1
+                    self._dirty = True
+        return dict(response, jsonrpc='2.0', id=request.get('id'))
+
+    def _fetch(self, request):
+        if self.upstream is None:
+            return {'error': {'code': -32000, 'message': f'fork cache miss: {self.key(request)}'}}
+        payload = json.dumps(dict(request, jsonrpc='2.0', id=1)).encode()
+        upstream_request = urllib.request.Request(
+            self.upstream, payload, {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(upstream_request) as upstream_response:
+            response = json.loads(upstream_response.read())
+        return {name: response[name] for name in ('result', 'error') if name in response}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.write_text(json.dumps(
+                {'block': self.block, 'responses': self.responses}, indent=1, sort_keys=True))
+            self._dirty = False
+
+
+class ForkCacheServer:
+    def __init__(self, cache, port=0):
+        self.cache = cache
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if isinstance(body, list):
+                    response = [cache.handle(request) for request in body]
+                else:
+                    response = cache.handle(body)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.cache.save)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self.cache.save()
+
+
+def start_from_env(network_id='development'):
+    """
+    Starts the cache server when FORK_CACHE is set and points the fork of the
+    network at it. Returns the server or None.
+    """
+    if 'FORK_CACHE' not in os.environ:
+        return None
+    from brownie._config import CONFIG
+    block = int(os.environ['FORK_BLOCK']) if 'FORK_BLOCK' in os.environ else None
+    cache = ForkCache(os.environ['FORK_CACHE'], block, os.environ.get('FORK_UPSTREAM'))
+    server = ForkCacheServer(cache).start()
+    network = CONFIG.networks[network_id]
+    if 'hardhat' in network['cmd']:
+        # hardhat takes the block of the fork as a separate setting
+        network['cmd_settings'].update(fork=server.url, fork_block=cache.block)
+    else:
+        network['cmd_settings']['fork'] = f'{server.url}@{cache.block}'
+    return server
@@ -0,0 +1,135 @@
+from brownie import Wei, accounts
+from brownie.network import chain
+from utils import init_reserve, is_almost_equal, make_deposit
+
+
+def test_batched_handle_action(scaled_balane_token_mock, owner, ldo, depositors, agent,
+                               incentives_controller, rewards_manager, rewards_initializer):
+    """
+    User story:
+        1. Depositor1 and Depositor2 get balances of the asset, which notifies the controller
+        2. Start new rewards period with distribution of 1000 ldo
+        3. Wait till the end of the reward period
+        4. Depositor1 transfers to Depositor2, the asset notifies both with two handleAction calls
+        5. Undo the transfer and repeat it, the asset notifies both with one handleActions call
+        6. Validate that both ways accrue exactly the same rewards and batched one is cheaper
+    """
+    token = scaled_balane_token_mock
+    [depositor1, depositor2] = depositors[0:2]
+
+    # 1. Depositor1 and Depositor2 get balances of the asset, which notifies the controller
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    token.mint(depositor1, Wei('1 ether'), {'from': owner})
+    token.mint(depositor2, Wei('0.5 ether'), {'from': owner})
+
+    # 2. Start new rewards period with distribution of 1000 ldo
+    rewards_manager.set_asset(token, {'from': owner})
+    ldo.transfer(rewards_manager, Wei('1000 ether'), {'from': agent})
+    rewards_manager.set_rewards_contract(
+        incentives_controller, {'from': owner})
+    rewards_manager.set_rewards_period_duration(
+        30 * 24 * 60 * 60, {'from': owner})
+    rewards_manager.start_next_rewards_period(
+        {'from': rewards_initializer})
+
+    # 3. Wait till the end of the reward period
+    # the index doesn't move after the end, so both ways accrue the same rewards at any time
+    chain.sleep(31 * 24 * 60 * 60)
+    chain.mine()
+
+    # 4. Depositor1 transfers to Depositor2, the asset notifies both with two handleAction calls
+    single_tx = token.transfer(depositor1, depositor2, Wei('0.25 ether'), {'from': owner})
+    single_unclaimed = [incentives_controller.getUserUnclaimedRewards(depositor1),
+                        incentives_controller.getUserUnclaimedRewards(depositor2)]
+    chain.undo()
+
+    # 5. Undo the transfer and repeat it, the asset notifies both with one handleActions call
+    batched_tx = token.transferBatched(depositor1, depositor2, Wei('0.25 ether'), {'from': owner})
+    batched_unclaimed = [incentives_controller.getUserUnclaimedRewards(depositor1),
+                         incentives_controller.getUserUnclaimedRewards(depositor2)]
+
+    # 6. Validate that both ways accrue exactly the same rewards and batched one is cheaper
+    assert single_unclaimed[0] > 0 and single_unclaimed[1] > 0
+    assert batched_unclaimed == single_unclaimed
+    assert batched_tx.gas_used < single_tx.gas_used
+
+    print('transfer with handleAction x2 gas used:', single_tx.gas_used)
+    print('transfer with handleActions gas used:', batched_tx.gas_used)
+    print('Gas saved per transfer:', single_tx.gas_used - batched_tx.gas_used)
+
+
+def test_batched_handle_action_asteth(Contract, lending_pool_configurator, lending_pool, owner, ldo,
+                                      pool_admin, depositors, steth, agent, incentives_controller,
+                                      rewards_manager, rewards_initializer):
+    """
+    User story:
+        1. Depositor1 and Depositor2 deposit stETH into lending pool
+        2. Start new rewards period with distribution of 1000 ldo
+        3. Wait half of the reward period
+        4. AStETH updates sender and receiver of a transfer with two handleAction calls
+        5. Undo both calls, AStETH updates sender and receiver with one handleActions call
+        6. Validate that both ways accrue the same rewards and batched one is cheaper
+    """
+    [asteth, _, _] = init_reserve(
+        Contract=Contract,
+        atoken_contract_name='AStETH',
+        variable_debt_token_contract_name='VariableDebtStETH',
+        stable_debt_token_contract_name='StableDebtStETH',
+        lending_pool_configurator=lending_pool_configurator,
+        lending_pool=lending_pool,
+        incentives_controller=incentives_controller,
+        owner=owner,
+        pool_admin=pool_admin
+    )
+    asteth.initializeDebtToken({'from': owner})
+    [depositor1, depositor2] = depositors[0:2]
+
+    # 1. Depositor1 and Depositor2 deposit stETH into lending pool
+    make_deposit(lending_pool, steth, asteth, depositor1, Wei('1 ether'))
+    make_deposit(lending_pool, steth, asteth, depositor2, Wei('0.5 ether'))
+
+    # 2. Start new rewards period with distribution of 1000 ldo
+    rewards_manager.set_asset(asteth, {'from': owner})
+    ldo.transfer(rewards_manager, Wei('1000 ether'), {'from': agent})
+    rewards_manager.set_rewards_contract(
+        incentives_controller, {'from': owner})
+    rewards_manager.set_rewards_period_duration(
+        30 * 24 * 60 * 60, {'from': owner})
+    rewards_manager.start_next_rewards_period(
+        {'from': rewards_initializer})
+
+    # 3. Wait half of the reward period
+    chain.sleep(15 * 24 * 60 * 60)
+    chain.mine()
+
+    asteth_account = accounts.at(asteth.address, force=True)
+    total_supply = asteth.scaledTotalSupply()
+    balance1 = asteth.scaledBalanceOf(depositor1)
+    balance2 = asteth.scaledBalanceOf(depositor2)
+
+    # 4. AStETH updates sender and receiver of a transfer with two handleAction calls
+    tx1 = incentives_controller.handleAction(
+        depositor1, total_supply, balance1, {'from': asteth_account})
+    tx2 = incentives_controller.handleAction(
+        depositor2, total_supply, balance2, {'from': asteth_account})
+    # both calls happen inside of one transfer transaction, so intrinsic gas is paid once
+    single_gas_used = tx1.gas_used + tx2.gas_used - 21000
+    single_unclaimed = [incentives_controller.getUserUnclaimedRewards(depositor1),
+                        incentives_controller.getUserUnclaimedRewards(depositor2)]
+    chain.undo(2)
+
+    # 5. Undo both calls, AStETH updates sender and receiver with one handleActions call
+    tx = incentives_controller.handleActions(
+        [depositor1, depositor2], total_supply, [balance1, balance2], {'from': asteth_account})
+    batched_unclaimed = [incentives_controller.getUserUnclaimedRewards(depositor1),
+                         incentives_controller.getUserUnclaimedRewards(depositor2)]
+
+    # 6. Validate that both ways accrue the same rewards and batched one is cheaper
+    # the index moves during the period, so the accruals differ by the seconds between the blocks
+    assert is_almost_equal(batched_unclaimed[0], single_unclaimed[0], Wei('0.002 ether'))
+    assert is_almost_equal(batched_unclaimed[1], single_unclaimed[1], Wei('0.002 ether'))
+    assert tx.gas_used < single_gas_used
+
+    print('AStETH handleAction x2 gas used:', single_gas_used)
+    print('AStETH handleActions gas used:', tx.gas_used)
+    print('Gas saved per AStETH transfer:', single_gas_used - tx.gas_used)
@@ -0,0 +1,40 @@
+from brownie import Wei, web3
+from brownie.network import chain
+
+
+def test_cached_reads(cached_reads, scaled_balane_token_mock, depositors, monkeypatch):
+    """
+    User story:
+        1. Read the balance of depositor1 several times in the same block
+        2. Validate that only the first read reached the node
+        3. Validate that a transaction, chain.sleep and chain.undo drop the cached reads
+    """
+    token = cached_reads(scaled_balane_token_mock)
+    depositor1 = depositors[0]
+    eth_calls = []
+    eth_call = web3.eth.call
+
+    def counting_eth_call(*args, **kwargs):
+        eth_calls.append(args)
+        return eth_call(*args, **kwargs)
+    monkeypatch.setattr(web3.eth, 'call', counting_eth_call)
+
+    # 1. Read the balance of depositor1 several times in the same block
+    balances = [token.scaledBalanceOf(depositor1) for _ in range(3)]
+
+    # 2. Validate that only the first read reached the node
+    assert balances == [0, 0, 0]
+    assert len(eth_calls) == 1
+    token.scaledBalanceOf(depositor1.address)
+    assert len(eth_calls) == 1
+
+    # 3. Validate that a transaction, chain.sleep and chain.undo drop the cached reads
+    token.mint(depositor1, Wei('1 ether'))
+    assert token.scaledBalanceOf(depositor1) == Wei('1 ether')
+    assert len(eth_calls) == 2
+    chain.sleep(60)
+    token.scaledBalanceOf(depositor1)
+    assert len(eth_calls) == 3
+    chain.undo()
+    assert token.scaledBalanceOf(depositor1) == 0
+    assert len(eth_calls) == 4
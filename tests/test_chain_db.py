@@ -0,0 +1,77 @@
+from chain_db import ChainDb, bytecode_key
+
+
+class Deployment:
+    def __init__(self, address):
+        self.address = address
+
+
+class Chain:
+    def __init__(self):
+        self.calls = []
+        self.db_path = None
+
+    def stop(self):
+        self.calls.append('stop')
+
+    def start(self, db_path):
+        self.calls.append('start')
+        self.db_path = db_path
+
+
+def test_chain_db_build_and_reuse(tmp_path):
+    """
+    User story:
+        1. Build a database recording the deployed contracts
+        2. Store the database and validate that the chain is stopped first and booted from a copy
+        3. Boot a new session from a copy of the stored database and load the recorded contracts
+        4. Validate that a changed bytecode gives a new key and its build drops the stale database
+        5. Validate that a build not stored by the session is dropped
+    """
+    contracts = [('ERC20TokenIncentivesController', '0x6080'), ('RewardsManager', '0x6100')]
+    settings = {'fork': '13500000', 'mnemonic': 'brownie'}
+    key = bytecode_key(contracts, settings)
+
+    # 1. Build a database recording the deployed contracts
+    chain = Chain()
+    chain_db = ChainDb(tmp_path / 'chain_db', key, chain)
+    assert chain_db.building
+    (chain_db.db_path / 'CURRENT').write_text('MANIFEST-000001')
+    deployed = chain_db.deployed('rewards_manager', lambda: Deployment('0x1234'), Deployment)
+    assert deployed.address == '0x1234'
+
+    # 2. Store the database and validate that the chain is stopped first and booted from a copy
+    chain_db.store()
+    assert chain.calls == ['stop', 'start'] and not chain_db.building
+    assert [path.name for path in (tmp_path / 'chain_db').iterdir()] == [key]
+    assert chain.db_path == chain_db.db_path
+    assert (chain_db.db_path / 'CURRENT').read_text() == 'MANIFEST-000001'
+    assert tmp_path not in chain_db.db_path.parents
+    deployed = chain_db.deployed('rewards_manager', lambda: Deployment('0x5678'), Deployment)
+    assert deployed.address == '0x1234'
+    chain_db.finish()
+    assert chain.calls == ['stop', 'start', 'stop'] and not chain_db.db_path.exists()
+
+    # 3. Boot a new session from a copy of the stored database and load the recorded contracts
+    chain_db = ChainDb(tmp_path / 'chain_db', key, Chain())
+    assert not chain_db.building
+    (chain_db.db_path / 'CURRENT').write_text('MANIFEST-000002')
+    deployed = chain_db.deployed('rewards_manager', lambda: Deployment('0x5678'), Deployment)
+    assert deployed.address == '0x1234'
+    chain_db.finish()
+    assert (tmp_path / 'chain_db' / key / 'db' / 'CURRENT').read_text() == 'MANIFEST-000001'
+
+    # 4. Validate that a changed bytecode gives a new key and its build drops the stale database
+    new_key = bytecode_key([('ERC20TokenIncentivesController', '0x6081'), contracts[1]], settings)
+    assert new_key != key
+    assert bytecode_key(list(reversed(contracts)), settings) == key
+    chain_db = ChainDb(tmp_path / 'chain_db', new_key, Chain())
+    assert chain_db.building
+    chain_db.store()
+    chain_db.finish()
+    assert [path.name for path in (tmp_path / 'chain_db').iterdir()] == [new_key]
+
+    # 5. Validate that a build not stored by the session is dropped
+    chain_db = ChainDb(tmp_path / 'chain_db', key, Chain())
+    chain_db.finish()
+    assert [path.name for path in (tmp_path / 'chain_db').iterdir()] == [new_key]
@@ -0,0 +1,139 @@
+from brownie import ZERO_ADDRESS, Contract, Wei, accounts
+from brownie.network import chain
+from utils import is_almost_equal
+
+ASSETS_COUNT = 5
+
+
+def test_claim_all_rewards(ERC20TokenIncentivesController, ScaledBalanceTokenMock, owner, emission_manager,
+                           ldo, agent, depositors):
+    """
+    User story:
+        1. Configure rewards for 5 assets
+        2. Depositor1 deposits into the first asset, Depositor2 deposits into every asset
+        3. Wait till the end of the reward period
+        4. Validate that user assets contain only assets the depositors hold
+        5. Depositor1 claims rewards passing all the assets
+        6. Depositor1 claims all rewards, touching only assets he holds
+        7. Validate that both ways claim the same rewards and claim of all rewards is cheaper
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    assets = [ScaledBalanceTokenMock.deploy({'from': owner})
+              for _ in range(ASSETS_COUNT)]
+
+    # 1. Configure rewards for 5 assets
+    ldo.transfer(incentives_controller, Wei('1000 ether'), {'from': agent})
+    incentives_controller.setDistributionEnd(
+        chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    for asset in assets:
+        incentives_controller.configureAssets(
+            [asset], [Wei('100 ether') // (30 * 24 * 60 * 60)], {'from': emission_manager})
+    assert incentives_controller.getAssetsList() == [asset.address for asset in assets]
+
+    # 2. Depositor1 deposits into the first asset, Depositor2 deposits into every asset
+    [depositor1, depositor2] = depositors[0:2]
+    deposit(incentives_controller, assets[0], depositor1, Wei('1 ether'))
+    for asset in assets:
+        deposit(incentives_controller, asset, depositor2, Wei('1 ether'))
+
+    # 3. Wait till the end of the reward period
+    chain.sleep(30 * 24 * 60 * 60)
+    chain.mine()
+
+    # 4. Validate that user assets contain only assets the depositors hold
+    assert incentives_controller.getUserAssets(depositor1) == [assets[0].address]
+    assert incentives_controller.getUserAssets(depositor2) == [
+        asset.address for asset in assets]
+
+    # 5. Depositor1 claims rewards passing all the assets
+    tx = incentives_controller.claimRewards(
+        assets, Wei('1000 ether'), depositor1, {'from': depositor1})
+    claim_gas_used = tx.gas_used
+    claimed = ldo.balanceOf(depositor1)
+    chain.undo()
+
+    # 6. Depositor1 claims all rewards, touching only assets he holds
+    tx = incentives_controller.claimAllRewards(
+        Wei('1000 ether'), depositor1, {'from': depositor1})
+
+    # 7. Validate that both ways claim the same rewards and claim of all rewards is cheaper
+    assert is_almost_equal(ldo.balanceOf(depositor1), claimed)
+    assert tx.gas_used < claim_gas_used
+
+    print(f'claimRewards of {ASSETS_COUNT} assets gas used:', claim_gas_used)
+    print('claimAllRewards gas used:', tx.gas_used)
+    print('Gas saved:', claim_gas_used - tx.gas_used)
+
+
+def test_claim_all_rewards_after_upgrade_from_revision_1(ERC20TokenIncentivesController,
+                                                         IncentivesControllerRevision1Mock,
+                                                         ScaledBalanceTokenMock, proxy_factory,
+                                                         owner, admin, emission_manager, ldo,
+                                                         agent, depositors):
+    """
+    User story:
+        1. Deploy the revision 1 behind the proxy, configure rewards and deposit for depositor1
+        2. Upgrade the proxy to the revision 2 with the asset as primary and wait a day
+        3. Validate that the primary asset is among user assets of depositor1 without any action
+        4. Depositor1 claims all rewards
+        5. Validate that depositor1 gets the rewards owed on the primary asset
+        6. Wait a day, depositor1 claims all rewards again
+        7. Validate that the primary asset is tracked after the first claim and the rewards are paid
+    """
+    day = 24 * 60 * 60
+    depositor1 = depositors[0]
+
+    # 1. Deploy the revision 1 behind the proxy, configure rewards and deposit for depositor1
+    revision_1 = IncentivesControllerRevision1Mock.deploy(ldo, emission_manager, {'from': owner})
+    proxy = proxy_factory()
+    proxy.initialize(revision_1, admin, revision_1.initialize.encode_input(ZERO_ADDRESS))
+    controller = Contract.from_abi(
+        'IncentivesControllerRevision1Mock', proxy, IncentivesControllerRevision1Mock.abi)
+    ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+    primary = ScaledBalanceTokenMock.deploy({'from': owner})
+    primary.setIncentivesController(controller, {'from': owner})
+    controller.setDistributionEnd(chain.time() + 30 * day, {'from': emission_manager})
+    controller.configureAssets(
+        [primary], [Wei('1000 ether') // (30 * day)], {'from': emission_manager})
+    primary.mint(depositor1, Wei('1 ether'))
+
+    # 2. Upgrade the proxy to the revision 2 with the asset as primary and wait a day
+    implementation = ERC20TokenIncentivesController.deploy(ldo, emission_manager, {'from': owner})
+    proxy.upgradeToAndCall(
+        implementation, implementation.initialize.encode_input(primary), {'from': admin})
+    controller = Contract.from_abi(
+        'ERC20TokenIncentivesController', proxy, ERC20TokenIncentivesController.abi)
+    chain.sleep(day)
+    chain.mine()
+
+    # 3. Validate that the primary asset is among user assets of depositor1 without any action
+    assert controller.getUserAssets(depositor1) == [primary.address]
+    owed = controller.getRewardsBalance([primary], depositor1)
+    assert owed > 0
+
+    # 4. Depositor1 claims all rewards
+    balance_before = ldo.balanceOf(depositor1)
+    controller.claimAllRewards(2**256 - 1, depositor1, {'from': depositor1})
+
+    # 5. Validate that depositor1 gets the rewards owed on the primary asset
+    assert is_almost_equal(ldo.balanceOf(depositor1) - balance_before, owed, Wei('0.01 ether'))
+    assert controller.getUserUnclaimedRewards(depositor1) == 0
+
+    # 6. Wait a day, depositor1 claims all rewards again
+    chain.sleep(day)
+    chain.mine()
+    owed = controller.getRewardsBalance([primary], depositor1)
+    balance_before = ldo.balanceOf(depositor1)
+    controller.claimAllRewards(2**256 - 1, depositor1, {'from': depositor1})
+
+    # 7. Validate that the primary asset is tracked after the first claim and the rewards are paid
+    assert controller.getUserAssets(depositor1) == [primary.address]
+    assert is_almost_equal(ldo.balanceOf(depositor1) - balance_before, owed, Wei('0.01 ether'))
+
+
+def deposit(incentives_controller, asset, depositor, amount):
+    incentives_controller.handleAction(
+        depositor, asset.totalSupply(), asset.scaledBalanceOf(depositor),
+        {'from': accounts.at(asset.address, force=True)})
+    asset.mint(depositor, amount)
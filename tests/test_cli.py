@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+from brownie import Wei, web3
+from brownie.network import chain
+from deployment.cli import PROJECT_PATH
+
+
+def run_cli(*args):
+    return subprocess.run(
+        [sys.executable, '-m', 'deployment.cli', *args], cwd=PROJECT_PATH,
+        capture_output=True, text=True, check=True).stdout
+
+
+def test_cli_read_only_commands(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                                rewards_manager, owner, rewards_initializer, ldo, agent, depositors):
+    """
+    User story:
+        1. Validate that importing the cli doesn't import brownie
+        2. Start the rewards period for the mock token and deposit for depositor1
+        3. Validate that status reports the rewards manager and controller state
+        4. Validate that claim-report reports the rewards of depositor1
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, rewards_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    depositor1 = depositors[0]
+    rpc = web3.provider.endpoint_uri
+
+    # 1. Validate that importing the cli doesn't import brownie
+    subprocess.run([sys.executable, '-c',
+                    'import sys, deployment.cli; assert "brownie" not in sys.modules'],
+                   cwd=PROJECT_PATH, check=True)
+
+    # 2. Start the rewards period for the mock token and deposit for depositor1
+    rewards_manager.set_asset(token, {'from': owner})
+    rewards_manager.set_rewards_contract(incentives_controller, {'from': owner})
+    rewards_manager.set_rewards_period_duration(30 * 24 * 60 * 60, {'from': owner})
+    token.mint(depositor1, Wei('1 ether'))
+    ldo.transfer(rewards_manager, Wei('1000 ether'), {'from': agent})
+    rewards_manager.start_next_rewards_period({'from': rewards_initializer})
+    chain.sleep(24 * 60 * 60)
+    chain.mine()
+
+    # 3. Validate that status reports the rewards manager and controller state
+    output = run_cli('status', '--rpc', rpc, '--rewards-manager', rewards_manager.address)
+    assert f'rewards_contract: {incentives_controller.address}' in output
+    assert f'period_finish: {rewards_manager.period_finish()}' in output
+    assert f'balance: {Wei("1000 ether")}' in output
+
+    # 4. Validate that claim-report reports the rewards of depositor1
+    output = run_cli('claim-report', '--rpc', rpc, '--controller',
+                     incentives_controller.address, depositor1.address)
+    claimable = incentives_controller.getRewardsBalance([token], depositor1)
+    assert f'{depositor1.address:<44}{0:>26}{claimable:>26}' in output
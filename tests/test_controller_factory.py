@@ -0,0 +1,75 @@
+import asyncio
+
+from brownie import Wei, reverts, web3
+from brownie.network import chain
+from deployment.deploy import create_controller_clone, deploy_controller_factory
+from monitoring.client import ControllerFactoryReader, RpcClient
+from utils import is_almost_equal
+
+
+def test_controller_factory(ERC20TokenIncentivesController, ScaledBalanceTokenMock,
+                           owner, emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Deploy the factory and create controller clones for two reserves
+        2. Validate that a clone costs a small fraction of the full controller deployment
+        3. Validate that clones are configured per instance and can't be created twice per reserve
+        4. Configure rewards of the first clone, deposit and wait half of the period
+        5. Validate that depositor1 can claim rewards from the clone
+        6. Validate that the registry is read in one call
+    """
+    tokens = [ScaledBalanceTokenMock.deploy({'from': owner}) for _ in range(2)]
+    depositor1 = depositors[0]
+
+    # 1. Deploy the factory and create controller clones for two reserves
+    factory = deploy_controller_factory(owner, {'from': owner})
+    with reverts('ONLY_OWNER'):
+        factory.createController(tokens[0], ldo, emission_manager, {'from': emission_manager})
+    controllers = [create_controller_clone(factory, token, ldo, emission_manager, {'from': owner})
+                   for token in tokens]
+
+    # 2. Validate that a clone costs a small fraction of the full controller deployment
+    clone_gas_used = factory.createController(
+        owner, ldo, emission_manager, {'from': owner}).gas_used
+    full_gas_used = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner}).tx.gas_used
+    print(f'clone: {clone_gas_used} gas, full deployment: {full_gas_used} gas')
+    assert clone_gas_used * 5 < full_gas_used
+
+    # 3. Validate that clones are configured per instance and can't be created twice per reserve
+    for controller, token in zip(controllers, tokens):
+        assert controller.REWARD_TOKEN() == ldo.address
+        assert controller.EMISSION_MANAGER() == emission_manager.address
+        assert factory.controllerOfAsset(token) == controller.address
+        with reverts('Contract instance has already been initialized'):
+            controller.initializeClone(ldo, owner, {'from': owner})
+    with reverts('CONTROLLER_EXISTS'):
+        factory.createController(tokens[0], ldo, emission_manager, {'from': owner})
+
+    # 4. Configure rewards of the first clone, deposit and wait half of the period
+    [controller, token] = [controllers[0], tokens[0]]
+    token.setIncentivesController(controller, {'from': owner})
+    ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+    controller.setDistributionEnd(chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    controller.configureAssets(
+        [token], [Wei('1000 ether') // (30 * 24 * 60 * 60)], {'from': emission_manager})
+    token.mint(depositor1, Wei('1 ether'))
+    chain.sleep(15 * 24 * 60 * 60)
+
+    # 5. Validate that depositor1 can claim rewards from the clone
+    controller.claimRewards([token], Wei('1000 ether'), depositor1, {'from': depositor1})
+    assert is_almost_equal(ldo.balanceOf(depositor1), Wei('500 ether'), Wei('0.05 ether'))
+
+    # 6. Validate that the registry is read in one call
+    async def read_registry():
+        async with RpcClient(web3.provider.endpoint_uri) as client:
+            return await ControllerFactoryReader(client, factory.address).get_controllers(
+                await client.block_number())
+
+    registry = asyncio.run(read_registry())
+    assert factory.getControllersCount() == 3
+    assert [entry['controller'] for entry in registry[0:2]] == \
+        [controller.address for controller in controllers]
+    assert registry[1] == {'controller': controllers[1].address, 'asset': tokens[1].address,
+                           'reward_token': ldo.address,
+                           'emission_manager': emission_manager.address}
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+from brownie.network import chain
+from deployment.deploy import DeploymentState, load_config, run_deployment, verify_deployment
+
+
+class Interrupted(Exception):
+    pass
+
+
+def write_config(path, ldo, asset, admin, rewards_initializer):
+    path.write_text(json.dumps({
+        'reward_token': ldo.address,
+        'asset': asset.address,
+        'proxy_admin': admin.address,
+        'rewards_initializer': rewards_initializer.address,
+        'rewards_period_duration': 30 * 24 * 60 * 60,
+    }))
+    return path
+
+
+def test_resume_interrupted_deployment(monkeypatch, tmp_path, scaled_balane_token_mock,
+                                       owner, admin, rewards_initializer, ldo):
+    """
+    User story:
+        1. Run the deployment and interrupt it after the implementation is broadcast
+        2. Validate that the state file has the first steps confirmed and the implementation pending
+        3. Run the deployment again with the same state file
+        4. Validate that only the remaining steps are sent and the pending implementation is used
+        5. Run the deployment once more and validate that nothing is sent
+    """
+    config_path = write_config(tmp_path / 'config.json', ldo, scaled_balane_token_mock,
+                               admin, rewards_initializer)
+    state_path = tmp_path / 'state.json'
+
+    # 1. Run the deployment and interrupt it after the implementation is broadcast
+    confirm = DeploymentState.confirm
+
+    def interrupting_confirm(state, step, tx):
+        if step == 'implementation':
+            raise Interrupted()
+        confirm(state, step, tx)
+
+    monkeypatch.setattr(DeploymentState, 'confirm', interrupting_confirm)
+    with pytest.raises(Interrupted):
+        run_deployment(config_path, state_path, owner)
+    monkeypatch.undo()
+
+    # 2. Validate that the state file has the first steps confirmed and the implementation pending
+    state = DeploymentState(state_path, chain.id)
+    assert state.is_done('rewards_manager') and state.is_done('proxy')
+    assert state.steps['implementation']['status'] == 'pending'
+    assert not state.is_done('set_asset')
+    with pytest.raises(ValueError):
+        DeploymentState(state_path, chain.id + 1)
+
+    # 3. Run the deployment again with the same state file
+    nonce = owner.nonce
+    [rewards_manager, incentives_controller] = run_deployment(config_path, state_path, owner)
+
+    # 4. Validate that only the remaining steps are sent and the pending implementation is used
+    assert owner.nonce - nonce == 4
+    resumed_state = DeploymentState(state_path, chain.id)
+    assert all(resumed_state.is_done(step) for step in resumed_state.steps)
+    for step in ['rewards_manager', 'proxy']:
+        assert resumed_state.steps[step] == state.steps[step]
+    assert resumed_state.steps['implementation']['tx'] == state.steps['implementation']['tx']
+    assert rewards_manager.address == state.address('rewards_manager')
+    assert incentives_controller.address == state.address('proxy')
+    assert rewards_manager.rewards_contract() == incentives_controller.address
+
+    # 5. Run the deployment once more and validate that nothing is sent
+    nonce = owner.nonce
+    contracts = run_deployment(config_path, state_path, owner)
+    assert [contract.address for contract in contracts] == \
+        [rewards_manager.address, incentives_controller.address]
+    assert owner.nonce == nonce
+
+
+def test_verify_deployment_failure(capsys, tmp_path, ScaledBalanceTokenMock, scaled_balane_token_mock,
+                                   owner, admin, rewards_initializer, ldo):
+    """
+    User story:
+        1. Run the deployment
+        2. Change the asset of the rewards manager
+        3. Validate that the verification fails and reports the wrong asset
+        4. Validate that the verification fails against the config of another reward token
+    """
+    config_path = write_config(tmp_path / 'config.json', ldo, scaled_balane_token_mock,
+                               admin, rewards_initializer)
+
+    # 1. Run the deployment
+    [rewards_manager, incentives_controller] = run_deployment(
+        config_path, tmp_path / 'state.json', owner)
+    deploy_config = load_config(config_path)
+    verify_deployment(deploy_config, rewards_manager, incentives_controller)
+
+    # 2. Change the asset of the rewards manager
+    other_asset = ScaledBalanceTokenMock.deploy({'from': owner})
+    rewards_manager.set_asset(other_asset, {'from': owner})
+    capsys.readouterr()
+
+    # 3. Validate that the verification fails and reports the wrong asset
+    with pytest.raises(RuntimeError, match='deployment verification failed'):
+        verify_deployment(deploy_config, rewards_manager, incentives_controller)
+    output = capsys.readouterr().out
+    assert f'rewards manager asset: expected {scaled_balane_token_mock.address}' in output
+    assert 'rewards contract' not in output
+    rewards_manager.set_asset(scaled_balane_token_mock, {'from': owner})
+
+    # 4. Validate that the verification fails against the config of another reward token
+    with pytest.raises(RuntimeError, match='deployment verification failed'):
+        verify_deployment(dict(deploy_config, reward_token=other_asset.address),
+                          rewards_manager, incentives_controller)
+    assert 'incentives controller reward token' in capsys.readouterr().out
@@ -0,0 +1,48 @@
+import time
+
+import numpy as np
+from monitoring.planner import SECONDS_PER_YEAR, backtest, recommend_durations, synthetic_supply_series
+
+DAY = 24 * 60 * 60
+
+
+def test_emission_planner():
+    """
+    User story:
+        1. Generate 90 days of constant supply with two days of zero supply
+        2. Backtest a 30 days schedule and validate emission, lost rewards and APR
+        3. Grid search thousands of schedules with rollover delays within seconds
+        4. Validate that the recommended durations avoid gaps over the zero supply span
+    """
+    # 1. Generate 90 days of constant supply with two days of zero supply
+    supply = 10**21
+    timestamps, series = synthetic_supply_series(
+        90 * DAY, 3600, supply, zero_supply_spans=[(40 * DAY, 42 * DAY)])
+    assert (series == 0).sum() == 48
+
+    # 2. Backtest a 30 days schedule and validate emission, lost rewards and APR
+    amount = 1000 * 10**18
+    result = backtest(timestamps, series, [amount], [30 * DAY], keep_apr=True)
+    emission_per_second = amount // (30 * DAY)
+    assert result['emission_per_second'][0] == emission_per_second
+    assert np.isclose(result['emitted'][0], emission_per_second * (timestamps[-1] - timestamps[0]))
+    assert np.isclose(result['lost_to_zero_supply'][0], emission_per_second * 2 * DAY)
+    assert np.isclose(result['rounding_loss'][0], (amount - emission_per_second * 30 * DAY) * 3)
+    assert np.isclose(result['mean_apr'][0], emission_per_second * SECONDS_PER_YEAR / supply)
+    assert result['apr'][0][40 * 24] == 0
+
+    # 3. Grid search thousands of schedules with rollover delays within seconds
+    durations = np.tile(np.arange(DAY, 31 * DAY, 3600), 5)
+    amounts = [int(duration) * emission_per_second for duration in durations]
+    started_at = time.time()
+    result = backtest(timestamps, series, amounts, durations, rollover_delay=DAY)
+    print(f'{len(durations)} schedules backtested in {time.time() - started_at:.2f}s')
+    assert len(durations) > 3000
+    assert time.time() - started_at < 10
+
+    # 4. Validate that the recommended durations avoid gaps over the zero supply span
+    recommended = recommend_durations(durations, result)
+    assert len(recommended) == 5
+    best = list(durations).index(recommended[0])
+    assert result['lost_to_zero_supply'][best] / result['emitted'][best] < \
+        np.median(result['lost_to_zero_supply'] / result['emitted'])
@@ -0,0 +1,132 @@
+from brownie import Wei, reverts
+from brownie.network import chain
+from monitoring.rewards import project_rewards_balance
+from utils import is_almost_equal
+
+DAY = 24 * 60 * 60
+
+
+def test_emission_schedule(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                           owner, emission_manager, ldo, depositors):
+    """
+    User story:
+        1. Depositor1 deposits into the mock token
+        2. Configure tapering schedule of three 10 days segments for the mock token
+        3. Wait 15 days
+        4. Validate that depositor1 gained rewards of the first and half of the second segment
+        5. Wait till the end of the schedule and some more
+        6. Validate that depositor1 gained rewards of all the segments and nothing after
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    depositor1 = depositors[0]
+
+    # 1. Depositor1 deposits into the mock token
+    token.mint(depositor1, Wei('1 ether'))
+
+    # 2. Configure tapering schedule of three 10 days segments for the mock token
+    emission = Wei('1 ether') // DAY
+    emissions = [emission, emission // 2, emission // 4]
+    start = chain.time() + 60
+    ends = [start + 10 * DAY, start + 20 * DAY, start + 30 * DAY]
+    with reverts('INVALID_CONFIGURATION'):
+        incentives_controller.setEmissionSchedule(
+            token, [ends[1], ends[0]], emissions[0:2], {'from': emission_manager})
+    chain.sleep(60)
+    tx = incentives_controller.setEmissionSchedule(
+        token, ends, emissions, {'from': emission_manager})
+    start = tx.timestamp
+    assert incentives_controller.getEmissionSchedule(token) == (ends, emissions)
+
+    # 3. Wait 15 days
+    chain.sleep(start + 15 * DAY - chain.time())
+    chain.mine()
+
+    # 4. Validate that depositor1 gained rewards of the first and half of the second segment
+    expected_reward = (ends[0] - start) * emissions[0] + 5 * DAY * emissions[1]
+    actual_reward = incentives_controller.getRewardsBalance([token], depositor1)
+    assert is_almost_equal(actual_reward, expected_reward, Wei('0.0001 ether'))
+
+    expected_final_reward = (ends[0] - start) * emissions[0] + \
+        10 * DAY * (emissions[1] + emissions[2])
+    assert is_almost_equal(project_rewards_balance(
+        incentives_controller, [token], depositor1, ends[2]), expected_final_reward, 10)
+
+    # 5. Wait till the end of the schedule and some more
+    chain.sleep(20 * DAY)
+    chain.mine()
+
+    # 6. Validate that depositor1 gained rewards of all the segments and nothing after
+    actual_reward = incentives_controller.getRewardsBalance([token], depositor1)
+    assert is_almost_equal(actual_reward, expected_final_reward, 10)
+    assert incentives_controller.getRewardsBalanceAt(
+        [token], depositor1, chain.time() + DAY) == actual_reward
+
+
+def test_emission_schedule_through_rewards_manager(ERC20TokenIncentivesController, ScaledBalanceTokenMock,
+                                                   rewards_manager, owner, rewards_initializer,
+                                                   ldo, agent, depositors):
+    """
+    User story:
+        1. Set a tapering rewards schedule of 50%, 30% and 20% of the period in the rewards manager,
+           a period shorter than a second per segment is rejected
+        2. Depositor1 deposits and the rewards manager starts a period of 30 days with 1000 ldo
+        3. Validate that the controller got the schedule of three 10 days segments
+        4. Wait till the end of the period and validate that depositor1 gained all the rewards
+        5. Restore the constant emission and start the next period
+        6. Validate that the schedule is replaced by the constant emission
+    """
+    controller = ERC20TokenIncentivesController.deploy(ldo, rewards_manager, {'from': owner})
+    token = ScaledBalanceTokenMock.deploy({'from': owner})
+    token.setIncentivesController(controller, {'from': owner})
+    rewards_manager.set_rewards_contract(controller, {'from': owner})
+    rewards_manager.set_asset(token, {'from': owner})
+    rewards_manager.set_rewards_period_duration(30 * DAY, {'from': owner})
+    depositor1 = depositors[0]
+    amount = Wei('1000 ether')
+
+    # 1. Set a tapering rewards schedule of 50%, 30% and 20% of the period in the rewards manager
+    shares = [5000, 3000, 2000, 0, 0, 0, 0, 0]
+    with reverts('manager: not permitted'):
+        rewards_manager.set_rewards_schedule(shares, 3, {'from': rewards_initializer})
+    with reverts('manager: invalid shares'):
+        rewards_manager.set_rewards_schedule(shares, 2, {'from': owner})
+    rewards_manager.set_rewards_period_duration(2, {'from': owner})
+    with reverts('manager: segments too short'):
+        rewards_manager.set_rewards_schedule(shares, 3, {'from': owner})
+    rewards_manager.set_rewards_period_duration(30 * DAY, {'from': owner})
+    rewards_manager.set_rewards_schedule(shares, 3, {'from': owner})
+    assert rewards_manager.rewards_schedule_segments() == 3
+    with reverts('manager: segments too short'):
+        rewards_manager.set_rewards_period_duration(2, {'from': owner})
+
+    # 2. Depositor1 deposits and the rewards manager starts a period of 30 days with 1000 ldo
+    token.mint(depositor1, Wei('1 ether'))
+    ldo.transfer(rewards_manager, amount, {'from': agent})
+    tx = rewards_manager.start_next_rewards_period({'from': rewards_initializer})
+    start = tx.timestamp
+
+    # 3. Validate that the controller got the schedule of three 10 days segments
+    ends = [start + 10 * DAY, start + 20 * DAY, start + 30 * DAY]
+    emissions = [amount * share // 10000 // (10 * DAY) for share in shares[0:3]]
+    assert controller.getEmissionSchedule(token) == (ends, emissions)
+    assert controller.getAssetData(token)[1] == 0
+    assert rewards_manager.period_finish() == ends[2]
+
+    # 4. Wait till the end of the period and validate that depositor1 gained all the rewards
+    chain.sleep(30 * DAY)
+    chain.mine()
+    assert rewards_manager.is_rewards_period_finished()
+    assert is_almost_equal(controller.getRewardsBalance([token], depositor1), amount,
+                           Wei('0.0001 ether'))
+
+    # 5. Restore the constant emission and start the next period
+    rewards_manager.set_rewards_schedule([0] * 8, 0, {'from': owner})
+    ldo.transfer(rewards_manager, amount, {'from': agent})
+    rewards_manager.start_next_rewards_period({'from': rewards_initializer})
+
+    # 6. Validate that the schedule is replaced by the constant emission
+    assert controller.getEmissionSchedule(token) == ([], [])
+    assert controller.getAssetData(token)[1] == amount // (30 * DAY)
@@ -0,0 +1,32 @@
+from deployment.estimate import REWARD_AMOUNT, REWARDS_PERIOD_DURATION, estimate_deployment
+
+
+def test_estimate_deployment(owner, admin, rewards_initializer, ldo):
+    """
+    User story:
+        1. Estimate the deployment of the incentives setup
+        2. Validate that every step of the deployment pipeline is reported with its gas
+        3. Validate that the reported contracts are configured and the first period is started
+    """
+    # 1. Estimate the deployment of the incentives setup
+    report = estimate_deployment(owner, rewards_initializer, admin)
+
+    # 2. Validate that every step of the deployment pipeline is reported with its gas
+    steps = [step for step, _ in report.steps]
+    assert steps[:6] == ['rewards_manager', 'proxy', 'implementation', 'proxy_initialize',
+                         'set_rewards_contract', 'set_rewards_period_duration']
+    assert 'set_asset' not in steps
+    assert steps[-2:] == ['set_asset astETH', 'start_next_rewards_period']
+    assert all(gas_used > 0 for _, gas_used in report.steps)
+    assert set(report.bytecode_sizes) >= {'rewards_manager', 'proxy', 'implementation'}
+    assert report.total_gas() == sum(gas_used for _, gas_used in report.steps)
+
+    # 3. Validate that the reported contracts are configured and the first period is started
+    rewards_manager = report.contracts['rewards_manager']
+    incentives_controller = report.contracts['incentives_controller']
+    asteth = report.contracts['asteth']
+    assert rewards_manager.staking_token() == asteth.address
+    assert rewards_manager.rewards_contract() == incentives_controller.address
+    assert incentives_controller.EMISSION_MANAGER() == rewards_manager.address
+    assert ldo.balanceOf(incentives_controller) == REWARD_AMOUNT
+    assert incentives_controller.getAssetData(asteth)[1] == REWARD_AMOUNT // REWARDS_PERIOD_DURATION
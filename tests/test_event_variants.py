@@ -0,0 +1,111 @@
+from brownie import Wei, web3
+from brownie.network import chain
+from monitoring.reconstruct import CompactEventsState, ReplayedState
+
+DAY = 24 * 60 * 60
+
+
+def get_logs(address, from_block):
+    return web3.provider.make_request('eth_getLogs', [{
+        'address': address, 'fromBlock': hex(from_block), 'toBlock': 'latest'}])['result']
+
+
+def handle_action_calls(tx, controller):
+    return [call['inputs'] for call in tx.subcalls
+            if call['to'] == controller.address and call['function'].startswith('handleAction(')]
+
+
+def assert_state(state, controller, token, users):
+    assert state.asset_indexes[token.address] == controller.getAssetData(token)[0]
+    for user in users:
+        assert state.user_indexes[user.address][token.address] == \
+            controller.getUserAssetData(user, token)
+        assert state.unclaimed_rewards[user.address] == controller.getUserUnclaimedRewards(user)
+
+
+def test_event_variants(ERC20TokenIncentivesController, CompactEventsIncentivesController,
+                        NoEventsIncentivesController, ScaledBalanceTokenMock,
+                        owner, emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Deploy the standard, compact events and no events controllers with their own mock tokens
+        2. Configure rewards, deposit for depositor1 and depositor2 and wait a day
+        3. Validate that handleAction logs one event with compact events and none without events
+        4. Validate that handleAction is cheaper with fewer events
+        5. Transfer from depositor1 to depositor2, wait a day and claim rewards of depositor2
+        6. Validate that the per-user state is reconstructed from the logs and the calldata
+    """
+    [depositor1, depositor2] = depositors[0:2]
+    emission_per_second = Wei('1000 ether') // (30 * DAY)
+    from_block = web3.eth.block_number + 1
+
+    # 1. Deploy the standard, compact events and no events controllers with their own mock tokens
+    variants = {}
+    for name, Controller in [('standard', ERC20TokenIncentivesController),
+                             ('compact', CompactEventsIncentivesController),
+                             ('none', NoEventsIncentivesController)]:
+        controller = Controller.deploy(ldo, emission_manager, {'from': owner})
+        token = ScaledBalanceTokenMock.deploy({'from': owner})
+        token.setIncentivesController(controller, {'from': owner})
+        ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+        variants[name] = (controller, token)
+    [no_events_controller, no_events_token] = variants['none']
+    replayed_state = ReplayedState()
+
+    # 2. Configure rewards, deposit for depositor1 and depositor2 and wait a day
+    for name, (controller, token) in variants.items():
+        tx = controller.setDistributionEnd(chain.time() + 30 * DAY, {'from': emission_manager})
+        if name == 'none':
+            replayed_state.apply_distribution_end(
+                tx.events['DistributionEndUpdated']['newDistributionEnd'])
+        tx = controller.configureAssets([token], [emission_per_second], {'from': emission_manager})
+        if name == 'none':
+            replayed_state.apply_asset_config(
+                token.address, emission_per_second, token.scaledTotalSupply(), tx.timestamp)
+        for depositor in [depositor1, depositor2]:
+            tx = token.mint(depositor, Wei('1 ether'))
+            if name == 'none':
+                for call in handle_action_calls(tx, controller):
+                    replayed_state.apply_handle_action(
+                        token.address, call['user'], call['totalSupply'], call['userBalance'],
+                        tx.timestamp)
+    chain.sleep(DAY)
+
+    # 3. Validate that handleAction logs one event with compact events and none without events
+    # 4. Validate that handleAction is cheaper with fewer events
+    gas_used = {}
+    for name, (controller, token) in variants.items():
+        tx = token.mint(depositor1, Wei('1 ether'))
+        gas_used[name] = tx.gas_used
+        logs = [log for log in tx.logs if log['address'] == controller.address]
+        print(f'handleAction through mint, {name} events: {tx.gas_used} gas, {len(logs)} logs')
+        chain.undo()
+        if name == 'compact':
+            assert len(logs) == 1
+        if name == 'none':
+            assert len(logs) == 0
+    assert gas_used['none'] < gas_used['compact'] < gas_used['standard']
+
+    # 5. Transfer from depositor1 to depositor2, wait a day and claim rewards of depositor2
+    for name, (controller, token) in variants.items():
+        tx = token.transfer(depositor1, depositor2, Wei('0.5 ether'))
+        if name == 'none':
+            for call in handle_action_calls(tx, controller):
+                replayed_state.apply_handle_action(
+                    token.address, call['user'], call['totalSupply'], call['userBalance'],
+                    tx.timestamp)
+    chain.sleep(DAY)
+    for name, (controller, token) in variants.items():
+        stakes = [(token.address, *token.getScaledUserBalanceAndSupply(depositor2))]
+        tx = controller.claimRewards([token], Wei('1 ether'), depositor2, {'from': depositor2})
+        if name == 'none':
+            replayed_state.apply_claim(depositor2.address, stakes,
+                                       tx.events['RewardsClaimed']['amount'], tx.timestamp)
+
+    # 6. Validate that the per-user state is reconstructed from the logs and the calldata
+    [compact_controller, compact_token] = variants['compact']
+    compact_state = CompactEventsState()
+    for log in get_logs(compact_controller.address, from_block):
+        compact_state.apply_log(log)
+    assert_state(compact_state, compact_controller, compact_token, [depositor1, depositor2])
+    assert_state(replayed_state, no_events_controller, no_events_token, [depositor1, depositor2])
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from brownie import web3
+from fork_cache import ForkCache, ForkCacheServer
+
+LDO_ADDRESS = '0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32'
+
+
+def rpc(url, method, params):
+    return web3.HTTPProvider(url).make_request(method, params)
+
+
+def test_fork_cache_record_and_replay(tmp_path):
+    """
+    User story:
+        1. Record code and storage reads through the cache with the dev chain as upstream
+        2. Replay the reads from the saved file without upstream
+        3. Validate that a read missing from the file fails instead of going to the network
+    """
+    path = tmp_path / 'fork_cache.json'
+    block = hex(web3.eth.block_number)
+    reads = [('eth_getCode', [LDO_ADDRESS, block]),
+             ('eth_getStorageAt', [LDO_ADDRESS, '0x0', block])]
+
+    # 1. Record code and storage reads through the cache with the dev chain as upstream
+    server = ForkCacheServer(ForkCache(path, web3.eth.block_number,
+                                       web3.provider.endpoint_uri)).start()
+    recorded = [rpc(server.url, method, params)['result'] for method, params in reads]
+    assert server.cache.misses == len(reads)
+    rpc(server.url, *reads[0])
+    assert server.cache.misses == len(reads)
+    server.stop()
+    assert json.loads(path.read_text())['block'] == web3.eth.block_number
+
+    # 2. Replay the reads from the saved file without upstream
+    server = ForkCacheServer(ForkCache(path)).start()
+    assert [rpc(server.url, method, params)['result'] for method, params in reads] == recorded
+    assert recorded[0] == web3.eth.get_code(LDO_ADDRESS).hex()
+
+    # 3. Validate that a read missing from the file fails instead of going to the network
+    assert 'fork cache miss' in rpc(
+        server.url, 'eth_getStorageAt', [LDO_ADDRESS, '0x1', block])['error']['message']
+    server.stop()
+    with pytest.raises(ValueError):
+        ForkCache(path, web3.eth.block_number + 1)
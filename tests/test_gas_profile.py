@@ -0,0 +1,40 @@
+from brownie import Wei
+from brownie.network import chain
+from deployment.gas_profile import profile_transaction
+
+
+def test_gas_profile_of_handle_action(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                                      owner, emission_manager, ldo, depositors):
+    """
+    User story:
+        1. Configure rewards for the mock token and deposit for depositor1
+        2. Wait a day and deposit for depositor1 again
+        3. Validate that storage costs of handleAction are attributed to the controller sources
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    depositor1 = depositors[0]
+
+    # 1. Configure rewards for the mock token and deposit for depositor1
+    incentives_controller.setDistributionEnd(
+        chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    incentives_controller.configureAssets(
+        [token], [Wei('1000 ether') // (30 * 24 * 60 * 60)], {'from': emission_manager})
+    token.mint(depositor1, Wei('1 ether'))
+
+    # 2. Wait a day and deposit for depositor1 again
+    chain.sleep(24 * 60 * 60)
+    tx = token.mint(depositor1, Wei('1 ether'))
+
+    # 3. Validate that storage costs of handleAction are attributed to the controller sources
+    profile = profile_transaction(tx)
+    profile.print()
+    totals = profile.totals()
+    assert totals['SSTORE'][0] > 0 and totals['SLOAD'][0] > 0 and totals['LOG'][0] > 0
+    assert sum(gas for _, gas in totals.values()) < tx.gas_used
+    files = {path for path, _ in profile.lines}
+    assert files <= {'contracts/incentives/DistributionManager.sol',
+                     'contracts/incentives/ERC20TokenIncentivesController.sol'}
+    assert 'contracts/incentives/DistributionManager.sol' in files
@@ -31,7 +31,7 @@ def is_almost_equal(a, b, epsilon=100):
 # 22. Validate that depositors received expected amount of rewards
 
 
-def test_happy_path(Contract, owner, admin, incentives_controller,
+def test_happy_path(Contract, cached_reads, owner, admin, incentives_controller,
                     rewards_manager, rewards_initializer, agent, ldo, depositors,
                     lending_pool_configurator, pool_admin, asteth_impl,
                     variable_debt_steth_impl, stable_debt_steth_impl, lending_pool, steth):
@@ -52,7 +52,8 @@ def test_happy_path(Contract, owner, admin, incentives_controller,
 
     # get asteth with proxy
     AStETH = load_dependency_contract('AStETH')
-    asteth = Contract.from_abi('AStETH', asteth, AStETH.abi)
+    asteth = cached_reads(Contract.from_abi('AStETH', asteth, AStETH.abi))
+    incentives_controller = cached_reads(incentives_controller)
 
     # initialize asteth reference to debt token
     asteth.initializeDebtToken({'from': owner})
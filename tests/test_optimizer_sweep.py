@@ -0,0 +1,75 @@
+from brownie import project
+from deployment.optimizer_sweep import (
+    DEPLOYED_CONTRACTS, measure_variant, pareto_front, pinned_solc_versions, sweep,
+    unsupported_compilers, write_variant)
+
+
+def result(deploy_gas, runtime_gas):
+    return {'total_deploy_gas': deploy_gas, 'total_runtime_gas': runtime_gas}
+
+
+def test_pareto_front():
+    """
+    User story:
+        1. Build results where cheaper deployment costs more at runtime, plus dominated ones
+        2. Validate that only the non dominated results are on the front
+    """
+    # 1. Build results where cheaper deployment costs more at runtime, plus dominated ones
+    results = [result(100, 900), result(200, 500), result(300, 400), result(250, 600),
+               result(300, 450), result(200, 500)]
+
+    # 2. Validate that only the non dominated results are on the front
+    assert pareto_front(results) == [
+        result(100, 900), result(200, 500), result(300, 400), result(200, 500)]
+
+
+def test_optimizer_variant_gas(tmp_path):
+    """
+    User story:
+        1. Build the project with the optimizer off and with 1000000 runs
+        2. Replay the hot paths with both builds
+        3. Validate that the optimized build is cheaper to run and deploys other bytecode
+    """
+    # 1. Build the project with the optimizer off and with 1000000 runs
+    # 2. Replay the hot paths with both builds
+    results = {}
+    for runs in [None, 1000000]:
+        path = write_variant(tmp_path / str(runs), runs, 'istanbul')
+        variant = project.load(path, name=f'OptimizerSweepTest{len(results)}')
+        try:
+            results[runs] = measure_variant(variant)
+        finally:
+            variant.close()
+
+    # 3. Validate that the optimized build is cheaper to run and deploys other bytecode
+    [unoptimized, optimized] = [results[None], results[1000000]]
+    assert set(optimized['deploy_gas']) == set(DEPLOYED_CONTRACTS)
+    assert optimized['runtime_gas'].keys() == unoptimized['runtime_gas'].keys()
+    assert optimized['total_runtime_gas'] < unoptimized['total_runtime_gas']
+    for name in ['ERC20TokenIncentivesController', 'IncentivesController']:
+        assert optimized['deploy_gas'][name] != unoptimized['deploy_gas'][name]
+
+
+def test_optimizer_sweep_evm_versions(tmp_path):
+    """
+    User story:
+        1. Validate that berlin is reported as unsupported by solc 0.7.5 only
+        2. Sweep petersburg, istanbul and berlin with 200 runs
+        3. Validate that both supported EVM versions are measured and berlin is skipped
+    """
+    # 1. Validate that berlin is reported as unsupported by solc 0.7.5 only
+    solc_versions = pinned_solc_versions()
+    assert solc_versions == [(0, 7, 5), (0, 8, 9)]
+    assert unsupported_compilers('berlin', solc_versions) == ['solc 0.7.5']
+    assert unsupported_compilers('london', solc_versions) == ['solc 0.7.5', 'vyper 0.3.0']
+    assert unsupported_compilers('petersburg', solc_versions) == []
+
+    # 2. Sweep petersburg, istanbul and berlin with 200 runs
+    results = sweep([200], ['petersburg', 'istanbul', 'berlin'], tmp_path)
+
+    # 3. Validate that both supported EVM versions are measured and berlin is skipped
+    assert [result['evm_version'] for result in results] == ['petersburg', 'istanbul']
+    for result in results:
+        assert set(result['deploy_gas']) == set(DEPLOYED_CONTRACTS)
+        assert result['total_runtime_gas'] > 0
+    assert results[0]['runtime_gas'].keys() == results[1]['runtime_gas'].keys()
@@ -0,0 +1,249 @@
+from brownie import ZERO_ADDRESS, Contract, Wei, reverts
+from brownie.network import chain
+from utils import is_almost_equal
+
+DAY = 24 * 60 * 60
+
+
+def storage_writes(tx):
+    """
+    Keys of the storage slots written by the transaction, in order.
+    """
+    return [step['stack'][-1] for step in tx.trace if step['op'] == 'SSTORE']
+
+
+def user_storage_writes(token, user, other_user, amount):
+    """
+    Mints for both users from the same state, returns the transaction of the user and the
+    slots it writes that the mint of the other user doesn't, i.e. the slots of the user.
+    """
+    other_writes = storage_writes(token.mint(other_user, amount))
+    chain.undo()
+    tx = token.mint(user, amount)
+    writes = storage_writes(tx)
+    return tx, writes, [key for key in writes if key not in other_writes]
+
+
+def test_packed_user_data(ERC20TokenIncentivesController, ScaledBalanceTokenMock,
+                          owner, emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Deploy the controller with the primary and a secondary mock token
+        2. Configure the same rewards for both tokens, deposit for depositor1 and depositor2 and wait a day
+        3. Validate that an accruing handleAction is cheaper on the primary token
+        4. Validate that both tokens report the same user indexes and unclaimed rewards
+        5. Depositor1 claims a part of the rewards of both tokens
+        6. Validate that the rest stays unclaimed and the user index of the primary token is kept
+    """
+    [depositor1, depositor2] = depositors[0:2]
+    emission_per_second = Wei('1000 ether') // (30 * DAY)
+
+    # 1. Deploy the controller with the primary and a secondary mock token
+    controller = ERC20TokenIncentivesController.deploy(ldo, emission_manager, {'from': owner})
+    ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+    [primary, secondary] = [ScaledBalanceTokenMock.deploy({'from': owner}) for _ in range(2)]
+    for token in [primary, secondary]:
+        token.setIncentivesController(controller, {'from': owner})
+    assert controller.REVISION() == 2
+
+    # 2. Configure the same rewards for both tokens, deposit for depositor1 and depositor2 and wait a day
+    controller.setDistributionEnd(chain.time() + 30 * DAY, {'from': emission_manager})
+    for token in [primary, secondary]:
+        controller.configureAssets([token], [emission_per_second], {'from': emission_manager})
+    assert controller.getAssetsList() == [primary, secondary]
+    for token in [primary, secondary]:
+        token.mint(depositor1, Wei('1 ether'))
+        token.mint(depositor2, Wei('1 ether'))
+    chain.sleep(DAY)
+    chain.mine()
+
+    # 3. Validate that an accruing handleAction is cheaper on the primary token
+    secondary_tx = secondary.mint(depositor1, Wei('1 ether'))
+    chain.undo()
+    primary_tx = primary.mint(depositor1, Wei('1 ether'))
+    print('handleAction through mint, secondary token:', secondary_tx.gas_used)
+    print('handleAction through mint, primary token:', primary_tx.gas_used)
+    assert primary_tx.gas_used < secondary_tx.gas_used
+    secondary.mint(depositor1, Wei('1 ether'))
+
+    # 4. Validate that both tokens report the same user indexes and unclaimed rewards
+    primary_index = controller.getUserAssetData(depositor1, primary)
+    assert primary_index == controller.getAssetData(primary)[0]
+    assert is_almost_equal(primary_index, controller.getUserAssetData(depositor1, secondary),
+                           primary_index // 1000)
+    assert controller.getUserAssetData(depositor2, primary) < primary_index
+    unclaimed = controller.getUserUnclaimedRewards(depositor1)
+    assert is_almost_equal(unclaimed, emission_per_second * DAY, Wei('0.01 ether'))
+    rewards_balance = controller.getRewardsBalance([primary, secondary], depositor2)
+    assert is_almost_equal(rewards_balance, unclaimed, Wei('0.01 ether'))
+
+    # 5. Depositor1 claims a part of the rewards of both tokens
+    amount = unclaimed // 2
+    balance_before = ldo.balanceOf(depositor1)
+    tx = controller.claimRewards([primary, secondary], amount, depositor1, {'from': depositor1})
+
+    # 6. Validate that the rest stays unclaimed and the user index of the primary token is kept
+    assert ldo.balanceOf(depositor1) - balance_before == amount
+    assert tx.events['RewardsClaimed']['amount'] == amount
+    accrued = sum(event['amount'] for event in tx.events['RewardsAccrued'])
+    assert controller.getUserUnclaimedRewards(depositor1) == unclaimed + accrued - amount
+    assert controller.getUserAssetData(depositor1, primary) == controller.getAssetData(primary)[0]
+
+
+def test_upgrade_from_revision_1(ERC20TokenIncentivesController, IncentivesControllerRevision1Mock,
+                                 ScaledBalanceTokenMock, proxy_factory, owner, admin,
+                                 emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Deploy the revision 1 behind the proxy, deposit for depositor1 and depositor2 and wait a day
+        2. Depositor1 deposits again accruing rewards in the revision 1 layout
+        3. Upgrade the proxy to the revision 2 without registering the primary asset
+        4. Validate that the indexes and the unclaimed rewards are kept
+        5. Wait a day, depositor1 deposits again before the primary asset is registered
+        6. Validate that only the rewards of the day are accrued
+        7. Register the primary asset with initialize and validate that the user data is kept
+        8. Wait a day, depositor2 deposits and depositor1 claims all the rewards
+        9. Validate the migrated indexes and that the users get the rewards they are owed
+    """
+    [depositor1, depositor2] = depositors[0:2]
+    emission_per_second = Wei('1000 ether') // (30 * DAY)
+
+    # 1. Deploy the revision 1 behind the proxy, deposit for depositor1 and depositor2 and wait a day
+    revision_1 = IncentivesControllerRevision1Mock.deploy(ldo, emission_manager, {'from': owner})
+    proxy = proxy_factory()
+    proxy.initialize(revision_1, admin, revision_1.initialize.encode_input(ZERO_ADDRESS))
+    controller = Contract.from_abi(
+        'IncentivesControllerRevision1Mock', proxy, IncentivesControllerRevision1Mock.abi)
+    ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+    primary = ScaledBalanceTokenMock.deploy({'from': owner})
+    primary.setIncentivesController(controller, {'from': owner})
+    controller.setDistributionEnd(chain.time() + 30 * DAY, {'from': emission_manager})
+    controller.configureAssets([primary], [emission_per_second], {'from': emission_manager})
+    primary.mint(depositor1, Wei('1 ether'))
+    primary.mint(depositor2, Wei('1 ether'))
+    chain.sleep(DAY)
+
+    # 2. Depositor1 deposits again accruing rewards in the revision 1 layout
+    primary.mint(depositor1, Wei('1 ether'))
+    unclaimed = controller.getUserUnclaimedRewards(depositor1)
+    assert is_almost_equal(unclaimed, emission_per_second * DAY // 2, Wei('0.01 ether'))
+    indexes = [controller.getUserAssetData(depositor, primary) for depositor in [depositor1, depositor2]]
+    assert indexes[0] == controller.assets(primary)[1] and indexes[1] < indexes[0]
+
+    # 3. Upgrade the proxy to the revision 2 without registering the primary asset
+    implementation = ERC20TokenIncentivesController.deploy(ldo, emission_manager, {'from': owner})
+    proxy.upgradeTo(implementation, {'from': admin})
+    controller = Contract.from_abi(
+        'ERC20TokenIncentivesController', proxy, ERC20TokenIncentivesController.abi)
+    assert controller.REVISION() == 2
+
+    # 4. Validate that the indexes and the unclaimed rewards are kept
+    assert controller.getAssetsList() == []
+    assert controller.getUserUnclaimedRewards(depositor1) == unclaimed
+    assert [controller.getUserAssetData(depositor, primary)
+            for depositor in [depositor1, depositor2]] == indexes
+
+    # 5. Wait a day, depositor1 deposits again before the primary asset is registered
+    chain.sleep(DAY)
+    tx = primary.mint(depositor1, Wei('1 ether'))
+
+    # 6. Validate that only the rewards of the day are accrued
+    accrued = tx.events['RewardsAccrued']['amount']
+    assert is_almost_equal(accrued, emission_per_second * DAY * 2 // 3, Wei('0.01 ether'))
+    unclaimed += accrued
+    assert controller.getUserUnclaimedRewards(depositor1) == unclaimed
+    indexes[0] = controller.getAssetData(primary)[0]
+    assert controller.getUserAssetData(depositor1, primary) == indexes[0]
+
+    # 7. Register the primary asset with initialize and validate that the user data is kept
+    controller.initialize(primary, {'from': owner})
+    with reverts('Contract instance has already been initialized'):
+        controller.initialize(primary, {'from': owner})
+    assert controller.getAssetsList() == [primary]
+    assert controller.getUserUnclaimedRewards(depositor1) == unclaimed
+    assert [controller.getUserAssetData(depositor, primary)
+            for depositor in [depositor1, depositor2]] == indexes
+
+    # 8. Wait a day, depositor2 deposits and depositor1 claims all the rewards
+    chain.sleep(DAY)
+    owed = controller.getRewardsBalance([primary], depositor2)
+    tx = primary.mint(depositor2, Wei('1 ether'))
+    owed_to_depositor1 = controller.getRewardsBalance([primary], depositor1)
+    balance_before = ldo.balanceOf(depositor1)
+    controller.claimRewards([primary], 2**256 - 1, depositor1, {'from': depositor1})
+
+    # 9. Validate the migrated indexes and that the users get the rewards they are owed
+    assert is_almost_equal(tx.events['RewardsAccrued']['amount'], owed, Wei('0.01 ether'))
+    assert is_almost_equal(owed, emission_per_second * DAY * 13 // 12, Wei('0.01 ether'))
+    assert is_almost_equal(ldo.balanceOf(depositor1) - balance_before, owed_to_depositor1,
+                           Wei('0.01 ether'))
+    asset_index = controller.getAssetData(primary)[0]
+    assert controller.getUserAssetData(depositor1, primary) == asset_index
+    assert controller.getUserUnclaimedRewards(depositor1) == 0
+    assert controller.getUserUnclaimedRewards(depositor2) == tx.events['RewardsAccrued']['amount']
+
+
+def test_packed_user_data_against_revision_1(ERC20TokenIncentivesController,
+                                             IncentivesControllerRevision1Mock,
+                                             ScaledBalanceTokenMock, proxy_factory, owner, admin,
+                                             emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Deploy the revision 1 behind the proxy, deposit for depositor1 and depositor2 and wait a day
+        2. Measure an accruing deposit of depositor1 in the revision 1
+        3. Upgrade to the revision 2 with the asset as primary, migrate both depositors and wait a day
+        4. Measure an accruing deposit of depositor1 in the revision 2
+        5. Validate that the revision 2 writes one slot of the user less and no slot twice
+    """
+    [depositor1, depositor2] = depositors[0:2]
+    emission_per_second = Wei('1000 ether') // (30 * DAY)
+
+    # 1. Deploy the revision 1 behind the proxy, deposit for depositor1 and depositor2 and wait a day
+    revision_1 = IncentivesControllerRevision1Mock.deploy(ldo, emission_manager, {'from': owner})
+    proxy = proxy_factory()
+    proxy.initialize(revision_1, admin, revision_1.initialize.encode_input(ZERO_ADDRESS))
+    controller = Contract.from_abi(
+        'IncentivesControllerRevision1Mock', proxy, IncentivesControllerRevision1Mock.abi)
+    ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+    primary = ScaledBalanceTokenMock.deploy({'from': owner})
+    primary.setIncentivesController(controller, {'from': owner})
+    controller.setDistributionEnd(chain.time() + 30 * DAY, {'from': emission_manager})
+    controller.configureAssets([primary], [emission_per_second], {'from': emission_manager})
+    primary.mint(depositor1, Wei('1 ether'))
+    primary.mint(depositor2, Wei('1 ether'))
+    chain.sleep(DAY)
+
+    # 2. Measure an accruing deposit of depositor1 in the revision 1
+    [revision_1_tx, _, revision_1_user_writes] = user_storage_writes(
+        primary, depositor1, depositor2, Wei('1 ether'))
+    assert controller.getUserUnclaimedRewards(depositor1) > 0
+
+    # 3. Upgrade to the revision 2 with the asset as primary, migrate both depositors and wait a day
+    implementation = ERC20TokenIncentivesController.deploy(ldo, emission_manager, {'from': owner})
+    proxy.upgradeToAndCall(
+        implementation, implementation.initialize.encode_input(primary), {'from': admin})
+    controller = Contract.from_abi(
+        'ERC20TokenIncentivesController', proxy, ERC20TokenIncentivesController.abi)
+    assert controller.getAssetsList() == [primary]
+    # users are migrated by a move of their index, so the distribution index must move first
+    chain.sleep(60)
+    for depositor in [depositor1, depositor2]:
+        primary.mint(depositor, Wei('1 ether'))
+    chain.sleep(DAY)
+
+    # 4. Measure an accruing deposit of depositor1 in the revision 2
+    unclaimed = controller.getUserUnclaimedRewards(depositor1)
+    [revision_2_tx, revision_2_writes, revision_2_user_writes] = user_storage_writes(
+        primary, depositor1, depositor2, Wei('1 ether'))
+    accrued = revision_2_tx.events['RewardsAccrued']['amount']
+    assert accrued > 0
+    assert controller.getUserUnclaimedRewards(depositor1) == unclaimed + accrued
+    print('accruing handleAction through mint, revision 1:', revision_1_tx.gas_used)
+    print('accruing handleAction through mint, revision 2:', revision_2_tx.gas_used)
+
+    # 5. Validate that the revision 2 writes one slot of the user less and no slot twice
+    # the slots of the user are the token balance, the index and the unclaimed rewards in the
+    # revision 1, the token balance and the packed user data in the revision 2
+    assert len(revision_1_user_writes) == 3
+    assert len(revision_2_user_writes) == 2
+    assert len(revision_2_writes) == len(set(revision_2_writes))
@@ -0,0 +1,111 @@
+import asyncio
+import csv
+
+from brownie import Wei, web3
+from brownie.network import chain
+from monitoring.audit import REWARDS_ACCRUED_TOPIC, iter_logs, read_balances, run_audit
+from monitoring.client import RpcClient
+
+DAY = 24 * 60 * 60
+
+
+def write_balances(path, token, users, overrides=None):
+    overrides = overrides or {}
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['user', 'asset', 'scaled_balance'])
+        for user in users:
+            writer.writerow([user.address, token.address,
+                             overrides.get(user, token.scaledBalanceOf(user))])
+
+
+def audit(controller, from_block, balances_path, edit_log=None):
+    async def logs(client, block):
+        async for log in iter_logs(client, controller.address, from_block, block, chunk_size=3):
+            if edit_log is not None:
+                log = edit_log(log)
+            if log is not None:
+                yield log
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as client:
+            block = await client.block_number()
+            return [discrepancy async for discrepancy in run_audit(
+                client, controller.address, logs(client, block), read_balances(balances_path),
+                block)]
+    return asyncio.run(run())
+
+
+def test_payout_audit(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                      owner, emission_manager, ldo, agent, depositors, tmp_path):
+    """
+    User story:
+        1. Configure rewards for the mock token and deposit for every depositor
+        2. Transfer from depositor1 to depositor3, claim rewards of depositor1 and depositor2
+        3. Wait till the end of the distribution
+        4. Validate that the audit finds no discrepancies
+        5. Validate that a wrong balance in the snapshot is reported for the user
+        6. Validate that a missing accrual is reported as an accrual mismatch, an overclaim
+           and an unclaimed mismatch
+        7. Validate that an accrual of a wrong amount is reported against the recomputed one
+    """
+    controller = ERC20TokenIncentivesController.deploy(ldo, emission_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(controller, {'from': owner})
+    [depositor1, depositor2, depositor3] = depositors
+    emission_per_second = Wei('1000 ether') // (30 * DAY)
+    from_block = web3.eth.block_number + 1
+
+    # 1. Configure rewards for the mock token and deposit for every depositor
+    ldo.transfer(controller, Wei('1000 ether'), {'from': agent})
+    controller.setDistributionEnd(chain.time() + 2 * DAY, {'from': emission_manager})
+    controller.configureAssets([token], [emission_per_second], {'from': emission_manager})
+    token.mintBatch(depositors, [Wei('1 ether'), Wei('2 ether'), Wei('3 ether')])
+    chain.sleep(DAY // 2)
+
+    # 2. Transfer from depositor1 to depositor3, claim rewards of depositor1 and depositor2
+    token.transfer(depositor1, depositor3, Wei('0.5 ether'))
+    chain.sleep(DAY // 2)
+    for depositor in [depositor1, depositor2]:
+        controller.claimRewards([token], Wei('1 ether'), depositor, {'from': depositor})
+
+    # 3. Wait till the end of the distribution
+    chain.sleep(2 * DAY)
+    chain.mine()
+
+    # 4. Validate that the audit finds no discrepancies
+    balances_path = tmp_path / 'balances.csv'
+    write_balances(balances_path, token, depositors)
+    assert audit(controller, from_block, balances_path) == []
+
+    # 5. Validate that a wrong balance in the snapshot is reported for the user
+    write_balances(balances_path, token, depositors, {depositor2: Wei('1 ether')})
+    discrepancies = audit(controller, from_block, balances_path)
+    assert [(d['kind'], d['user']) for d in discrepancies] == [('rewards_balance', depositor2)]
+    assert discrepancies[0]['expected'] < discrepancies[0]['actual']
+
+    # 6. Validate that a missing accrual is reported as an accrual mismatch, an overclaim
+    #    and an unclaimed mismatch
+    write_balances(balances_path, token, depositors)
+    depositor1_topic = '0x' + depositor1.address[2:].lower().rjust(64, '0')
+    discrepancies = audit(controller, from_block, balances_path, lambda log: None if (
+        log['topics'][0] == REWARDS_ACCRUED_TOPIC and log['topics'][1] == depositor1_topic)
+        else log)
+    assert [(d['kind'], d['user']) for d in discrepancies] == [
+        ('accrual_mismatch', depositor1), ('overclaim', depositor1),
+        ('accrual_mismatch', depositor1), ('unclaimed', depositor1),
+        ('rewards_balance', depositor1)]
+    assert all(d['actual'] == 0 and d['expected'] > 0
+               for d in discrepancies if d['kind'] == 'accrual_mismatch')
+
+    # 7. Validate that an accrual of a wrong amount is reported against the recomputed one
+    depositor2_topic = '0x' + depositor2.address[2:].lower().rjust(64, '0')
+
+    def inflate_accrual(log):
+        if log['topics'][0] == REWARDS_ACCRUED_TOPIC and log['topics'][1] == depositor2_topic:
+            log = dict(log, data='0x' + format(int(log['data'], 16) + 1, '064x'))
+        return log
+    discrepancies = audit(controller, from_block, balances_path, inflate_accrual)
+    mismatches = [d for d in discrepancies if d['kind'] == 'accrual_mismatch']
+    assert mismatches and all(d['user'] == depositor2 and d['actual'] == d['expected'] + 1
+                              for d in mismatches)
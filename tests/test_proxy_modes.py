@@ -0,0 +1,74 @@
+from brownie import Wei, reverts
+from brownie.network import chain
+from deployment.deploy import PROXY_MODES, deploy_controller
+from utils import is_almost_equal
+
+
+def test_handle_action_gas_by_proxy_mode(ScaledBalanceTokenMock, owner, admin, emission_manager,
+                                         ldo, depositors):
+    """
+    User story:
+        1. Deploy the controller in every proxy mode with its own mock token
+        2. Configure rewards and deposit for depositor1 in every mode
+        3. Wait a day and deposit for depositor1 again
+        4. Validate that rewards are the same and handleAction is cheaper without the proxy checks
+    """
+    depositor1 = depositors[0]
+    emission_per_second = Wei('1000 ether') // (30 * 24 * 60 * 60)
+
+    # 1. Deploy the controller in every proxy mode with its own mock token
+    controllers = {}
+    for mode in PROXY_MODES:
+        controller = deploy_controller(ldo, emission_manager, admin, {'from': owner}, mode)
+        token = ScaledBalanceTokenMock.deploy({'from': owner})
+        token.setIncentivesController(controller, {'from': owner})
+        controllers[mode] = (controller, token)
+
+    # 2. Configure rewards and deposit for depositor1 in every mode
+    for controller, token in controllers.values():
+        controller.setDistributionEnd(chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+        controller.configureAssets([token], [emission_per_second], {'from': emission_manager})
+        token.mint(depositor1, Wei('1 ether'))
+
+    # 3. Wait a day and deposit for depositor1 again
+    chain.sleep(24 * 60 * 60)
+    gas_used = {}
+    for mode, (controller, token) in controllers.items():
+        # mint of the same amount with the same storage state
+        gas_used[mode] = token.mint(depositor1, Wei('1 ether')).gas_used
+        print(f'handleAction through mint, {mode}: {gas_used[mode]} gas')
+        chain.undo()
+
+    # 4. Validate that rewards are the same and handleAction is cheaper without the proxy checks
+    [expected_rewards, *rewards] = [controller.getRewardsBalance([token], depositor1)
+                                    for controller, token in controllers.values()]
+    for actual_rewards in rewards:
+        assert is_almost_equal(actual_rewards, expected_rewards, Wei('0.01 ether'))
+    assert gas_used['immutable'] < gas_used['eip1967'] < gas_used['aave']
+
+
+def test_minimal_proxy_upgrade(MinimalUpgradeabilityProxy, ERC20TokenIncentivesController,
+                               owner, admin, emission_manager, ldo):
+    """
+    User story:
+        1. Deploy the controller behind the minimal proxy
+        2. Validate that only the admin may upgrade the proxy or change the admin
+        3. Upgrade the proxy and validate that calls are forwarded to the new implementation
+    """
+    # 1. Deploy the controller behind the minimal proxy
+    controller = deploy_controller(ldo, emission_manager, admin, {'from': owner}, 'eip1967')
+    proxy = MinimalUpgradeabilityProxy.at(controller.address)
+    assert proxy.proxyAdmin() == admin.address
+    assert controller.EMISSION_MANAGER() == emission_manager.address
+
+    # 2. Validate that only the admin may upgrade the proxy or change the admin
+    implementation = ERC20TokenIncentivesController.deploy(ldo, owner, {'from': owner})
+    with reverts('CALLER_NOT_PROXY_ADMIN'):
+        proxy.upgradeProxyToAndCall(implementation, b'', {'from': owner})
+    with reverts('CALLER_NOT_PROXY_ADMIN'):
+        proxy.changeProxyAdmin(owner, {'from': owner})
+
+    # 3. Upgrade the proxy and validate that calls are forwarded to the new implementation
+    proxy.upgradeProxyToAndCall(implementation, b'', {'from': admin})
+    assert proxy.proxyImplementation() == implementation.address
+    assert controller.EMISSION_MANAGER() == owner.address
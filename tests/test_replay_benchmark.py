@@ -0,0 +1,68 @@
+import csv
+
+from deployment.replay_benchmark import compress_time, main, percentile
+
+DAY = 24 * 60 * 60
+
+
+def write_trace(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'operation', 'user', 'amount', 'to'])
+        writer.writerows(rows)
+
+
+def test_time_compression_and_percentiles():
+    """
+    User story:
+        1. Compress a trace with a gap longer than the allowed time jump
+        2. Validate the sleeps and the nearest rank percentiles
+    """
+    # 1. Compress a trace with a gap longer than the allowed time jump
+    rows = [(100, 'deposit'), (160, 'claim'), (100000, 'claim'), (100000, 'withdraw')]
+    sleeps = [sleep for sleep, _ in compress_time(rows, 3600)]
+
+    # 2. Validate the sleeps and the nearest rank percentiles
+    assert sleeps == [0, 60, 3600, 0]
+    values = list(range(1, 101))
+    assert [percentile(values, share) for share in [0.5, 0.9, 0.99, 1]] == [50, 90, 99, 100]
+    assert percentile([], 0.5) == 0
+
+
+def test_replay_benchmark(tmp_path):
+    """
+    User story:
+        1. Record a trace of deposits, transfers, withdrawals and claims spanning two rewards periods
+        2. Replay the trace against the standard controller and the custom controller
+        3. Validate that every operation is reported with its gas and the periods are rolled over
+           outside of the total
+    """
+    # 1. Record a trace of deposits, transfers, withdrawals and claims spanning two rewards periods
+    trace_path = tmp_path / 'trace.csv'
+    write_trace(trace_path, [
+        (0, 'deposit', 'alice', 10**18, ''),
+        (60, 'deposit', 'bob', 2 * 10**18, ''),
+        (DAY, 'transfer', 'bob', 10**18, 'carol'),
+        (10 * DAY, 'claim', 'alice', '', ''),
+        (31 * DAY, 'withdraw', 'carol', 10**18, ''),
+        (31 * DAY + 60, 'withdraw', 'dave', 10**18, ''),
+        (40 * DAY, 'claim', 'bob', '', ''),
+    ])
+
+    # 2. Replay the trace against the standard controller and the custom controller
+    [standard, custom] = main(str(trace_path), 'standard,custom', 31 * DAY, 10)
+
+    # 3. Validate that every operation is reported with its gas and the periods are rolled over
+    #    outside of the total
+    for report in [standard, custom]:
+        counts = {row[0]: row[1] for row in report.rows()}
+        assert counts == {'deposit': 2, 'transfer': 1, 'claim': 2, 'withdraw': 1,
+                          'total': 6, 'rollover': 1}
+        gas = {row[0]: row[2] for row in report.rows()}
+        assert gas['total'] == sum(gas[operation] for operation in
+                                   ['deposit', 'transfer', 'claim', 'withdraw'])
+        assert 0 < report.elapsed
+        assert report.skipped == {'withdraw': 1}
+        assert report.traced_seconds == 40 * DAY
+        assert all(row[2] > 0 for row in report.rows())
+    assert standard.name == 'standard' and custom.name == 'custom'
@@ -0,0 +1,124 @@
+import asyncio
+
+from brownie import Wei, web3
+from brownie.network import chain
+from monitoring.analytics import RewardsAnalytics
+from monitoring.client import RpcClient
+from utils import is_almost_equal
+
+
+class CountingRpcClient(RpcClient):
+    """
+    Counts the reads analytics send to the client, whether or not the client serves them from cache.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    async def call(self, method, params):
+        self.reads += 1
+        return await super().call(method, params)
+
+    async def eth_calls(self, calls, block):
+        self.reads += 1
+        return await super().eth_calls(calls, block)
+
+
+def test_rewards_analytics(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                           owner, emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Configure rewards for the mock token and deposit for every depositor
+        2. Wait half of the reward period and let depositor1 claim rewards
+        3. Validate that analytics report the same rewards as the controller
+        4. Validate that reads of the same block are served from the LRU cache of analytics
+        5. Wait till the end of the distribution
+        6. Validate that the APR drops to zero
+        7. Configure an emission schedule for the mock token
+        8. Validate that the APR follows the schedule
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    [depositor1, depositor2, depositor3] = depositors
+    emission_per_second = Wei('1000 ether') // (30 * 24 * 60 * 60)
+
+    # 1. Configure rewards for the mock token and deposit for every depositor
+    from_block = web3.eth.block_number
+    ldo.transfer(incentives_controller, Wei('1000 ether'), {'from': agent})
+    incentives_controller.setDistributionEnd(
+        chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    incentives_controller.configureAssets(
+        [token], [emission_per_second], {'from': emission_manager})
+    token.mintBatch(depositors, [Wei('1 ether'), Wei('2 ether'), Wei('3 ether')])
+
+    # 2. Wait half of the reward period and let depositor1 claim rewards
+    chain.sleep(15 * 24 * 60 * 60)
+    tx = incentives_controller.claimRewards(
+        [token], Wei('1000 ether'), depositor1, {'from': depositor1})
+    claimed = tx.events['RewardsClaimed']['amount']
+
+    async def read():
+        async with CountingRpcClient(web3.provider.endpoint_uri) as client:
+            # room for two of the three cached reads, the least recently used one is evicted
+            analytics = RewardsAnalytics(client, incentives_controller.address, from_block,
+                                         block_ttl=600, cache_size=2)
+            await analytics.refresh()
+            result = [await analytics.assets(), await analytics.totals(),
+                      await analytics.user(depositor2.address)]
+            reads = [client.reads]
+            await analytics.totals()
+            await analytics.user(depositor2.address)
+            reads.append(client.reads)
+            await analytics.assets()
+            reads.append(client.reads)
+            indexed_users = set(analytics.index.accrued) | set(analytics.index.claimed)
+            return result + [reads, indexed_users]
+
+    [assets, totals, user, reads, indexed_users] = asyncio.run(read())
+
+    # 3. Validate that analytics report the same rewards as the controller
+    assert [asset['asset'] for asset in assets] == [token.address]
+    assert assets[0]['emission_per_second'] == emission_per_second
+    assert is_almost_equal(
+        assets[0]['apr'], emission_per_second * 365 * 24 * 60 * 60 / Wei('6 ether'), 1e-9)
+    assert totals['total_claimed'] == claimed
+    assert totals['total_accrued'] == claimed
+    assert is_almost_equal(totals['total_emitted'], 15 * 24 * 60 * 60 * emission_per_second,
+                           Wei('0.01 ether'))
+    assert user['claimed'] == 0
+    assert depositor2.address not in indexed_users
+    assert user['rewards_balance'] == incentives_controller.getRewardsBalance(
+        [token], depositor2)
+
+    # 4. Validate that reads of the same block are served from the LRU cache of analytics
+    assert reads[1] == reads[0]
+    assert reads[2] > reads[1]
+
+    # 5. Wait till the end of the distribution
+    chain.sleep(15 * 24 * 60 * 60 + 1)
+    chain.mine()
+
+    # 6. Validate that the APR drops to zero
+    async def read_assets():
+        async with RpcClient(web3.provider.endpoint_uri) as client:
+            analytics = RewardsAnalytics(client, incentives_controller.address, from_block)
+            await analytics.refresh()
+            return await analytics.assets()
+
+    [asset] = asyncio.run(read_assets())
+    assert asset['emission_per_second'] == emission_per_second
+    assert asset['apr'] == 0
+
+    # 7. Configure an emission schedule for the mock token
+    incentives_controller.setEmissionSchedule(
+        token, [chain.time() + 10 * 24 * 60 * 60], [2 * emission_per_second],
+        {'from': emission_manager})
+
+    # 8. Validate that the APR follows the schedule
+    [asset] = asyncio.run(read_assets())
+    assert asset['emission_per_second'] == 0
+    assert is_almost_equal(
+        asset['apr'], 2 * emission_per_second * 365 * 24 * 60 * 60 / Wei('6 ether'), 1e-9)
@@ -0,0 +1,64 @@
+from brownie import Wei
+from brownie.network import chain
+from utils import is_almost_equal
+
+
+def test_rewards_liabilities(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                             owner, emission_manager, ldo, agent, depositors):
+    """
+    User story:
+        1. Configure rewards for the mock token and fund the controller with 1000 ldo
+        2. Depositors deposit into the mock token
+        3. Wait half of the reward period
+        4. Validate that liabilities cover the rewards of all the depositors
+        5. Depositor1 claims rewards
+        6. Validate that liabilities decreased by the claimed amount
+        7. Wait till the end of the reward period
+        8. Validate that the controller is solvent
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    [depositor1, depositor2, depositor3] = depositors
+
+    # 1. Configure rewards for the mock token and fund the controller with 1000 ldo
+    ldo.transfer(incentives_controller, Wei('1000 ether'), {'from': agent})
+    incentives_controller.setDistributionEnd(
+        chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    incentives_controller.configureAssets(
+        [token], [Wei('1000 ether') // (30 * 24 * 60 * 60)], {'from': emission_manager})
+
+    # 2. Depositors deposit into the mock token
+    token.mintBatch(depositors, [Wei('1 ether'), Wei('2 ether'), Wei('3 ether')])
+
+    # 3. Wait half of the reward period
+    chain.sleep(15 * 24 * 60 * 60)
+    token.burn(depositor3, Wei('3 ether'))
+
+    # 4. Validate that liabilities cover the rewards of all the depositors
+    [liabilities, balance] = incentives_controller.getRewardsLiabilities()
+    rewards = sum(incentives_controller.getRewardsBalance(
+        [token], depositor) for depositor in depositors)
+    assert liabilities >= rewards
+    assert is_almost_equal(liabilities, rewards, Wei('0.0001 ether'))
+    assert balance == Wei('1000 ether')
+
+    # 5. Depositor1 claims rewards
+    liabilities_before_claim = incentives_controller.getRewardsLiabilities()[0]
+    tx = incentives_controller.claimRewards(
+        [token], Wei('1000 ether'), depositor1, {'from': depositor1})
+    claimed = tx.events['RewardsClaimed']['amount']
+
+    # 6. Validate that liabilities decreased by the claimed amount
+    [liabilities, balance] = incentives_controller.getRewardsLiabilities()
+    assert is_almost_equal(liabilities, liabilities_before_claim - claimed, Wei('0.01 ether'))
+    assert balance == Wei('1000 ether') - claimed
+
+    # 7. Wait till the end of the reward period
+    chain.sleep(15 * 24 * 60 * 60)
+    chain.mine()
+
+    # 8. Validate that the controller is solvent
+    [liabilities, balance] = incentives_controller.getRewardsLiabilities()
+    assert liabilities <= balance
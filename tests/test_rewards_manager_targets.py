@@ -0,0 +1,53 @@
+from brownie import Wei, reverts
+from brownie.network import chain
+
+
+def test_rewards_manager_targets(ERC20TokenIncentivesController, ScaledBalanceTokenMock, rewards_manager,
+                                 owner, rewards_initializer, ldo, agent):
+    """
+    User story:
+        1. Add two incentives controllers with 70% and 30% shares as rewards targets
+        2. Start new rewards period with distribution of 1000 ldo
+        3. Validate that every controller received its share and emission is configured
+        4. Validate that the next period can't be started before the end of current one
+    """
+    controllers = [ERC20TokenIncentivesController.deploy(ldo, rewards_manager, {'from': owner})
+                   for _ in range(2)]
+    assets = [ScaledBalanceTokenMock.deploy({'from': owner}) for _ in range(2)]
+    shares = [7000, 3000]
+    rewards_duration = 30 * 24 * 60 * 60
+
+    # 1. Add two incentives controllers with 70% and 30% shares as rewards targets
+    with reverts('manager: not permitted'):
+        rewards_manager.add_rewards_target(
+            controllers[0], assets[0], shares[0], {'from': rewards_initializer})
+    for controller, asset, share in zip(controllers, assets, shares):
+        rewards_manager.add_rewards_target(
+            controller, asset, share, {'from': owner})
+    assert rewards_manager.rewards_targets_count() == 2
+    rewards_manager.set_rewards_period_duration(
+        rewards_duration, {'from': owner})
+
+    # 2. Start new rewards period with distribution of 1000 ldo
+    ldo.transfer(rewards_manager, Wei('1000 ether'), {'from': agent})
+    tx = rewards_manager.start_next_rewards_period(
+        {'from': rewards_initializer})
+    print('start_next_rewards_period gas used for 2 targets:', tx.gas_used)
+
+    # 3. Validate that every controller received its share and emission is configured
+    assert ldo.balanceOf(rewards_manager) == 0
+    for controller, asset, share in zip(controllers, assets, shares):
+        amount = Wei('1000 ether') * share // 10000
+        assert ldo.balanceOf(controller) == amount
+        assert controller.getAssetData(asset)[1] == amount // rewards_duration
+        assert controller.getDistributionEnd() == tx.timestamp + rewards_duration
+    assert rewards_manager.period_finish() == tx.timestamp + rewards_duration
+
+    # 4. Validate that the next period can't be started before the end of current one
+    ldo.transfer(rewards_manager, Wei('1000 ether'), {'from': agent})
+    with reverts('manager: rewards period not finished'):
+        rewards_manager.start_next_rewards_period(
+            {'from': rewards_initializer})
+    chain.sleep(rewards_duration + 1)
+    rewards_manager.start_next_rewards_period({'from': rewards_initializer})
+    assert ldo.balanceOf(controllers[1]) == Wei('600 ether')
@@ -0,0 +1,70 @@
+from brownie import Wei
+from brownie.network import chain
+from monitoring.rewards import project_rewards_balance
+from utils import init_reserve, make_deposit
+
+
+def test_rewards_balance_at_period_end(Contract, lending_pool_configurator, lending_pool, owner, ldo, pool_admin,
+                                       depositors, steth, agent, incentives_controller, rewards_manager, rewards_initializer):
+    """
+    User story:
+        1. Depositor1 and Depositor2 deposit stETH into lending pool
+        2. Start new rewards period with distribution of 1000 ldo
+        3. Wait a quarter of the reward period
+        4. Project rewards of each depositor to the end of the period
+        5. Wait till the end of the reward period
+        6. Validate that projected rewards are equal to the actual ones
+    """
+    [asteth, _, _] = init_reserve(
+        Contract=Contract,
+        atoken_contract_name='AStETH',
+        variable_debt_token_contract_name='VariableDebtStETH',
+        stable_debt_token_contract_name='StableDebtStETH',
+        lending_pool_configurator=lending_pool_configurator,
+        lending_pool=lending_pool,
+        incentives_controller=incentives_controller,
+        owner=owner,
+        pool_admin=pool_admin
+    )
+    asteth.initializeDebtToken({'from': owner})
+
+    [depositor1, depositor2] = depositors[0:2]
+
+    # 1. Depositor1 and Depositor2 deposit stETH into lending pool
+    make_deposit(lending_pool, steth, asteth, depositor1, Wei('1 ether'))
+    make_deposit(lending_pool, steth, asteth, depositor2, Wei('0.5 ether'))
+
+    # 2. Start new rewards period with distribution of 1000 ldo
+    rewards_manager.set_asset(asteth, {'from': owner})
+    ldo.transfer(rewards_manager, Wei('1000 ether'), {'from': agent})
+    rewards_manager.set_rewards_contract(
+        incentives_controller, {'from': owner})
+    rewards_manager.set_rewards_period_duration(
+        30 * 24 * 60 * 60, {'from': owner})
+    rewards_manager.start_next_rewards_period(
+        {'from': rewards_initializer})
+
+    # 3. Wait a quarter of the reward period
+    chain.sleep(7 * 24 * 60 * 60)
+    chain.mine()
+
+    # 4. Project rewards of each depositor to the end of the period
+    period_finish = rewards_manager.period_finish()
+    projected_rewards = []
+    for depositor in [depositor1, depositor2]:
+        projected_reward = incentives_controller.getRewardsBalanceAt(
+            [asteth.address], depositor, period_finish)
+        assert projected_reward == project_rewards_balance(
+            incentives_controller, [asteth], depositor, period_finish)
+        projected_rewards.append(projected_reward)
+
+    # 5. Wait till the end of the reward period
+    chain.sleep(23 * 24 * 60 * 60)
+    chain.mine()
+    assert rewards_manager.is_rewards_period_finished()
+
+    # 6. Validate that projected rewards are equal to the actual ones
+    assert incentives_controller.getRewardsBalance(
+        [asteth.address], depositor1) == projected_rewards[0]
+    assert incentives_controller.getRewardsBalance(
+        [asteth.address], depositor2) == projected_rewards[1]
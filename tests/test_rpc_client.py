@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from brownie import Wei, accounts, web3
+from brownie.network import chain
+from monitoring.client import IncentivesControllerReader, RewardsManagerReader, RpcClient, RpcError
+
+
+class RejectingRpcClient(RpcClient):
+    """
+    Client of a node rejecting every batch with a single error object.
+    """
+
+    async def _post(self, payload):
+        return {'jsonrpc': '2.0', 'id': None,
+                'error': {'code': -32600, 'message': 'batch size limit exceeded'}}
+
+
+def test_rpc_client_reads(ERC20TokenIncentivesController, scaled_balane_token_mock, rewards_manager,
+                          owner, emission_manager, ldo, depositors):
+    """
+    User story:
+        1. Configure rewards for the asset and deposit for every depositor
+        2. Wait half of the reward period
+        3. Validate that the client reads the same rewards as brownie
+        4. Validate that the client reads rewards manager state
+        5. Validate that a batch rejected by the node raises RpcError
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    asset = scaled_balane_token_mock
+    asset_account = accounts.at(asset.address, force=True)
+
+    # 1. Configure rewards for the asset and deposit for every depositor
+    incentives_controller.setDistributionEnd(
+        chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    incentives_controller.configureAssets(
+        [asset], [Wei('1000 ether') // (30 * 24 * 60 * 60)], {'from': emission_manager})
+    for i, depositor in enumerate(depositors):
+        incentives_controller.handleAction(
+            depositor, asset.totalSupply(), 0, {'from': asset_account})
+        asset.mint(depositor, Wei(f'{i + 1} ether'))
+
+    rewards_manager.set_rewards_contract(
+        incentives_controller, {'from': owner})
+
+    # 2. Wait half of the reward period
+    chain.sleep(15 * 24 * 60 * 60)
+    chain.mine()
+
+    async def read():
+        async with RpcClient(web3.provider.endpoint_uri, batch_size=2) as client:
+            block = await client.block_number()
+            controller = IncentivesControllerReader(client, incentives_controller.address)
+            manager = RewardsManagerReader(client, rewards_manager.address)
+            return await asyncio.gather(
+                controller.get_rewards_balances(
+                    [asset.address], [depositor.address for depositor in depositors], block),
+                controller.get_asset_data(asset.address, block),
+                manager.get_status(block))
+
+    [rewards_balances, asset_data, status] = asyncio.run(read())
+
+    # 3. Validate that the client reads the same rewards as brownie
+    for depositor in depositors:
+        assert rewards_balances[depositor.address] == incentives_controller.getRewardsBalance(
+            [asset], depositor)
+    assert list(asset_data) == list(incentives_controller.getAssetData(asset))
+
+    # 4. Validate that the client reads rewards manager state
+    assert status['owner'] == owner.address
+    assert status['rewards_contract'] == incentives_controller.address
+    assert status['period_finish'] == incentives_controller.getDistributionEnd()
+
+    # 5. Validate that a batch rejected by the node raises RpcError
+    async def read_rejected():
+        async with RejectingRpcClient(web3.provider.endpoint_uri) as client:
+            return await client.batch([('eth_blockNumber', [])])
+
+    with pytest.raises(RpcError, match='batch size limit exceeded'):
+        asyncio.run(read_rejected())
@@ -0,0 +1,48 @@
+from brownie import Wei
+from brownie.network import chain
+
+
+def test_scaled_balance_token_mock_batches(ERC20TokenIncentivesController, scaled_balane_token_mock,
+                                           owner, emission_manager, ldo, depositors):
+    """
+    User story:
+        1. Configure rewards for the mock token
+        2. Mint tokens to every depositor in one transaction
+        3. Wait a day and transfer tokens between depositors in one transaction
+        4. Wait a day and burn tokens of every depositor in one transaction
+        5. Validate balances, total supply and that every action was reported to the controller
+    """
+    incentives_controller = ERC20TokenIncentivesController.deploy(
+        ldo, emission_manager, {'from': owner})
+    token = scaled_balane_token_mock
+    token.setIncentivesController(incentives_controller, {'from': owner})
+    [depositor1, depositor2, depositor3] = depositors
+
+    # 1. Configure rewards for the mock token
+    incentives_controller.setDistributionEnd(
+        chain.time() + 30 * 24 * 60 * 60, {'from': emission_manager})
+    incentives_controller.configureAssets(
+        [token], [Wei('1000 ether') // (30 * 24 * 60 * 60)], {'from': emission_manager})
+
+    # 2. Mint tokens to every depositor in one transaction
+    token.mintBatch(depositors, [Wei('1 ether'), Wei('2 ether'), Wei('3 ether')])
+    assert token.totalSupply() == Wei('6 ether')
+
+    # 3. Wait a day and transfer tokens between depositors in one transaction
+    chain.sleep(24 * 60 * 60)
+    tx = token.transferBatch([depositor3, depositor2], [depositor1, depositor1],
+                             [Wei('1 ether'), Wei('1 ether')])
+    assert token.totalSupply() == Wei('6 ether')
+    assert 'RewardsAccrued' in tx.events
+    assert incentives_controller.getUserUnclaimedRewards(depositor3) > 0
+
+    # 4. Wait a day and burn tokens of every depositor in one transaction
+    chain.sleep(24 * 60 * 60)
+    token.burnBatch(depositors, [Wei('3 ether'), Wei('1 ether'), Wei('2 ether')])
+
+    # 5. Validate balances, total supply and that every action was reported to the controller
+    assert token.totalSupply() == 0
+    for depositor in depositors:
+        assert token.scaledBalanceOf(depositor) == 0
+        assert incentives_controller.getUserAssetData(depositor, token) == \
+            incentives_controller.getAssetData(token)[0]
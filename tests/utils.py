@@ -1,4 +1,6 @@
 from brownie import ZERO_ADDRESS
+from brownie.network import chain, history
+from brownie.network.contract import ContractCall
 from conftest import load_dependency_contract
 
 LENDING_POOL_ADDRESS = '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9'
@@ -108,3 +110,78 @@ def print_rewards(depositor, actual_reward, expected_reward):
     print(f'{depositor} actual reward:', actual_reward)
     print(f'{depositor} expected reward:', expected_reward)
     print()
+
+
+# bumped by every chain method changing the state without a transaction, while watched
+_chain_generation = [0]
+
+
+def _invalidating(method):
+    def wrapper(*args, **kwargs):
+        _chain_generation[0] += 1
+        return method(*args, **kwargs)
+    return wrapper
+
+
+def watch_chain(monkeypatch):
+    """
+    Makes chain.sleep, mine, revert, undo, redo and reset drop the reads cached by
+    CachedReads, until the monkeypatch is undone at the end of the test.
+    """
+    for name in ['sleep', 'mine', 'revert', 'undo', 'redo', 'reset']:
+        monkeypatch.setattr(chain, name, _invalidating(getattr(chain, name)))
+    monkeypatch.setattr(chain, '_cached_reads_watched', True, raising=False)
+
+
+def _cache_key(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_cache_key(item) for item in value)
+    if hasattr(value, 'address'):
+        return value.address
+    return value
+
+
+class CachedReads:
+    """
+    Wraps a contract object caching results of its view calls until the chain
+    changes, i.e. a transaction is sent or the chain is slept, mined, reverted
+    or reset. Everything else is forwarded to the contract untouched. The chain
+    must be watched by watch_chain, see the cached_reads fixture.
+    """
+
+    def __init__(self, contract):
+        if not getattr(chain, '_cached_reads_watched', False):
+            raise RuntimeError('CachedReads requires watch_chain, use the cached_reads fixture')
+        self._contract = contract
+        self._cache = {}
+        self._cache_state = None
+
+    def __getattr__(self, name):
+        attr = getattr(self._contract, name)
+        if not isinstance(attr, ContractCall):
+            return attr
+
+        def call(*args, **kwargs):
+            # no round trip to the node, unlike reading the block number
+            state = (_chain_generation[0], len(history))
+            if state != self._cache_state:
+                self._cache = {}
+                self._cache_state = state
+            key = (name, _cache_key(args))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+            if kwargs or key is None:
+                return attr(*args, **kwargs)
+            if key not in self._cache:
+                self._cache[key] = attr(*args)
+            return self._cache[key]
+        return call
+
+    def __str__(self):
+        return str(self._contract)
+
+    def __repr__(self):
+        return f'CachedReads({self._contract!r})'
+